@@ -0,0 +1,1119 @@
+import asyncio
+import random
+import time
+from neo4j import AsyncGraphDatabase, exceptions
+from grafomemoriatest import InstantaneaGrafo, armar_camino_usuario
+from planificadortest import PlanificadorCaminos
+from metricastest import formatear_fases, medir_fase
+from Neo4jtest import (Neo4jCRUD, CacheLecturas, VERSION_ESQUEMA, MIGRACIONES_ESQUEMA, URI_NEO4J, AUTH_NEO4J,
+                       NOMBRE_META_CAMINO, TAMANO_PAGINA_PREDETERMINADO, METRICAS_NEO4J, _ResultadoEnMemoria,
+                       _metricas_de_consulta, CYPHER_VERSION_ESQUEMA, CYPHER_GUARDAR_VERSION_ESQUEMA, CYPHER_VERSION_GRAFO,
+                       CYPHER_INCREMENTAR_VERSION_GRAFO, CYPHER_NODOS_INSTANTANEA, CYPHER_RELACIONES_INSTANTANEA,
+                       CYPHER_CREAR_VOCACION, CYPHER_VOCACIONES, CYPHER_PAGINA_VOCACIONES, CYPHER_ACTUALIZAR_VOCACION,
+                       CYPHER_ELIMINAR_VOCACION, CYPHER_MERGE_VOCACION, CYPHER_CREAR_CURSO, CYPHER_CURSOS, CYPHER_PAGINA_CURSOS,
+                       CYPHER_ELIMINAR_CURSO, CYPHER_MERGE_CURSO, CYPHER_VINCULAR_VOCACION_CURSO, CYPHER_VINCULAR_CURSO_CURSO,
+                       CYPHER_CURSOS_POR_DIFICULTAD, CYPHER_PAGINA_CURSOS_POR_DIFICULTAD, CYPHER_CURSOS_SIGUIENTES,
+                       CYPHER_CURSOS_ANTERIORES, CYPHER_MERGE_CURSOS_LOTE, CYPHER_LEER_CURSOS_LOTE, CYPHER_CREAR_CURSOS_MASIVO,
+                       CYPHER_VINCULAR_RAICES, CYPHER_VINCULAR_LOTE, CYPHER_SUBGRAFO_VOCACION, CYPHER_QUITAR_RAICES,
+                       CYPHER_QUITAR_VINCULOS, CYPHER_CATALOGO_POR_ID, CYPHER_CATALOGO_POR_NOMBRE, CYPHER_CATALOGO_ELIMINAR,
+                       CYPHER_CURSOS_DIRECTOS, CYPHER_SIGUIENTES_DE_LISTA, CYPHER_RAMA_PREDECESORA, CYPHER_RAMA_SUCESORA,
+                       CYPHER_CAMINO_USUARIO, consulta_actualizar_curso, consulta_rama_cursos, _vocacion_de_registro,
+                       _curso_de_registro, _nodo_de_registro, _rama_cursos_de_registros, _camino_de_registro,
+                       _subgrafo_de_registro, _diferencia_estructura, _resultado_estructura)
+
+
+class _TxAsyncEnMemoria:
+    """
+    Envuelve la transacción asíncrona: cada consulta se lee completa y se devuelve como
+    _ResultadoEnMemoria, así las funciones transaccionales usan single()/consume() sin await.
+    Si recibe 'consultas', anota las métricas de cada una (y muestrea PROFILE como _TxInstrumentada).
+    """
+    def __init__(self, tx, consultas=None, tasa_muestreo_profile=0.0):
+        self._tx = tx
+        self._consultas = consultas
+        self._tasa_muestreo_profile = tasa_muestreo_profile
+
+    async def run(self, query, parameters=None, **kwargs):
+        perfilar = (self._consultas is not None and self._tasa_muestreo_profile > 0
+                    and random.random() < self._tasa_muestreo_profile
+                    and not query.lstrip().upper().startswith(("EXPLAIN", "PROFILE")))
+        result = await self._tx.run("PROFILE " + query if perfilar else query, parameters, **kwargs)
+        registros = [registro async for registro in result]
+        resumen = await result.consume()
+        if self._consultas is not None:
+            self._consultas.append(_metricas_de_consulta(registros, resumen, perfilar))
+        return _ResultadoEnMemoria(registros, resumen)
+
+
+class _TxAsyncConCambios:
+    """Equivalente asíncrono de _TxConCambios (Neo4jtest) sobre un _TxAsyncEnMemoria."""
+    def __init__(self, tx):
+        self._tx = tx
+        self.hubo_cambios = False
+
+    async def run(self, query, parameters=None, **kwargs):
+        resultado = await self._tx.run(query, parameters, **kwargs)
+        if resultado.consume().counters.contains_updates:
+            self.hubo_cambios = True
+        return resultado
+
+
+# --- Funciones transaccionales asíncronas (mismo Cypher que las de Neo4jCRUD) ---
+async def _obtener_version_esquema_tx(tx):
+    record = (await tx.run(CYPHER_VERSION_ESQUEMA, nombre=NOMBRE_META_CAMINO)).single()
+    return record["version"] if record and record["version"] is not None else 0
+
+
+async def _guardar_version_esquema_tx(tx, version):
+    (await tx.run(CYPHER_GUARDAR_VERSION_ESQUEMA, nombre=NOMBRE_META_CAMINO, version=version)).consume()
+
+
+async def _obtener_version_grafo_tx(tx):
+    record = (await tx.run(CYPHER_VERSION_GRAFO, nombre=NOMBRE_META_CAMINO)).single()
+    return record["version"] if record and record["version"] is not None else 0
+
+
+async def _incrementar_version_grafo_tx(tx):
+    return (await tx.run(CYPHER_INCREMENTAR_VERSION_GRAFO, nombre=NOMBRE_META_CAMINO)).single()["version"]
+
+
+async def _cargar_instantanea_tx(tx):
+    instantanea = InstantaneaGrafo(await _obtener_version_grafo_tx(tx))
+    for record in await tx.run(CYPHER_NODOS_INSTANTANEA):
+        instantanea.agregar_nodo(record["id"], record["tipo_nodo"], record["nombre"], record["dificultad"])
+    for record in await tx.run(CYPHER_RELACIONES_INSTANTANEA):
+        instantanea.agregar_relacion(record["origen"], record["destino"], record["tipo"])
+    return instantanea
+
+
+async def _crear_vocacion_tx(tx, nombre):
+    record = (await tx.run(CYPHER_CREAR_VOCACION, nombre=nombre)).single()
+    if record:
+        print(f"Vocación '{record['nombre']}' creada con ID interno: {record['id']}.")
+        return _vocacion_de_registro(record)
+    return None
+
+
+async def _obtener_vocaciones_tx(tx):
+    return [_vocacion_de_registro(record) for record in await tx.run(CYPHER_VOCACIONES)]
+
+
+async def _obtener_pagina_vocaciones_tx(tx, ultimo_nombre, limite):
+    results = await tx.run(CYPHER_PAGINA_VOCACIONES, ultimo_nombre=ultimo_nombre, limite=limite)
+    return [_vocacion_de_registro(record) for record in results]
+
+
+async def _actualizar_vocacion_tx(tx, nombre_actual, nuevo_nombre):
+    record = (await tx.run(CYPHER_ACTUALIZAR_VOCACION, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre)).single()
+    if record:
+        print(f"Vocación '{nombre_actual}' actualizada a '{record['nombre_actualizado']}'.")
+        return {"id_interno_neo4j": record["id"], "nombre": record["nombre_actualizado"]}
+    print(f"No se encontró la vocación '{nombre_actual}' para actualizar.")
+    return None
+
+
+async def _eliminar_vocacion_tx(tx, nombre):
+    summary = (await tx.run(CYPHER_ELIMINAR_VOCACION, nombre=nombre)).consume()
+    if summary.counters.nodes_deleted > 0:
+        print(f"Vocación '{nombre}' y sus relaciones directas eliminadas.")
+        return True
+    print(f"No se encontró la vocación '{nombre}' para eliminar.")
+    return False
+
+
+async def _crear_o_encontrar_vocacion_tx(tx, nombre):
+    result = (await tx.run(CYPHER_MERGE_VOCACION, nombre=nombre)).single()
+    if result:
+        return _vocacion_de_registro(result)
+    raise Exception(f"No se pudo crear o encontrar la vocación '{nombre}'.")
+
+
+async def _crear_curso_tx(tx, nombre, dificultad):
+    record = (await tx.run(CYPHER_CREAR_CURSO, nombre=nombre, dificultad=dificultad)).single()
+    if record:
+        print(f"Curso '{record['nombre']}' (Dificultad: {record['dificultad']}) creado con ID interno: {record['id']}.")
+        return _curso_de_registro(record)
+    return None
+
+
+async def _obtener_cursos_tx(tx):
+    return [_curso_de_registro(record) for record in await tx.run(CYPHER_CURSOS)]
+
+
+async def _obtener_pagina_cursos_tx(tx, ultimo_nombre, limite):
+    results = await tx.run(CYPHER_PAGINA_CURSOS, ultimo_nombre=ultimo_nombre, limite=limite)
+    return [_curso_de_registro(record) for record in results]
+
+
+async def _actualizar_curso_tx(tx, nombre_actual, nuevo_nombre, nueva_dificultad):
+    query, params = consulta_actualizar_curso(nuevo_nombre, nueva_dificultad)
+    if query is None:
+        print("No se proporcionaron datos para actualizar el curso.")
+        return None
+    record = (await tx.run(query, nombre_actual=nombre_actual, **params)).single()
+    if record:
+        print(f"Curso '{nombre_actual}' actualizado a '{record['nombre_actualizado']}' (Dificultad: {record['dificultad_actualizada']}).")
+        return {"id_interno_neo4j": record["id"], "nombre": record["nombre_actualizado"], "dificultad": record["dificultad_actualizada"]}
+    print(f"No se encontró el curso '{nombre_actual}' para actualizar.")
+    return None
+
+
+async def _eliminar_curso_tx(tx, nombre):
+    summary = (await tx.run(CYPHER_ELIMINAR_CURSO, nombre=nombre)).consume()
+    if summary.counters.nodes_deleted > 0:
+        print(f"Curso '{nombre}' y todas sus relaciones eliminadas.")
+        return True
+    print(f"No se encontró el curso '{nombre}' para eliminar.")
+    return False
+
+
+async def _crear_o_encontrar_curso_tx(tx, nombre, dificultad):
+    result = (await tx.run(CYPHER_MERGE_CURSO, nombre=nombre, dificultad=dificultad)).single()
+    if result:
+        return _curso_de_registro(result)
+    raise Exception(f"No se pudo crear o encontrar el curso '{nombre}'.")
+
+
+async def _vincular_vocacion_a_curso_tx(tx, nombre_vocacion, nombre_curso):
+    record = (await tx.run(CYPHER_VINCULAR_VOCACION_CURSO, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso)).single()
+    if record:
+        print(f"Vocación '{nombre_vocacion}' vinculada al curso '{nombre_curso}' con relación '{record['tipo_relacion']}'.")
+        return True
+    print(f"No se pudo vincular. Asegúrese que la vocación '{nombre_vocacion}' y el curso '{nombre_curso}' existen.")
+    return False
+
+
+async def _vincular_curso_a_curso_tx(tx, nombre_curso_origen, nombre_curso_destino):
+    record = (await tx.run(CYPHER_VINCULAR_CURSO_CURSO, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino)).single()
+    if record:
+        print(f"Curso '{nombre_curso_origen}' vinculado para preceder al curso '{nombre_curso_destino}'.")
+        return True
+    print(f"No se pudo vincular. Asegúrese que ambos cursos ('{nombre_curso_origen}', '{nombre_curso_destino}') existen.")
+    return False
+
+
+async def _obtener_cursos_por_dificultad_tx(tx, dificultad):
+    return [_curso_de_registro(record) for record in await tx.run(CYPHER_CURSOS_POR_DIFICULTAD, dificultad=dificultad)]
+
+
+async def _obtener_pagina_cursos_por_dificultad_tx(tx, ultimo_nombre, limite, dificultad):
+    results = await tx.run(CYPHER_PAGINA_CURSOS_POR_DIFICULTAD, dificultad=dificultad, ultimo_nombre=ultimo_nombre, limite=limite)
+    return [_curso_de_registro(record) for record in results]
+
+
+async def _obtener_cursos_siguientes_tx(tx, nombre_curso_actual):
+    return [_curso_de_registro(record) for record in await tx.run(CYPHER_CURSOS_SIGUIENTES, nombre_curso_actual=nombre_curso_actual)]
+
+
+async def _obtener_cursos_anteriores_tx(tx, nombre_curso_actual):
+    return [_nodo_de_registro(record) for record in await tx.run(CYPHER_CURSOS_ANTERIORES, nombre_curso_actual=nombre_curso_actual)]
+
+
+async def _crear_estructura_recursiva_tx(tx, datos_voc):
+    """Versión asíncrona de Neo4jCRUD._crear_estructura_recursiva_tx."""
+    vocacion_nombre = datos_voc.get("vocacion_nombre")
+    if not vocacion_nombre:
+        raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+    voc_result = await _crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+    print(f"Procesando Vocación: '{voc_result['nombre']}'")
+
+    cursos_creados_info = []
+
+    async def _procesar_cursos_recursivo(nombre_nodo_padre_actual, tipo_nodo_padre, lista_cursos_hijos_data):
+        for curso_data_actual in lista_cursos_hijos_data:
+            nombre_curso = curso_data_actual.get("nombre")
+            dificultad_curso = curso_data_actual.get("dificultad")
+
+            if not nombre_curso or not dificultad_curso:
+                print(f"  Advertencia: Datos incompletos para un curso bajo '{nombre_nodo_padre_actual}'. Omitiendo.")
+                continue
+
+            curso_result = await _crear_o_encontrar_curso_tx(tx, nombre_curso, dificultad_curso)
+            print(f"  Procesando Curso: '{curso_result['nombre']}' (Dificultad: {dificultad_curso})")
+            cursos_creados_info.append(curso_result)
+
+            if tipo_nodo_padre == "Vocacion":
+                if await _vincular_vocacion_a_curso_tx(tx, nombre_nodo_padre_actual, nombre_curso):
+                    print(f"    Relación: Vocación '{nombre_nodo_padre_actual}' --TIENE_CURSO--> Curso '{nombre_curso}'")
+                else:
+                    print(f"    Advertencia: No se pudo vincular Vocación '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
+            elif tipo_nodo_padre == "Curso":
+                if await _vincular_curso_a_curso_tx(tx, nombre_nodo_padre_actual, nombre_curso):
+                    print(f"    Relación: Curso '{nombre_nodo_padre_actual}' --PRECEDE_A--> Curso '{nombre_curso}'")
+                else:
+                    print(f"    Advertencia: No se pudo vincular Curso '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
+
+            cursos_siguientes_data = curso_data_actual.get("siguientes", [])
+            if cursos_siguientes_data:
+                await _procesar_cursos_recursivo(nombre_curso, "Curso", cursos_siguientes_data)
+
+    await _procesar_cursos_recursivo(vocacion_nombre, "Vocacion", datos_voc.get("cursos_rama", []))
+
+    return {
+        "vocacion_procesada": voc_result,
+        "cursos_procesados_count": len(cursos_creados_info),
+        "detalle_cursos": cursos_creados_info,
+        "status": "Estructura de vocación y cursos procesada."
+    }
+
+
+async def _crear_estructura_masiva_tx(tx, datos_voc, actualizar_cursos=True):
+    """Versión asíncrona de Neo4jCRUD._crear_estructura_masiva_tx."""
+    vocacion_nombre = datos_voc.get("vocacion_nombre")
+    if not vocacion_nombre:
+        raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+    cursos, raices, vinculos, orden_procesado = Neo4jCRUD._aplanar_cursos_rama(vocacion_nombre, datos_voc.get("cursos_rama", []))
+
+    voc_result = await _crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+    print(f"Procesando Vocación (carga masiva): '{voc_result['nombre']}' con {len(cursos)} cursos y {len(raices) + len(vinculos)} relaciones.")
+
+    lote_cursos = [{"nombre": nombre, "dificultad": dificultad} for nombre, dificultad in sorted(cursos.items())]
+    query_cursos = CYPHER_MERGE_CURSOS_LOTE if actualizar_cursos else CYPHER_LEER_CURSOS_LOTE
+    cursos_por_nombre = {record["nombre"]: _curso_de_registro(record) for record in await tx.run(query_cursos, cursos=lote_cursos)}
+
+    if raices:
+        (await tx.run(CYPHER_VINCULAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=sorted(raices))).consume()
+
+    if vinculos:
+        lote_vinculos = sorted(vinculos, key=lambda v: (v["origen"], v["destino"]))
+        (await tx.run(CYPHER_VINCULAR_LOTE, vinculos=lote_vinculos)).consume()
+
+    return _resultado_estructura(voc_result, cursos, cursos_por_nombre, orden_procesado)
+
+
+async def _obtener_subgrafo_vocacion_tx(tx, nombre_vocacion, nombres_cursos):
+    record = (await tx.run(CYPHER_SUBGRAFO_VOCACION, nombre_vocacion=nombre_vocacion, nombres_cursos=nombres_cursos)).single()
+    return _subgrafo_de_registro(record)
+
+
+async def _crear_estructura_diferencial_tx(tx, datos_voc):
+    """Versión asíncrona de Neo4jCRUD._crear_estructura_diferencial_tx."""
+    vocacion_nombre = datos_voc.get("vocacion_nombre")
+    if not vocacion_nombre:
+        raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+    cursos, raices, vinculos, orden_procesado = Neo4jCRUD._aplanar_cursos_rama(vocacion_nombre, datos_voc.get("cursos_rama", []))
+    actual = await _obtener_subgrafo_vocacion_tx(tx, vocacion_nombre, sorted(cursos))
+    diferencia = _diferencia_estructura(cursos, raices, vinculos, actual)
+    cambios = diferencia["cambios"]
+    print(f"Procesando Vocación (carga diferencial): '{vocacion_nombre}': {len(diferencia['cursos_a_escribir'])} cursos, "
+          f"{len(diferencia['raices_a_agregar']) + len(diferencia['vinculos_a_agregar'])} relaciones nuevas y "
+          f"{len(diferencia['raices_a_quitar']) + len(diferencia['vinculos_a_quitar'])} por revisar.")
+
+    if actual["existe_vocacion"]:
+        voc_result = {"id_interno_neo4j": actual["id_vocacion"], "nombre": vocacion_nombre}
+    else:
+        voc_result = await _crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+
+    cursos_por_nombre = {nombre: {"id_interno_neo4j": curso["id"], "nombre": nombre, "dificultad": curso["dificultad"]}
+                         for nombre, curso in actual["cursos"].items()}
+    if diferencia["cursos_a_escribir"]:
+        for record in await tx.run(CYPHER_MERGE_CURSOS_LOTE, cursos=diferencia["cursos_a_escribir"]):
+            cursos_por_nombre[record["nombre"]] = _curso_de_registro(record)
+
+    if diferencia["raices_a_agregar"]:
+        (await tx.run(CYPHER_VINCULAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=diferencia["raices_a_agregar"])).consume()
+    if diferencia["raices_a_quitar"]:
+        (await tx.run(CYPHER_QUITAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=diferencia["raices_a_quitar"])).consume()
+
+    if diferencia["vinculos_a_agregar"]:
+        (await tx.run(CYPHER_VINCULAR_LOTE, vinculos=[{"origen": origen, "destino": destino} for origen, destino in diferencia["vinculos_a_agregar"]])).consume()
+    if diferencia["vinculos_a_quitar"]:
+        cambios["vinculos_eliminados"] = (await tx.run(CYPHER_QUITAR_VINCULOS, nombre_vocacion=vocacion_nombre,
+                                                       vinculos=[{"origen": origen, "destino": destino} for origen, destino in diferencia["vinculos_a_quitar"]])).single()["eliminados"]
+    cambios["vinculos_conservados"] = len(diferencia["vinculos_a_quitar"]) - cambios["vinculos_eliminados"]
+
+    return _resultado_estructura(voc_result, cursos, cursos_por_nombre, orden_procesado, cambios)
+
+
+async def _crear_cursos_masivo_tx(tx, cursos):
+    summary = (await tx.run(CYPHER_CREAR_CURSOS_MASIVO, cursos=cursos)).consume()
+    return summary.counters.nodes_created
+
+
+async def _aplicar_cambios_catalogo_tx(tx, vocaciones, cursos, eliminados):
+    """Versión asíncrona de Neo4jCRUD._aplicar_cambios_catalogo_tx."""
+    resumen = {"vocaciones": 0, "cursos": 0, "eliminados": 0}
+    for etiqueta, clave, filas in (("Vocacion", "vocaciones", vocaciones), ("Curso", "cursos", cursos)):
+        if not filas:
+            continue
+        actualizados = {record["id_mongo"] for record in await tx.run(CYPHER_CATALOGO_POR_ID[etiqueta], filas=filas)}
+        nuevos = [fila for fila in filas if fila["id_mongo"] not in actualizados]
+        if nuevos:
+            (await tx.run(CYPHER_CATALOGO_POR_NOMBRE[etiqueta], filas=nuevos)).consume()
+        resumen[clave] = len(filas)
+
+    for etiqueta in ("Vocacion", "Curso"):
+        filas = [fila for fila in eliminados if fila["etiqueta"] == etiqueta]
+        if not filas:
+            continue
+        for query in CYPHER_CATALOGO_ELIMINAR[etiqueta]:
+            resumen["eliminados"] += (await tx.run(query, filas=filas)).single()["eliminados"]
+    return resumen
+
+
+async def _obtener_rama_cursos_por_vocacion_tx(tx, nombre_vocacion, max_depth=None):
+    return _rama_cursos_de_registros(await tx.run(consulta_rama_cursos(max_depth), nombre_vocacion=nombre_vocacion), max_depth)
+
+
+async def _obtener_cursos_directos_por_vocacion_tx(tx, nombre_vocacion):
+    return [_curso_de_registro(record) for record in await tx.run(CYPHER_CURSOS_DIRECTOS, nombre_vocacion=nombre_vocacion)]
+
+
+async def _obtener_cursos_siguientes_de_lista_tx(tx, nombres_cursos_actuales):
+    return [_curso_de_registro(record) for record in await tx.run(CYPHER_SIGUIENTES_DE_LISTA, nombres_cursos=nombres_cursos_actuales)]
+
+
+async def _obtener_rama_predecesora_completa_tx(tx, nombres_cursos_actuales):
+    return [_nodo_de_registro(record) for record in await tx.run(CYPHER_RAMA_PREDECESORA, nombres_cursos=nombres_cursos_actuales)]
+
+
+async def _obtener_rama_sucesora_completa_tx(tx, nombres_cursos_actuales):
+    return [_nodo_de_registro(record) for record in await tx.run(CYPHER_RAMA_SUCESORA, nombres_cursos=nombres_cursos_actuales)]
+
+
+async def _obtener_camino_usuario_tx(tx, nombres_cursos_completados):
+    return _camino_de_registro((await tx.run(CYPHER_CAMINO_USUARIO, nombres_cursos=nombres_cursos_completados)).single())
+
+
+MODOS_CARGA_ASYNC = {
+    "recursivo": _crear_estructura_recursiva_tx,
+    "masivo": _crear_estructura_masiva_tx,
+    "diferencial": _crear_estructura_diferencial_tx,
+}
+
+
+class AsyncNeo4jCRUD:
+    """
+    Variante asyncio de Neo4jCRUD sobre el driver asíncrono. Expone los mismos métodos (como corrutinas)
+    con funciones transaccionales propias que comparten el Cypher de Neo4jtest, de modo que varias
+    lecturas independientes pueden lanzarse con asyncio.gather compartiendo un solo pool de conexiones.
+    Uso: gestor = AsyncNeo4jCRUD(); await gestor.conectar() ... await gestor.close()
+    o bien: async with AsyncNeo4jCRUD() as gestor: ...
+    """
+
+    def __init__(self, uri=None, auth=None, database="neo4j", conexion_diferida=False):
+        """
+        Mismos parámetros que Neo4jCRUD. Un constructor no puede esperar la conexión: sin
+        conexion_diferida se inicia con precalentar() si hay un bucle de eventos en curso; en
+        cualquier caso el primer uso espera a que termine (o la abre si nadie la inició).
+        """
+        self._instantanea = None
+        self._instantanea_activa = False
+        self._intervalo_verificacion_instantanea = 30.0
+        self._instantanea_verificada_en = 0.0
+        self._lock_instantanea = asyncio.Lock()
+        self._lock_esquema = asyncio.Lock()
+        self._cache_lecturas = CacheLecturas()
+        self._planificador = PlanificadorCaminos()
+        self._instrumentacion_activa = True
+        self._tasa_muestreo_profile = 0.0
+        self._uri = uri or URI_NEO4J
+        self._auth = auth or AUTH_NEO4J
+        self._database = database
+        self._driver = None
+        self._conexion_intentada = False
+        self._lock_conexion = asyncio.Lock()
+        self._tarea_conexion = None
+        self._tiempos_conexion = {}
+        if not conexion_diferida:
+            self.precalentar()
+
+    async def conectar(self):
+        """
+        Crea el driver asíncrono, verifica la conexión y asegura el esquema, una sola vez por instancia.
+        Si otra corrutina ya se está conectando, espera a que termine. Retorna True si quedó conectado.
+        """
+        async with self._lock_conexion:
+            if self._conexion_intentada:
+                return self._driver is not None
+            tiempos = {}
+            driver = None
+            conectado = False
+            try:
+                with medir_fase(tiempos, "driver"):
+                    driver = AsyncGraphDatabase.driver(uri=self._uri, auth=self._auth)
+                with medir_fase(tiempos, "verificacion"):
+                    await driver.verify_connectivity()
+                print("Conexión asíncrona a Neo4j establecida exitosamente.")
+                with medir_fase(tiempos, "esquema"):
+                    await self._asegurar_esquema(driver)
+                conectado = True
+            except exceptions.AuthError as e:
+                print(f"Error de autenticación con Neo4j: {e}")
+            except exceptions.ServiceUnavailable as e:
+                print(f"No se pudo conectar al servicio Neo4j en bolt: {e}")
+            except Exception as e:
+                print(f"Ocurrió un error inesperado al conectar con Neo4j: {e}")
+            if not conectado and driver is not None:
+                await self._cerrar_driver(driver)
+                driver = None
+            # Se publica después del esquema, para que otras corrutinas no usen un driver sin esquema.
+            self._driver = driver
+            self._conexion_intentada = True
+            self._tiempos_conexion = tiempos
+            print(f"Tiempos de conexión asíncrona a Neo4j: {formatear_fases(tiempos)}.")
+            return driver is not None
+
+    @staticmethod
+    async def _cerrar_driver(driver):
+        try:
+            await driver.close()
+        except Exception as e:
+            print(f"Advertencia al cerrar el driver de Neo4j: {e}")
+
+    def precalentar(self):
+        """
+        Inicia conectar() como tarea del bucle de eventos en curso y la retorna, para no bloquear
+        a quien crea el gestor. Sin bucle en curso retorna None y la conexión se abre en el primer uso.
+        """
+        if self._tarea_conexion is None:
+            try:
+                self._tarea_conexion = asyncio.get_running_loop().create_task(self.conectar())
+            except RuntimeError:
+                return None
+        return self._tarea_conexion
+
+    async def _obtener_driver(self):
+        """Driver ya verificado, o None si no se pudo conectar. El primer uso espera a la conexión."""
+        if not self._conexion_intentada:
+            await self.conectar()
+        return self._driver
+
+    def tiempos_conexion(self):
+        """Segundos de cada fase de la conexión (driver, verificacion, esquema); vacío si aún no se conectó."""
+        return dict(self._tiempos_conexion)
+
+    async def close(self):
+        """Cierra la conexión con la base de datos (sin abrirla si nunca se usó)."""
+        async with self._lock_conexion:
+            self._conexion_intentada = True
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            await self._cerrar_driver(driver)
+            print("Conexión asíncrona a Neo4j cerrada.")
+
+    async def __aenter__(self):
+        await self.conectar()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # --- Esquema e Índices ---
+    async def asegurar_esquema(self):
+        """Aplica las migraciones pendientes del esquema; comparte el registro de esquemas ya asegurados con Neo4jCRUD."""
+        driver = await self._obtener_driver()
+        if driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return False
+        return await self._asegurar_esquema(driver)
+
+    async def _asegurar_esquema(self, driver):
+        """Igual que asegurar_esquema, sobre un driver que conectar() todavía no publicó."""
+        clave = (self._uri, self._database)
+        async with self._lock_esquema:
+            if clave in Neo4jCRUD._esquemas_asegurados:
+                return True
+            try:
+                async with driver.session(database=self._database) as session:
+                    version_actual = await self._ejecutar_medido(session, False, _obtener_version_esquema_tx, {})
+                    if version_actual >= VERSION_ESQUEMA:
+                        Neo4jCRUD._esquemas_asegurados.add(clave)
+                        return True
+
+                    for version, sentencias in MIGRACIONES_ESQUEMA:
+                        if version <= version_actual:
+                            continue
+                        for sentencia in sentencias:
+                            result = await session.run(sentencia)
+                            await result.consume()
+                        await self._ejecutar_medido(session, True, _guardar_version_esquema_tx, {"version": version})
+                        print(f"Esquema de Neo4j actualizado a la versión {version}.")
+                Neo4jCRUD._esquemas_asegurados.add(clave)
+                return True
+            except Exception as e:
+                print(f"Advertencia al asegurar el esquema de Neo4j (constraints/índices): {e}")
+                return False
+
+    async def reportar_uso_de_indices(self):
+        """Igual que Neo4jCRUD.reportar_uso_de_indices: EXPLAIN de las consultas que buscan por propiedad."""
+        driver = await self._obtener_driver()
+        if driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return {}
+        reporte = {}
+        async with driver.session(database=self._database) as session:
+            for nombre_metodo, query, params_query in Neo4jCRUD._consultas_uso_de_indices():
+                try:
+                    result = await session.run("EXPLAIN " + query, **params_query)
+                    summary = await result.consume()
+                except Exception as e:
+                    print(f"No se pudo obtener el plan de '{nombre_metodo}': {e}")
+                    continue
+                reporte[nombre_metodo] = Neo4jCRUD._uso_de_indices_del_plan(nombre_metodo, summary.plan)
+        return reporte
+
+    # --- Instrumentación ---
+    async def _ejecutar_medido(self, session, escritura, tx_function, kwargs, nombre_metrica=None):
+        """Igual que Neo4jCRUD._ejecutar_medido, para las funciones transaccionales asíncronas de este módulo."""
+        ejecutar = session.execute_write if escritura else session.execute_read
+        if not self._instrumentacion_activa:
+            async def _tx_en_memoria(tx, **kwargs_tx):
+                return await tx_function(_TxAsyncEnMemoria(tx), **kwargs_tx)
+            return await ejecutar(_tx_en_memoria, **kwargs)
+
+        nombre_metrica = nombre_metrica or getattr(tx_function, "__name__", repr(tx_function))
+        tipo = "escritura" if escritura else "lectura"
+        consultas = []
+        tasa_muestreo_profile = self._tasa_muestreo_profile
+
+        async def _tx_medida(tx, **kwargs_tx):
+            # Si el driver reintenta la transacción, solo cuenta el último intento.
+            consultas.clear()
+            return await tx_function(_TxAsyncEnMemoria(tx, consultas, tasa_muestreo_profile), **kwargs_tx)
+
+        inicio = time.perf_counter()
+        try:
+            resultado = await ejecutar(_tx_medida, **kwargs)
+        except Exception as e:
+            METRICAS_NEO4J.registrar_transaccion(nombre_metrica, tipo, time.perf_counter() - inicio, consultas, error=type(e).__name__)
+            raise
+        METRICAS_NEO4J.registrar_transaccion(nombre_metrica, tipo, time.perf_counter() - inicio, consultas)
+        return resultado
+
+    def configurar_instrumentacion(self, activa=True, tasa_muestreo_profile=0.0):
+        """Igual que Neo4jCRUD.configurar_instrumentacion; las métricas se comparten con Neo4jCRUD."""
+        if not 0.0 <= tasa_muestreo_profile <= 1.0:
+            print("Error: tasa_muestreo_profile debe estar entre 0 y 1.")
+            return False
+        self._instrumentacion_activa = activa
+        self._tasa_muestreo_profile = tasa_muestreo_profile
+        return True
+
+    def obtener_metricas(self):
+        return METRICAS_NEO4J.a_dict()
+
+    def exportar_metricas_json(self):
+        return METRICAS_NEO4J.a_json()
+
+    def exportar_metricas_prometheus(self):
+        return METRICAS_NEO4J.a_prometheus()
+
+    def reiniciar_metricas(self):
+        METRICAS_NEO4J.reiniciar()
+
+    async def _ejecutar_transaccion(self, tx_function, **kwargs):
+        """
+        Método auxiliar para ejecutar una transacción de escritura.
+        Retorna (resultado, versión del grafo que dejó la escritura), o (None, None) si falla.
+        Si la escritura no cambió nada la versión no se incrementa y se retorna None en su lugar.
+        """
+        if await self._obtener_driver() is None:
+            print("No hay conexión activa a Neo4j.")
+            return None, None
+
+        async def _tx_con_version(tx, **kwargs_tx):
+            tx_cambios = _TxAsyncConCambios(tx)
+            resultado = await tx_function(tx_cambios, **kwargs_tx)
+            # Solo las escrituras que cambiaron algo pasan por :MetaCamino, que serializa a los escritores.
+            version = await _incrementar_version_grafo_tx(tx) if tx_cambios.hubo_cambios else None
+            return resultado, version
+
+        async with self._driver.session(database=self._database) as session:
+            try:
+                resultado, version = await self._ejecutar_medido(session, True, _tx_con_version, kwargs, tx_function.__name__)
+                if version is not None:
+                    self._instantanea_verificada_en = 0.0
+                    self._cache_lecturas.invalidar()
+                return resultado, version
+            except exceptions.ConstraintError as e:
+                print(f"Error de restricción (ConstraintError): {e}")
+                return None, None
+            except Exception as e:
+                print(f"Error durante la transacción de escritura: {e}")
+                return None, None
+
+    async def _ejecutar_lectura(self, tx_function, **kwargs):
+        """
+        Método auxiliar para ejecutar una transacción de lectura.
+        Los resultados se guardan en la caché de lecturas; cualquier escritura la invalida.
+        """
+        if await self._obtener_driver() is None:
+            print("No hay conexión activa a Neo4j.")
+            return []
+        cache = self._cache_lecturas
+        clave = CacheLecturas.clave(tx_function, kwargs)
+        encontrado, resultado = cache.obtener(clave)
+        if encontrado:
+            return resultado
+        generacion = cache.generacion()
+        async with self._driver.session(database=self._database) as session:
+            try:
+                resultado = await self._ejecutar_medido(session, False, tx_function, kwargs)
+            except Exception as e:
+                print(f"Error durante la transacción de lectura: {e}")
+                return []
+        # Si una escritura invalidó la caché mientras se leía, el resultado puede ser anterior a ella.
+        cache.guardar(clave, resultado, generacion)
+        return resultado
+
+    async def _iterar_paginado(self, tx_pagina, tamano_pagina, **kwargs):
+        """Generador asíncrono equivalente a Neo4jCRUD._iterar_paginado (páginas por nombre)."""
+        if await self._obtener_driver() is None:
+            print("No hay conexión activa a Neo4j.")
+            return
+        if tamano_pagina <= 0:
+            print("Error: tamano_pagina debe ser mayor que cero.")
+            return
+        ultimo_nombre = ""
+        async with self._driver.session(database=self._database, fetch_size=tamano_pagina) as session:
+            while True:
+                try:
+                    pagina = await self._ejecutar_medido(session, False, tx_pagina, dict(kwargs, ultimo_nombre=ultimo_nombre, limite=tamano_pagina))
+                except Exception as e:
+                    print(f"Error durante la lectura paginada: {e}")
+                    return
+                for registro in pagina:
+                    yield registro
+                if len(pagina) < tamano_pagina:
+                    return
+                ultimo_nombre = pagina[-1]["nombre"]
+
+    def configurar_cache_lecturas(self, max_entradas=256, ttl_segundos=30.0):
+        """Ajusta el tamaño máximo y el tiempo de vida de la caché de lecturas (0 entradas la desactiva)."""
+        self._cache_lecturas = CacheLecturas(max_entradas=max_entradas, ttl_segundos=ttl_segundos)
+
+    def invalidar_cache_lecturas(self):
+        """Descarta todos los resultados en caché."""
+        self._cache_lecturas.invalidar()
+
+    def estadisticas_cache_lecturas(self):
+        """Retorna aciertos, fallos, invalidaciones y ocupación de la caché de lecturas."""
+        return self._cache_lecturas.estadisticas()
+
+    # --- Instantánea Local ---
+    async def activar_instantanea_local(self, intervalo_verificacion=30.0, instantanea=None):
+        """Igual que Neo4jCRUD.activar_instantanea_local: carga el grafo de cursos en memoria."""
+        if await self._obtener_driver() is None:
+            print("No hay conexión activa a Neo4j.")
+            return False
+        self._intervalo_verificacion_instantanea = intervalo_verificacion
+        self._instantanea_activa = True
+        async with self._lock_instantanea:
+            if instantanea is None:
+                return await self._recargar_instantanea()
+            self._instantanea = instantanea.precalcular_clausura()
+            self._instantanea_verificada_en = 0.0
+        return await self._instantanea_vigente() is not None
+
+    async def desactivar_instantanea_local(self):
+        """Vuelve a resolver todas las consultas contra Neo4j y libera la instantánea."""
+        async with self._lock_instantanea:
+            self._instantanea_activa = False
+            self._instantanea = None
+
+    async def instantanea_local(self):
+        """Retorna la instantánea local si está activa y al día con Neo4j, o None."""
+        return await self._instantanea_vigente()
+
+    async def version_grafo(self):
+        """Igual que Neo4jCRUD.version_grafo: versión de la instantánea vigente o la de Neo4j."""
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.version
+        if await self._obtener_driver() is None:
+            print("No hay conexión activa a Neo4j.")
+            return None
+        try:
+            async with self._driver.session(database=self._database) as session:
+                return await self._ejecutar_medido(session, False, _obtener_version_grafo_tx, {})
+        except Exception as e:
+            print(f"No se pudo leer la versión del grafo: {e}")
+            return None
+
+    async def _recargar_instantanea(self):
+        try:
+            async with self._driver.session(database=self._database) as session:
+                inicio = time.perf_counter()
+                instantanea = await self._ejecutar_medido(session, False, _cargar_instantanea_tx, {})
+            # La clausura se arma antes de publicar la instantánea: las consultas solo la leen.
+            self._instantanea = instantanea.precalcular_clausura()
+            self._instantanea_verificada_en = time.monotonic()
+            print(f"Instantánea local del grafo cargada: {len(self._instantanea)} nodos, versión {self._instantanea.version} "
+                  f"({time.perf_counter() - inicio:.2f}s).")
+            return True
+        except Exception as e:
+            print(f"Error al cargar la instantánea local del grafo: {e}")
+            self._instantanea = None
+            return False
+
+    async def _instantanea_vigente(self):
+        """Retorna la instantánea local si está activa y al día con Neo4j, o None."""
+        if not self._instantanea_activa or self._driver is None:
+            return None
+        async with self._lock_instantanea:
+            if time.monotonic() - self._instantanea_verificada_en >= self._intervalo_verificacion_instantanea:
+                try:
+                    async with self._driver.session(database=self._database) as session:
+                        version_actual = await self._ejecutar_medido(session, False, _obtener_version_grafo_tx, {})
+                except Exception as e:
+                    print(f"No se pudo verificar la versión del grafo: {e}")
+                    return None
+                if self._instantanea is None or version_actual != self._instantanea.version:
+                    if not await self._recargar_instantanea():
+                        return None
+                else:
+                    self._instantanea_verificada_en = time.monotonic()
+            return self._instantanea
+
+    def _actualizar_instantanea(self, cambio, version):
+        """Aplica a la instantánea local una escritura ya confirmada, si estaba al día justo antes de ella."""
+        instantanea = self._instantanea
+        if instantanea is None or version != instantanea.version + 1:
+            return
+        cambio(instantanea)
+        instantanea.version = version
+        self._instantanea_verificada_en = time.monotonic()
+
+    # --- CRUD Vocaciones ---
+    async def crear_vocacion(self, nombre):
+        """Crea un nuevo nodo Vocacion."""
+        resultado, version = await self._ejecutar_transaccion(_crear_vocacion_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_nodo(resultado["id_interno_neo4j"], "Vocacion", resultado["nombre"]), version)
+        return resultado
+
+    async def obtener_vocaciones(self):
+        """Obtiene todas las vocaciones."""
+        return await self._ejecutar_lectura(_obtener_vocaciones_tx)
+
+    def iterar_vocaciones(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """Generador asíncrono de vocaciones paginado por nombre (usar con 'async for')."""
+        return self._iterar_paginado(_obtener_pagina_vocaciones_tx, tamano_pagina)
+
+    async def actualizar_vocacion(self, nombre_actual, nuevo_nombre):
+        """Actualiza el nombre de una vocación existente."""
+        resultado, _ = await self._ejecutar_transaccion(_actualizar_vocacion_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre)
+        return resultado
+
+    async def eliminar_vocacion(self, nombre):
+        """Elimina una vocación y sus relaciones TIENE_CURSO."""
+        resultado, version = await self._ejecutar_transaccion(_eliminar_vocacion_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.eliminar_por_nombre("Vocacion", nombre), version)
+        return resultado
+
+    # --- CRUD Cursos ---
+    async def crear_curso(self, nombre, dificultad):
+        """Crea un nuevo nodo Curso."""
+        resultado, version = await self._ejecutar_transaccion(_crear_curso_tx, nombre=nombre, dificultad=dificultad)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_nodo(resultado["id_interno_neo4j"], "Curso", resultado["nombre"], resultado["dificultad"]), version)
+        return resultado
+
+    async def obtener_cursos(self):
+        """Obtiene todos los cursos."""
+        return await self._ejecutar_lectura(_obtener_cursos_tx)
+
+    def iterar_cursos(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """Generador asíncrono de cursos paginado por nombre (usar con 'async for')."""
+        return self._iterar_paginado(_obtener_pagina_cursos_tx, tamano_pagina)
+
+    async def actualizar_curso(self, nombre_actual, nuevo_nombre=None, nueva_dificultad=None):
+        """Actualiza propiedades de un curso existente."""
+        if nuevo_nombre is None and nueva_dificultad is None:
+            print("Debe proporcionar al menos un nuevo nombre o una nueva dificultad para actualizar.")
+            return None
+        resultado, _ = await self._ejecutar_transaccion(_actualizar_curso_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre, nueva_dificultad=nueva_dificultad)
+        return resultado
+
+    async def eliminar_curso(self, nombre):
+        """Elimina un curso y todas sus relaciones."""
+        resultado, version = await self._ejecutar_transaccion(_eliminar_curso_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.eliminar_por_nombre("Curso", nombre), version)
+        return resultado
+
+    # --- Gestión de Relaciones ---
+    async def vincular_vocacion_a_curso(self, nombre_vocacion, nombre_curso):
+        """Crea una relación TIENE_CURSO de una Vocacion a un Curso (primer curso de una rama)."""
+        resultado, version = await self._ejecutar_transaccion(_vincular_vocacion_a_curso_tx, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_relacion_por_nombres("Vocacion", nombre_vocacion, nombre_curso, "TIENE_CURSO"), version)
+        return resultado
+
+    async def vincular_curso_a_curso(self, nombre_curso_origen, nombre_curso_destino):
+        """Crea una relación PRECEDE_A entre dos cursos."""
+        resultado, version = await self._ejecutar_transaccion(_vincular_curso_a_curso_tx, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_relacion_por_nombres("Curso", nombre_curso_origen, nombre_curso_destino, "PRECEDE_A"), version)
+        return resultado
+
+    # --- Carga de Estructuras ---
+    async def crear_vocacion_con_ramas_desde_dict(self, datos_vocacion_completa, modo="recursivo"):
+        """
+        Crea (o actualiza) una vocación con todas sus ramas de cursos a partir de un diccionario.
+        En modo="recursivo" cada curso cuesta una ida y vuelta al servidor; para árboles grandes use modo="masivo",
+        o modo="diferencial" para recargar una vocación existente escribiendo solo lo que cambió.
+        """
+        if await self._obtener_driver() is None:
+            print("Error: No hay conexión activa a Neo4j.")
+            return None
+
+        if modo not in MODOS_CARGA_ASYNC:
+            print(f"Error: Modo de carga '{modo}' no válido. Use 'recursivo', 'masivo' o 'diferencial'.")
+            return None
+
+        tx_carga = MODOS_CARGA_ASYNC[modo]
+
+        async def tx_estructura(tx, datos_voc):
+            tx_cambios = _TxAsyncConCambios(tx)
+            resultado_tx = await tx_carga(tx_cambios, datos_voc)
+            if tx_cambios.hubo_cambios:
+                await _incrementar_version_grafo_tx(tx)
+            return resultado_tx, tx_cambios.hubo_cambios
+
+        async with self._driver.session(database=self._database) as session:
+            try:
+                resultado, hubo_cambios = await self._ejecutar_medido(session, True, tx_estructura, {"datos_voc": datos_vocacion_completa}, tx_carga.__name__)
+                if hubo_cambios:
+                    self._instantanea_verificada_en = 0.0
+                    self._cache_lecturas.invalidar()
+                print(f"Resultado final del procesamiento de '{datos_vocacion_completa.get('vocacion_nombre')}': {resultado['status']}")
+                return resultado
+            except ValueError as ve:
+                print(f"Error de datos al procesar la estructura: {ve}")
+                return None
+            except Exception as e:
+                print(f"Error crítico durante la transacción de creación de estructura: {e}")
+                return None
+
+    async def _cargar_vocacion_con_reintentos(self, datos_voc, max_reintentos, semaforo):
+        """Versión asíncrona de Neo4jCRUD._cargar_vocacion_con_reintentos; el semáforo acota las cargas simultáneas."""
+        vocacion_nombre = datos_voc.get("vocacion_nombre")
+        intentos = 0
+        hubo_cambios = False
+
+        async def _tx_vocacion(tx, datos_voc):
+            nonlocal intentos, hubo_cambios
+            intentos += 1
+            if intentos > max_reintentos:
+                raise RuntimeError(f"Se agotaron los {max_reintentos} intentos por conflictos transitorios.")
+            if intentos > 1:
+                print(f"Conflicto transitorio al cargar '{vocacion_nombre}' (intento {intentos}/{max_reintentos}).")
+            tx_cambios = _TxAsyncConCambios(tx)
+            resultado_tx = await _crear_estructura_masiva_tx(tx_cambios, datos_voc, actualizar_cursos=False)
+            hubo_cambios = tx_cambios.hubo_cambios
+            return resultado_tx
+
+        resultado = None
+        error = None
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                async with self._driver.session(database=self._database) as session:
+                    resultado = await self._ejecutar_medido(session, True, _tx_vocacion, {"datos_voc": datos_voc}, "_crear_estructura_masiva_tx")
+            except Exception as e:
+                error = str(e)
+
+        return {
+            "vocacion_nombre": vocacion_nombre,
+            "exito": resultado is not None,
+            "segundos": time.perf_counter() - inicio,
+            "intentos": min(intentos, max_reintentos),
+            "hubo_cambios": hubo_cambios,
+            "cursos_procesados_count": resultado["cursos_procesados_count"] if resultado else 0,
+            "resultado": resultado,
+            "error": error
+        }
+
+    async def cargar_vocaciones_en_paralelo(self, lista_datos_vocaciones, max_workers=4, max_reintentos=5):
+        """
+        Igual que Neo4jCRUD.cargar_vocaciones_en_paralelo, pero con corrutinas en lugar de hilos:
+        'max_workers' es el número máximo de cargas simultáneas.
+        """
+        if await self._obtener_driver() is None:
+            print("Error: No hay conexión activa a Neo4j.")
+            return None
+
+        datos_validos = []
+        reporte_vocaciones = []
+        for datos_voc in lista_datos_vocaciones:
+            if not datos_voc.get("vocacion_nombre"):
+                print("Advertencia: Se omitió una vocación sin 'vocacion_nombre'.")
+                reporte_vocaciones.append({"vocacion_nombre": None, "exito": False, "segundos": 0.0, "intentos": 0,
+                                           "hubo_cambios": False, "cursos_procesados_count": 0, "resultado": None,
+                                           "error": "El diccionario debe contener 'vocacion_nombre'."})
+                continue
+            datos_validos.append(datos_voc)
+
+        inicio_total = time.perf_counter()
+
+        cursos_lote = {}
+        for datos_voc in datos_validos:
+            cursos, _, _, _ = Neo4jCRUD._aplanar_cursos_rama(datos_voc["vocacion_nombre"], datos_voc.get("cursos_rama", []))
+            cursos_lote.update(cursos)
+        lista_cursos = [{"nombre": nombre, "dificultad": dificultad} for nombre, dificultad in sorted(cursos_lote.items())]
+
+        async def _tx_cursos(tx, cursos):
+            tx_cambios = _TxAsyncConCambios(tx)
+            return await _crear_cursos_masivo_tx(tx_cambios, cursos), tx_cambios.hubo_cambios
+
+        async with self._driver.session(database=self._database) as session:
+            try:
+                cursos_nuevos, cursos_cambiados = await self._ejecutar_medido(session, True, _tx_cursos, {"cursos": lista_cursos}, "_crear_cursos_masivo_tx")
+                print(f"Cursos compartidos asegurados: {len(lista_cursos)} ({cursos_nuevos} nuevos).")
+            except Exception as e:
+                print(f"Error al crear los cursos compartidos de la carga paralela: {e}")
+                return None
+        segundos_cursos = time.perf_counter() - inicio_total
+
+        max_workers = max(1, min(max_workers, len(datos_validos) or 1))
+        semaforo = asyncio.Semaphore(max_workers)
+        reporte_vocaciones.extend(await asyncio.gather(
+            *(self._cargar_vocacion_con_reintentos(datos_voc, max_reintentos, semaforo) for datos_voc in datos_validos)
+        ))
+
+        if cursos_cambiados or any(r["hubo_cambios"] for r in reporte_vocaciones):
+            async with self._driver.session(database=self._database) as session:
+                try:
+                    await self._ejecutar_medido(session, True, _incrementar_version_grafo_tx, {})
+                except Exception as e:
+                    print(f"Advertencia: No se pudo actualizar la versión del grafo: {e}")
+            self._instantanea_verificada_en = 0.0
+            self._cache_lecturas.invalidar()
+
+        total_segundos = time.perf_counter() - inicio_total
+        exitosas = [r for r in reporte_vocaciones if r["exito"]]
+        total_cursos = sum(r["cursos_procesados_count"] for r in exitosas)
+        reporte = {
+            "vocaciones": reporte_vocaciones,
+            "vocaciones_exitosas": len(exitosas),
+            "vocaciones_fallidas": len(reporte_vocaciones) - len(exitosas),
+            "cursos_distintos": len(lista_cursos),
+            "max_workers": max_workers,
+            "segundos_cursos_compartidos": segundos_cursos,
+            "total_segundos": total_segundos,
+            "vocaciones_por_segundo": len(exitosas) / total_segundos if total_segundos > 0 else 0.0,
+            "cursos_por_segundo": total_cursos / total_segundos if total_segundos > 0 else 0.0
+        }
+        print(f"Carga paralela asíncrona finalizada: {reporte['vocaciones_exitosas']} exitosas, {reporte['vocaciones_fallidas']} fallidas "
+              f"en {total_segundos:.2f}s ({reporte['vocaciones_por_segundo']:.2f} vocaciones/s, {max_workers} simultáneas).")
+        return reporte
+
+    # --- Consultas Especializadas ---
+    async def obtener_cursos_por_dificultad(self, dificultad):
+        """Obtiene cursos filtrados por dificultad."""
+        return await self._ejecutar_lectura(_obtener_cursos_por_dificultad_tx, dificultad=dificultad)
+
+    def iterar_cursos_por_dificultad(self, dificultad, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """Generador asíncrono de cursos de una dificultad, paginado por nombre (usar con 'async for')."""
+        return self._iterar_paginado(_obtener_pagina_cursos_por_dificultad_tx, tamano_pagina, dificultad=dificultad)
+
+    async def obtener_cursos_siguientes(self, nombre_curso_actual):
+        """Obtiene los cursos que son directamente siguientes (precedidos por) al curso actual."""
+        return await self._ejecutar_lectura(_obtener_cursos_siguientes_tx, nombre_curso_actual=nombre_curso_actual)
+
+    async def obtener_cursos_anteriores(self, nombre_curso_actual):
+        """Obtiene los nodos (Cursos o Vocaciones) que preceden directamente al curso actual."""
+        return await self._ejecutar_lectura(_obtener_cursos_anteriores_tx, nombre_curso_actual=nombre_curso_actual)
+
+    # --- Sincronización desde MongoDB ---
+    async def aplicar_cambios_catalogo(self, vocaciones=None, cursos=None, eliminados=None):
+        """Aplica un lote de cambios del catálogo de MongoDB; ver Neo4jCRUD.aplicar_cambios_catalogo."""
+        resultado, _ = await self._ejecutar_transaccion(_aplicar_cambios_catalogo_tx, vocaciones=vocaciones or [],
+                                                        cursos=cursos or [], eliminados=eliminados or [])
+        return resultado
+
+    async def obtener_rama_cursos_por_vocacion(self, nombre_vocacion, max_depth=None):
+        """Cada curso alcanzable desde la vocación una sola vez, con su nivel mínimo (limitado por max_depth)."""
+        if max_depth is not None and max_depth < 0:
+            print("Error: max_depth debe ser un entero no negativo.")
+            return []
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_cursos_por_vocacion(nombre_vocacion, max_depth)
+        return await self._ejecutar_lectura(_obtener_rama_cursos_por_vocacion_tx, nombre_vocacion=nombre_vocacion, max_depth=max_depth)
+
+    async def obtener_cursos_directos_por_vocacion(self, nombre_vocacion):
+        """Retorna solo los cursos directamente relacionados a una vocación (inicio de cada rama)."""
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.cursos_directos_por_vocacion(nombre_vocacion)
+        return await self._ejecutar_lectura(_obtener_cursos_directos_por_vocacion_tx, nombre_vocacion=nombre_vocacion)
+
+    async def obtener_cursos_siguientes_de_lista(self, nombres_cursos_actuales):
+        """Retorna, sin duplicados, los cursos un nivel por encima de los cursos recibidos."""
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.cursos_siguientes_de_lista(nombres_cursos_actuales)
+        return await self._ejecutar_lectura(_obtener_cursos_siguientes_de_lista_tx, nombres_cursos_actuales=nombres_cursos_actuales)
+
+    async def obtener_rama_predecesora_completa(self, nombres_cursos_actuales):
+        """Retorna toda la rama de cursos y vocaciones predecesores de los cursos recibidos. Sin duplicados."""
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_predecesora_completa(nombres_cursos_actuales)
+        return await self._ejecutar_lectura(_obtener_rama_predecesora_completa_tx, nombres_cursos_actuales=nombres_cursos_actuales)
+
+    async def obtener_rama_sucesora_completa(self, nombres_cursos_actuales):
+        """Retorna toda la rama de cursos sucesores de los cursos recibidos. Sin duplicados."""
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_sucesora_completa(nombres_cursos_actuales)
+        return await self._ejecutar_lectura(_obtener_rama_sucesora_completa_tx, nombres_cursos_actuales=nombres_cursos_actuales)
+
+    async def obtener_camino_usuario(self, progreso):
+        """Rama completada, siguientes pasos y niveles del progreso recibido, en una sola consulta."""
+        if not progreso:
+            return armar_camino_usuario([], [], [])
+        instantanea = await self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.camino_usuario(progreso)
+        resultado = await self._ejecutar_lectura(_obtener_camino_usuario_tx, nombres_cursos_completados=list(progreso))
+        return resultado or armar_camino_usuario([], [], [])
+
+    async def planificar_camino(self, progreso, objetivo, tipo_objetivo="Curso"):
+        """Secuencia ordenada de cursos faltantes hasta el objetivo; ver Neo4jCRUD.planificar_camino."""
+        if not self._instantanea_activa and not await self.activar_instantanea_local():
+            return None
+        instantanea = await self._instantanea_vigente()
+        if instantanea is None:
+            print("Error: No se pudo obtener la instantánea del grafo para planificar el camino.")
+            return None
+        return self._planificador.planificar(instantanea, progreso, objetivo, tipo_objetivo)
+
+    async def planificar_caminos(self, progresos_por_usuario, objetivo, tipo_objetivo="Curso"):
+        return {usuario: await self.planificar_camino(progreso, objetivo, tipo_objetivo) for usuario, progreso in progresos_por_usuario.items()}
+
+    def estadisticas_planificador(self):
+        return self._planificador.estadisticas()
+
+
+if __name__ == "__main__":
+
+    async def demo():
+        async with AsyncNeo4jCRUD() as gestor:
+            if gestor._driver is None:
+                print("No se pudo conectar a Neo4j. Saliendo del ejemplo.")
+                return
+            cursos_completados = ["Introducción al Desarrollo Web: HTML, CSS y JavaScript"]
+
+            # Las dos lecturas de la vista de camino salen a la vez sobre el mismo pool de conexiones.
+            inicio = time.perf_counter()
+            predecesores, siguientes = await asyncio.gather(
+                gestor.obtener_rama_predecesora_completa(cursos_completados),
+                gestor.obtener_cursos_siguientes_de_lista(cursos_completados)
+            )
+            print(f"\nCamino obtenido en {time.perf_counter() - inicio:.3f}s")
+            print("Rama completada:")
+            for nodo in predecesores:
+                print(f"  - [{nodo['tipo_nodo']}] {nodo['nombre']}")
+            print("Siguientes pasos:")
+            for curso in siguientes:
+                print(f"  - {curso['nombre']} ({curso['dificultad']})")
+
+    asyncio.run(demo())
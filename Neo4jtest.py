@@ -1,93 +1,1117 @@
+import copy
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from neo4j import GraphDatabase, exceptions
+from grafomemoriatest import InstantaneaGrafo, armar_camino_usuario, niveles_bfs
+from metricastest import RegistroMetricas, formatear_fases, medir_fase
+from planificadortest import PlanificadorCaminos
+
+# --- Esquema del grafo ---
+# Cada migración se aplica una sola vez; la versión aplicada queda guardada en el nodo :MetaCamino.
+VERSION_ESQUEMA = 4
+MIGRACIONES_ESQUEMA = [
+    (1, [
+        "CREATE CONSTRAINT vocacion_nombre_unique IF NOT EXISTS FOR (v:Vocacion) REQUIRE v.nombre IS UNIQUE",
+        "CREATE CONSTRAINT curso_nombre_unique IF NOT EXISTS FOR (c:Curso) REQUIRE c.nombre IS UNIQUE",
+        "CREATE INDEX curso_dificultad_index IF NOT EXISTS FOR (c:Curso) ON (c.dificultad)",
+    ]),
+    (2, [
+        "CREATE CONSTRAINT meta_camino_nombre_unique IF NOT EXISTS FOR (m:MetaCamino) REQUIRE m.nombre IS UNIQUE",
+    ]),
+    (3, [
+        # Permite paginar por nombre los cursos de una dificultad sin ordenar todo el grupo.
+        "CREATE INDEX curso_dificultad_nombre_index IF NOT EXISTS FOR (c:Curso) ON (c.dificultad, c.nombre)",
+    ]),
+    (4, [
+        # _id de MongoDB de cada nodo, usado por la sincronización incremental del catálogo.
+        "CREATE INDEX vocacion_id_mongo_index IF NOT EXISTS FOR (v:Vocacion) ON (v.id_mongo)",
+        "CREATE INDEX curso_id_mongo_index IF NOT EXISTS FOR (c:Curso) ON (c.id_mongo)",
+    ]),
+]
+TAMANO_PAGINA_PREDETERMINADO = 500
+NOMBRE_META_CAMINO = "caminoideal"
+
+# Métricas de todas las transacciones del proceso (compartidas por todas las instancias de Neo4jCRUD).
+METRICAS_NEO4J = RegistroMetricas("neo4jcrud")
+
+# Backend del grafo usado por crear_gestor_grafo cuando no se indica uno: "neo4j" o "memoria".
+VARIABLE_BACKEND_GRAFO = "CAMINO_BACKEND_GRAFO"
+
+URI_NEO4J = "neo4j+s://ec032b96.databases.neo4j.io"
+AUTH_NEO4J = ("neo4j", "qSQTqW7Y1lh0Xeb52rKuTtFOvnFzdk02e21zfvSSzpA")
+
+# --- Consultas Cypher ---
+# Las comparten las funciones transaccionales de Neo4jCRUD y las de AsyncNeo4jCRUD (Neo4jasynctest.py).
+CYPHER_VERSION_ESQUEMA = "MATCH (m:MetaCamino {nombre: $nombre}) RETURN m.version_esquema AS version"
+CYPHER_GUARDAR_VERSION_ESQUEMA = (
+    "MERGE (m:MetaCamino {nombre: $nombre}) "
+    "SET m.version_esquema = $version"
+)
+CYPHER_VERSION_GRAFO = "MATCH (m:MetaCamino {nombre: $nombre}) RETURN m.version_grafo AS version"
+CYPHER_INCREMENTAR_VERSION_GRAFO = (
+    "MERGE (m:MetaCamino {nombre: $nombre}) "
+    "SET m.version_grafo = coalesce(m.version_grafo, 0) + 1 "
+    "RETURN m.version_grafo AS version"
+)
+CYPHER_NODOS_INSTANTANEA = (
+    "MATCH (n) WHERE n:Vocacion OR n:Curso "
+    "RETURN id(n) AS id, labels(n)[0] AS tipo_nodo, n.nombre AS nombre, n.dificultad AS dificultad"
+)
+CYPHER_RELACIONES_INSTANTANEA = (
+    "MATCH (a)-[r:TIENE_CURSO|PRECEDE_A]->(b) "
+    "WHERE (a:Vocacion OR a:Curso) AND (b:Vocacion OR b:Curso) "
+    "RETURN id(a) AS origen, id(b) AS destino, type(r) AS tipo"
+)
+
+CYPHER_CREAR_VOCACION = "CREATE (v:Vocacion {nombre: $nombre}) RETURN id(v) AS id, v.nombre AS nombre"
+CYPHER_VOCACIONES = "MATCH (v:Vocacion) RETURN id(v) AS id, v.nombre AS nombre ORDER BY v.nombre"
+CYPHER_PAGINA_VOCACIONES = (
+    "MATCH (v:Vocacion) WHERE v.nombre > $ultimo_nombre "
+    "RETURN id(v) AS id, v.nombre AS nombre ORDER BY v.nombre LIMIT $limite"
+)
+CYPHER_ACTUALIZAR_VOCACION = (
+    "MATCH (v:Vocacion {nombre: $nombre_actual}) "
+    "SET v.nombre = $nuevo_nombre "
+    "RETURN id(v) AS id, v.nombre AS nombre_actualizado"
+)
+CYPHER_ELIMINAR_VOCACION = (
+    "MATCH (v:Vocacion {nombre: $nombre}) "
+    "DETACH DELETE v"
+)
+CYPHER_MERGE_VOCACION = "MERGE (v:Vocacion {nombre: $nombre}) RETURN id(v) AS id, v.nombre AS nombre"
+
+CYPHER_CREAR_CURSO = "CREATE (c:Curso {nombre: $nombre, dificultad: $dificultad}) RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
+CYPHER_CURSOS = "MATCH (c:Curso) RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre"
+CYPHER_PAGINA_CURSOS = (
+    "MATCH (c:Curso) WHERE c.nombre > $ultimo_nombre "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre LIMIT $limite"
+)
+CYPHER_ELIMINAR_CURSO = (
+    "MATCH (c:Curso {nombre: $nombre}) "
+    "DETACH DELETE c"
+)
+CYPHER_MERGE_CURSO = (
+    "MERGE (c:Curso {nombre: $nombre}) "
+    "ON CREATE SET c.dificultad = $dificultad "
+    "ON MATCH SET c.dificultad = $dificultad "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
+)
+CYPHER_VINCULAR_VOCACION_CURSO = (
+    "MATCH (v:Vocacion {nombre: $nombre_vocacion}) "
+    "MATCH (c:Curso {nombre: $nombre_curso}) "
+    "MERGE (v)-[r:TIENE_CURSO]->(c) "
+    "RETURN type(r) AS tipo_relacion"
+)
+CYPHER_VINCULAR_CURSO_CURSO = (
+    "MATCH (c1:Curso {nombre: $nombre_curso_origen}) "
+    "MATCH (c2:Curso {nombre: $nombre_curso_destino}) "
+    "MERGE (c1)-[r:PRECEDE_A]->(c2) "
+    "RETURN type(r) AS tipo_relacion"
+)
+CYPHER_CURSOS_POR_DIFICULTAD = (
+    "MATCH (c:Curso {dificultad: $dificultad}) "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre"
+)
+CYPHER_PAGINA_CURSOS_POR_DIFICULTAD = (
+    "MATCH (c:Curso {dificultad: $dificultad}) WHERE c.nombre > $ultimo_nombre "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre LIMIT $limite"
+)
+CYPHER_CURSOS_SIGUIENTES = (
+    "MATCH (c_actual:Curso {nombre: $nombre_curso_actual})-[:PRECEDE_A]->(c_siguiente:Curso) "
+    "RETURN id(c_siguiente) AS id, c_siguiente.nombre AS nombre, c_siguiente.dificultad AS dificultad ORDER BY c_siguiente.nombre"
+)
+CYPHER_CURSOS_ANTERIORES = (
+    "MATCH (nodo_anterior)-[r:PRECEDE_A|TIENE_CURSO]->(c_actual:Curso {nombre: $nombre_curso_actual}) "
+    "RETURN id(nodo_anterior) AS id, labels(nodo_anterior)[0] AS tipo_nodo, nodo_anterior.nombre AS nombre, "
+    "CASE WHEN 'Curso' IN labels(nodo_anterior) THEN nodo_anterior.dificultad ELSE NULL END AS dificultad "
+    "ORDER BY nodo_anterior.nombre"
+)
+
+# Carga de estructuras (modos masivo y diferencial, carga paralela).
+CYPHER_MERGE_CURSOS_LOTE = (
+    "UNWIND $cursos AS curso "
+    "MERGE (c:Curso {nombre: curso.nombre}) "
+    "SET c.dificultad = curso.dificultad "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
+)
+CYPHER_LEER_CURSOS_LOTE = (
+    "UNWIND $cursos AS curso "
+    "MATCH (c:Curso {nombre: curso.nombre}) "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
+)
+CYPHER_CREAR_CURSOS_MASIVO = (
+    "UNWIND $cursos AS curso "
+    "MERGE (c:Curso {nombre: curso.nombre}) "
+    "SET c.dificultad = curso.dificultad"
+)
+CYPHER_VINCULAR_RAICES = (
+    "MATCH (v:Vocacion {nombre: $nombre_vocacion}) "
+    "UNWIND $nombres_cursos AS nombre_curso "
+    "MATCH (c:Curso {nombre: nombre_curso}) "
+    "MERGE (v)-[:TIENE_CURSO]->(c)"
+)
+CYPHER_VINCULAR_LOTE = (
+    "UNWIND $vinculos AS vinculo "
+    "MATCH (c1:Curso {nombre: vinculo.origen}) "
+    "MATCH (c2:Curso {nombre: vinculo.destino}) "
+    "MERGE (c1)-[:PRECEDE_A]->(c2)"
+)
+CYPHER_SUBGRAFO_VOCACION = (
+    "OPTIONAL MATCH (v:Vocacion {nombre: $nombre_vocacion}) "
+    "CALL { "
+    "  WITH v "
+    "  OPTIONAL MATCH (v)-[:TIENE_CURSO|PRECEDE_A*]->(n:Curso) "
+    "  RETURN collect(DISTINCT n) AS alcanzables "
+    "} "
+    "OPTIONAL MATCH (d:Curso) WHERE d.nombre IN $nombres_cursos "
+    "WITH v, alcanzables, collect(DISTINCT d) AS deseados "
+    "WITH v, alcanzables, alcanzables + [x IN deseados WHERE NOT x IN alcanzables] AS nodos "
+    "RETURN v IS NOT NULL AS existe_vocacion, id(v) AS id_vocacion, "
+    "CASE WHEN v IS NULL THEN [] ELSE [(v)-[:TIENE_CURSO]->(r:Curso) | r.nombre] END AS raices, "
+    "[x IN alcanzables | x.nombre] AS alcanzables, "
+    "[x IN nodos | {id: id(x), nombre: x.nombre, dificultad: x.dificultad}] AS cursos, "
+    "[x IN nodos | [(x)-[:PRECEDE_A]->(y:Curso) WHERE y IN nodos | [x.nombre, y.nombre]]] AS aristas"
+)
+CYPHER_QUITAR_RAICES = (
+    "MATCH (v:Vocacion {nombre: $nombre_vocacion})-[r:TIENE_CURSO]->(c:Curso) "
+    "WHERE c.nombre IN $nombres_cursos "
+    "DELETE r"
+)
+# Se ejecuta después de quitar los cursos iniciales sobrantes, para no contar como "de otra vocación" a esta misma.
+CYPHER_QUITAR_VINCULOS = (
+    "UNWIND $vinculos AS vinculo "
+    "MATCH (c1:Curso {nombre: vinculo.origen})-[r:PRECEDE_A]->(c2:Curso {nombre: vinculo.destino}) "
+    "WHERE NOT EXISTS { MATCH (otra:Vocacion)-[:TIENE_CURSO|PRECEDE_A*]->(c1) WHERE otra.nombre <> $nombre_vocacion } "
+    "DELETE r "
+    "RETURN count(r) AS eliminados"
+)
+
+# Sincronización del catálogo: etiqueta -> consulta (las propiedades extra dependen de la etiqueta).
+_PROPIEDADES_CATALOGO = {"Vocacion": "", "Curso": ", n.dificultad = fila.dificultad"}
+CYPHER_CATALOGO_POR_ID = {
+    etiqueta: (f"UNWIND $filas AS fila MATCH (n:{etiqueta} {{id_mongo: fila.id_mongo}}) "
+               f"SET n.nombre = fila.nombre{propiedades} RETURN fila.id_mongo AS id_mongo")
+    for etiqueta, propiedades in _PROPIEDADES_CATALOGO.items()
+}
+CYPHER_CATALOGO_POR_NOMBRE = {
+    etiqueta: (f"UNWIND $filas AS fila MERGE (n:{etiqueta} {{nombre: fila.nombre}}) "
+               f"SET n.id_mongo = fila.id_mongo{propiedades}")
+    for etiqueta, propiedades in _PROPIEDADES_CATALOGO.items()
+}
+CYPHER_CATALOGO_ELIMINAR = {
+    etiqueta: [f"UNWIND $filas AS fila MATCH (n:{etiqueta}) WHERE {condicion} DETACH DELETE n RETURN count(*) AS eliminados"
+               for condicion in ("n.id_mongo = fila.id_mongo", "n.nombre = fila.nombre AND n.id_mongo IS NULL")]
+    for etiqueta in _PROPIEDADES_CATALOGO
+}
+
+# Consultas de caminos.
+CYPHER_CURSOS_DIRECTOS = (
+    "MATCH (v:Vocacion {nombre: $nombre_vocacion})-[:TIENE_CURSO]->(c:Curso) "
+    "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad "
+    "ORDER BY c.nombre"
+)
+CYPHER_SIGUIENTES_DE_LISTA = (
+    "UNWIND $nombres_cursos AS nombre_curso_actual "
+    "MATCH (:Curso {nombre: nombre_curso_actual})-[:PRECEDE_A]->(c_siguiente:Curso) "
+    "WITH c_siguiente "
+    "RETURN DISTINCT id(c_siguiente) AS id, c_siguiente.nombre AS nombre, c_siguiente.dificultad AS dificultad "
+    "ORDER BY nombre"
+)
+CYPHER_RAMA_PREDECESORA = (
+    "UNWIND $nombres_cursos AS nombre_curso_actual "
+    "MATCH (c_actual:Curso {nombre: nombre_curso_actual}) "
+    "MATCH (predecesor)-[:TIENE_CURSO|PRECEDE_A*]->(c_actual) "
+    "WITH c_actual, collect(DISTINCT predecesor) AS predecesores "
+    "UNWIND [c_actual] + predecesores AS nodo_en_rama "
+    "WITH DISTINCT nodo_en_rama "
+    "RETURN id(nodo_en_rama) AS id, labels(nodo_en_rama)[0] AS tipo_nodo, nodo_en_rama.nombre AS nombre, "
+    "CASE WHEN 'Curso' IN labels(nodo_en_rama) THEN nodo_en_rama.dificultad ELSE NULL "
+    "END AS dificultad "
+    "ORDER BY tipo_nodo DESC, nombre "
+)
+CYPHER_RAMA_SUCESORA = (
+    "UNWIND $nombres_cursos AS nombre_curso_actual "
+    "MATCH (c_actual:Curso {nombre: nombre_curso_actual}) "
+    "MATCH (c_actual)-[:TIENE_CURSO|PRECEDE_A*]->(sucesor) "
+    "WITH c_actual, collect(DISTINCT sucesor) AS sucesores "
+    "UNWIND [c_actual] + sucesores AS nodo_en_rama "
+    "WITH DISTINCT nodo_en_rama "
+    "RETURN id(nodo_en_rama) AS id, labels(nodo_en_rama)[0] AS tipo_nodo, nodo_en_rama.nombre AS nombre, "
+    "CASE WHEN 'Curso' IN labels(nodo_en_rama) THEN nodo_en_rama.dificultad ELSE NULL "
+    "END AS dificultad "
+    "ORDER BY tipo_nodo DESC, nombre "
+)
+CYPHER_CAMINO_USUARIO = (
+    "UNWIND $nombres_cursos AS nombre_curso "
+    "MATCH (c_actual:Curso {nombre: nombre_curso}) "
+    "OPTIONAL MATCH (predecesor)-[:TIENE_CURSO|PRECEDE_A*]->(c_actual) "
+    "WITH collect(DISTINCT c_actual) AS completados, collect(DISTINCT predecesor) AS predecesores "
+    "WITH completados, completados + [n IN predecesores WHERE NOT n IN completados] AS rama "
+    "UNWIND completados AS c_completado "
+    "OPTIONAL MATCH (c_completado)-[:PRECEDE_A]->(c_siguiente:Curso) "
+    "WHERE NOT c_siguiente IN completados "
+    "WITH rama, collect(DISTINCT c_siguiente) AS siguientes "
+    "UNWIND rama AS origen "
+    "OPTIONAL MATCH (origen)-[:TIENE_CURSO|PRECEDE_A]->(destino) "
+    "WHERE destino IN rama OR destino IN siguientes "
+    "WITH rama, siguientes, collect(CASE WHEN destino IS NULL THEN NULL ELSE [id(origen), id(destino)] END) AS aristas "
+    "RETURN [n IN rama | {id: id(n), tipo_nodo: labels(n)[0], nombre: n.nombre, dificultad: n.dificultad}] AS rama, "
+    "[n IN siguientes | {id: id(n), nombre: n.nombre, dificultad: n.dificultad}] AS siguientes, "
+    "aristas"
+)
+
+
+def consulta_actualizar_curso(nuevo_nombre, nueva_dificultad):
+    """Retorna (query, parámetros extra) para actualizar un curso, o (None, None) si no hay nada que cambiar."""
+    query_parts = []
+    params = {}
+    if nuevo_nombre is not None:
+        query_parts.append("c.nombre = $nuevo_nombre")
+        params["nuevo_nombre"] = nuevo_nombre
+    if nueva_dificultad is not None:
+        query_parts.append("c.dificultad = $nueva_dificultad")
+        params["nueva_dificultad"] = nueva_dificultad
+    if not query_parts:
+        return None, None
+    set_clause = "SET " + ", ".join(query_parts)
+    query = (
+        f"MATCH (c:Curso {{nombre: $nombre_actual}}) "
+        f"{set_clause} "
+        "RETURN id(c) AS id, c.nombre AS nombre_actualizado, c.dificultad AS dificultad_actualizada"
+    )
+    return query, params
+
+
+def consulta_rama_cursos(max_depth):
+    """
+    Trae una sola vez cada nodo alcanzable desde la vocación (DISTINCT, sin enumerar caminos)
+    junto con sus sucesores directos, hasta 'max_depth' saltos.
+    """
+    limite = "" if max_depth is None else str(int(max_depth))
+    return (
+        "MATCH (v:Vocacion {nombre: $nombre_vocacion}) "
+        f"MATCH (v)-[:TIENE_CURSO|PRECEDE_A*0..{limite}]->(n) "
+        "WITH DISTINCT v, n "
+        "OPTIONAL MATCH (n)-[:TIENE_CURSO|PRECEDE_A]->(siguiente:Curso) "
+        "RETURN id(v) AS id_vocacion, id(n) AS id, 'Curso' IN labels(n) AS es_curso, n.nombre AS nombre, "
+        "n.dificultad AS dificultad, collect(DISTINCT id(siguiente)) AS sucesores"
+    )
+
+
+# --- Conversión de registros (compartida con Neo4jasynctest.py) ---
+def _vocacion_de_registro(record):
+    return {"id_interno_neo4j": record["id"], "nombre": record["nombre"]}
+
+
+def _curso_de_registro(record):
+    return {"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]}
+
+
+def _nodo_de_registro(record):
+    """Nodo de una rama (Curso o Vocacion); solo los cursos llevan 'dificultad'."""
+    data = {"id_interno_neo4j": record["id"], "tipo_nodo": record["tipo_nodo"], "nombre": record["nombre"]}
+    if record["tipo_nodo"] == "Curso":
+        data["dificultad"] = record["dificultad"]
+    return data
+
+
+def _rama_cursos_de_registros(registros, max_depth):
+    """Calcula en anchura el nivel mínimo de cada curso a partir de las filas de consulta_rama_cursos."""
+    nodos = {}
+    raices = set()
+    for record in registros:
+        raices.add(record["id_vocacion"])
+        nodos[record["id"]] = record
+    niveles = niveles_bfs(raices, lambda id_nodo: nodos[id_nodo]["sucesores"] if id_nodo in nodos else [], max_depth)
+    cursos = [
+        {"id_interno_neo4j": id_nodo, "nombre": nodos[id_nodo]["nombre"], "dificultad": nodos[id_nodo]["dificultad"], "nivel_en_rama": nivel}
+        for id_nodo, nivel in niveles.items() if id_nodo in nodos and nodos[id_nodo]["es_curso"]
+    ]
+    cursos.sort(key=lambda curso: (curso["nivel_en_rama"], curso["nombre"] is None, curso["nombre"] or ""))
+    return cursos
+
+
+def _camino_de_registro(record):
+    """Convierte la fila de CYPHER_CAMINO_USUARIO en el resultado de obtener_camino_usuario."""
+    if not record:
+        return armar_camino_usuario([], [], [])
+    rama = [_nodo_de_registro(nodo) for nodo in record["rama"]]
+    siguientes = [_curso_de_registro(nodo) for nodo in record["siguientes"]]
+    return armar_camino_usuario(rama, siguientes, [tuple(arista) for arista in record["aristas"]])
+
+
+def _subgrafo_de_registro(record):
+    return {
+        "existe_vocacion": record["existe_vocacion"],
+        "id_vocacion": record["id_vocacion"],
+        "raices": set(record["raices"]),
+        "alcanzables": set(record["alcanzables"]),
+        "cursos": {curso["nombre"]: curso for curso in record["cursos"]},
+        "aristas": {tuple(arista) for aristas_nodo in record["aristas"] for arista in aristas_nodo}
+    }
+
+
+def _diferencia_estructura(cursos, raices, vinculos, actual):
+    """
+    Compara el árbol pedido (salida de _aplanar_cursos_rama) con el subgrafo actual de la vocación y
+    retorna lo que hay que escribir: cursos, raíces y vínculos a agregar o quitar, y el resumen de cambios.
+    """
+    cursos_a_escribir = [{"nombre": nombre, "dificultad": dificultad} for nombre, dificultad in sorted(cursos.items())
+                         if nombre not in actual["cursos"] or actual["cursos"][nombre]["dificultad"] != dificultad]
+    deseadas = {(vinculo["origen"], vinculo["destino"]) for vinculo in vinculos}
+    diferencia = {
+        "cursos_a_escribir": cursos_a_escribir,
+        "raices_a_agregar": sorted(set(raices) - actual["raices"]),
+        "raices_a_quitar": sorted(actual["raices"] - set(raices)),
+        "vinculos_a_agregar": sorted(deseadas - actual["aristas"]),
+        "vinculos_a_quitar": sorted(arista for arista in actual["aristas"] - deseadas if arista[0] in actual["alcanzables"]),
+    }
+    diferencia["cambios"] = {
+        "vocacion_creada": not actual["existe_vocacion"],
+        "cursos_creados": sum(1 for curso in cursos_a_escribir if curso["nombre"] not in actual["cursos"]),
+        "cursos_actualizados": sum(1 for curso in cursos_a_escribir if curso["nombre"] in actual["cursos"]),
+        "raices_agregadas": len(diferencia["raices_a_agregar"]),
+        "raices_eliminadas": len(diferencia["raices_a_quitar"]),
+        "vinculos_agregados": len(diferencia["vinculos_a_agregar"]),
+        "vinculos_eliminados": 0
+    }
+    return diferencia
+
+
+def _resultado_estructura(voc_result, cursos, cursos_por_nombre, orden_procesado, cambios=None):
+    """Arma el resultado de una carga de estructura; falla si algún curso pedido no quedó en el grafo."""
+    faltantes = [nombre for nombre in cursos if nombre not in cursos_por_nombre]
+    if faltantes:
+        raise Exception(f"No se pudieron crear o encontrar los cursos: {faltantes}")
+    cursos_creados_info = [cursos_por_nombre[nombre] for nombre in orden_procesado]
+    resultado = {
+        "vocacion_procesada": voc_result,
+        "cursos_procesados_count": len(cursos_creados_info),
+        "detalle_cursos": cursos_creados_info,
+    }
+    if cambios is not None:
+        resultado["cambios"] = cambios
+    resultado["status"] = "Estructura de vocación y cursos procesada."
+    return resultado
+
+
+class _ConsultaCapturada(Exception):
+    """Se lanza desde _TxCaptura para detener la función transaccional una vez capturada su consulta."""
+    def __init__(self, query, params):
+        super().__init__(query)
+        self.query = query
+        self.params = params
+
+
+class _TxCaptura:
+    """Transacción ficticia que registra la primera consulta que ejecuta una función transaccional, sin enviarla."""
+    def run(self, query, parameters=None, **kwargs):
+        params = dict(parameters or {})
+        params.update(kwargs)
+        raise _ConsultaCapturada(query, params)
+
+
+def _capturar_consulta(tx_function, **kwargs):
+    """Retorna (query, params) de la primera sentencia Cypher que ejecutaría tx_function."""
+    try:
+        tx_function(_TxCaptura(), **kwargs)
+    except _ConsultaCapturada as captura:
+        return captura.query, captura.params
+    return None, None
+
+
+class _ResultadoEnMemoria:
+    """Resultado ya leído por completo, con la misma interfaz que usan las funciones transaccionales."""
+    def __init__(self, registros, resumen):
+        self._registros = registros
+        self._resumen = resumen
+
+    def __iter__(self):
+        return iter(self._registros)
+
+    def single(self):
+        return self._registros[0] if self._registros else None
+
+    def data(self):
+        return [registro.data() for registro in self._registros]
+
+    def consume(self):
+        return self._resumen
+
+
+def _db_hits_del_perfil(perfil):
+    """Suma los db hits de todos los operadores de un plan PROFILE."""
+    if not perfil:
+        return 0
+    return perfil.get("dbHits", 0) + sum(_db_hits_del_perfil(hijo) for hijo in perfil.get("children", []))
+
+
+def _metricas_de_consulta(registros, resumen, perfilada):
+    return {
+        "disponible_ms": resumen.result_available_after,
+        "consumido_ms": resumen.result_consumed_after,
+        "filas": len(registros),
+        "db_hits": _db_hits_del_perfil(resumen.profile) if perfilada else None
+    }
+
+
+class _TxInstrumentada:
+    """
+    Envuelve la transacción real: cada consulta se lee completa y se anotan las métricas de su
+    ResultSummary. Con probabilidad 'tasa_muestreo_profile' la consulta se ejecuta con PROFILE.
+    """
+    def __init__(self, tx, consultas, tasa_muestreo_profile):
+        self._tx = tx
+        self._consultas = consultas
+        self._tasa_muestreo_profile = tasa_muestreo_profile
+
+    def run(self, query, parameters=None, **kwargs):
+        perfilar = (self._tasa_muestreo_profile > 0 and random.random() < self._tasa_muestreo_profile
+                    and not query.lstrip().upper().startswith(("EXPLAIN", "PROFILE")))
+        result = self._tx.run("PROFILE " + query if perfilar else query, parameters, **kwargs)
+        registros = list(result)
+        resumen = result.consume()
+        self._consultas.append(_metricas_de_consulta(registros, resumen, perfilar))
+        return _ResultadoEnMemoria(registros, resumen)
+
+
+class _TxConCambios:
+    """
+    Envuelve la transacción y anota si alguna consulta modificó el grafo (contadores de su ResultSummary),
+    para no incrementar la versión del grafo en :MetaCamino por escrituras que no cambiaron nada.
+    """
+    def __init__(self, tx):
+        self._tx = tx
+        self.hubo_cambios = False
+
+    def run(self, query, parameters=None, **kwargs):
+        result = self._tx.run(query, parameters, **kwargs)
+        registros = list(result)
+        resumen = result.consume()
+        if resumen.counters.contains_updates:
+            self.hubo_cambios = True
+        return _ResultadoEnMemoria(registros, resumen)
+
+
+def _operadores_del_plan(plan):
+    """Recorre el árbol de un plan de ejecución (EXPLAIN) y retorna la lista de operadores."""
+    if not plan:
+        return []
+    operadores = [plan.get("operatorType", "").split("@")[0]]
+    for hijo in plan.get("children", []):
+        operadores.extend(_operadores_del_plan(hijo))
+    return operadores
+
+
+def _congelar(valor):
+    """Convierte listas, sets y dicts en tuplas para poder usar el valor como clave de diccionario."""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return tuple(sorted(_congelar(v) for v in valor))
+    return valor
+
+
+class CacheLecturas:
+    """
+    Caché LRU con expiración (TTL) para resultados de lecturas. La clave es la función
+    transaccional más sus parámetros; los valores se copian al guardar y al leer para que
+    quien llama no pueda modificar lo que queda en caché. Cada invalidación avanza la generación:
+    una lectura que empezó antes no puede guardar su resultado después.
+    """
+
+    def __init__(self, max_entradas=256, ttl_segundos=30.0):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._generacion = 0
+
+    @staticmethod
+    def clave(tx_function, kwargs):
+        return (getattr(tx_function, "__qualname__", repr(tx_function)), _congelar(kwargs))
+
+    def obtener(self, clave):
+        """Retorna (True, valor) si hay una entrada vigente, o (False, None)."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and time.monotonic() - entrada[0] < self.ttl_segundos:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return True, copy.deepcopy(entrada[1])
+            if entrada is not None:
+                del self._entradas[clave]
+            self.fallos += 1
+            return False, None
+
+    def generacion(self):
+        """Generación actual; se toma antes de leer y se pasa a guardar()."""
+        with self._lock:
+            return self._generacion
+
+    def guardar(self, clave, valor, generacion=None):
+        """Guarda el valor, salvo que la caché se haya invalidado desde 'generacion'."""
+        if self.max_entradas <= 0:
+            return
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._entradas[clave] = (time.monotonic(), copy.deepcopy(valor))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._generacion += 1
+            self.invalidaciones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos
+            }
+
 
 class Neo4jCRUD:
-    def __init__(self):
-        try:
-            self._driver = GraphDatabase.driver(uri = "neo4j+s://ec032b96.databases.neo4j.io", auth=("neo4j", "qSQTqW7Y1lh0Xeb52rKuTtFOvnFzdk02e21zfvSSzpA"))
-            self._database = "neo4j"
-            self._driver.verify_connectivity()
-            print("Conexión a Neo4j establecida exitosamente.")
-        except exceptions.AuthError as e:
-            print(f"Error de autenticación con Neo4j: {e}")
-            self._driver = None
-        except exceptions.ServiceUnavailable as e:
-            print(f"No se pudo conectar al servicio Neo4j en bolt: {e}")
-            self._driver = None
-        except Exception as e:
-            print(f"Ocurrió un error inesperado al conectar con Neo4j: {e}")
-            self._driver = None
+    _esquemas_asegurados = set()
+    _lock_esquema = threading.Lock()
+
+    def __init__(self, uri=None, auth=None, database="neo4j", conexion_diferida=False):
+        """
+        Por defecto se conecta a la instancia del proyecto; uri/auth permiten usar un Neo4j local.
+        Con conexion_diferida=True el constructor no abre ninguna conexión: se conecta en el primer
+        uso o antes, en segundo plano, con precalentar().
+        """
+        self._instantanea = None
+        self._instantanea_activa = False
+        self._intervalo_verificacion_instantanea = 30.0
+        self._instantanea_verificada_en = 0.0
+        self._lock_instantanea = threading.Lock()
+        self._cache_lecturas = CacheLecturas()
+        self._planificador = PlanificadorCaminos()
+        self._instrumentacion_activa = True
+        self._tasa_muestreo_profile = 0.0
+        self._uri = uri or URI_NEO4J
+        self._auth = auth or AUTH_NEO4J
+        self._database = database
+        self._driver_conectado = None
+        self._conexion_intentada = False
+        self._lock_conexion = threading.Lock()
+        self._tiempos_conexion = {}
+        if not conexion_diferida:
+            self.conectar()
+
+    @property
+    def _driver(self):
+        """Driver ya verificado, o None si no se pudo conectar. El primer acceso espera a la conexión."""
+        if not self._conexion_intentada:
+            self.conectar()
+        return self._driver_conectado
+
+    def conectar(self):
+        """
+        Crea el driver, verifica la conexión y asegura el esquema, una sola vez por instancia.
+        Si otro hilo ya se está conectando, espera a que termine. Retorna True si quedó conectado.
+        """
+        with self._lock_conexion:
+            if self._conexion_intentada:
+                return self._driver_conectado is not None
+            tiempos = {}
+            driver = None
+            verificado = False
+            try:
+                with medir_fase(tiempos, "driver"):
+                    driver = GraphDatabase.driver(uri=self._uri, auth=self._auth)
+                with medir_fase(tiempos, "verificacion"):
+                    driver.verify_connectivity()
+                print("Conexión a Neo4j establecida exitosamente.")
+                verificado = True
+            except exceptions.AuthError as e:
+                print(f"Error de autenticación con Neo4j: {e}")
+            except exceptions.ServiceUnavailable as e:
+                print(f"No se pudo conectar al servicio Neo4j en bolt: {e}")
+            except Exception as e:
+                print(f"Ocurrió un error inesperado al conectar con Neo4j: {e}")
+            if not verificado and driver is not None:
+                # El pool del driver queda abierto aunque la verificación falle.
+                driver.close()
+                driver = None
+            if driver is not None:
+                with medir_fase(tiempos, "esquema"):
+                    self._asegurar_esquema(driver)
+            # Se publica después del esquema: la propiedad _driver lee estos atributos sin tomar el lock.
+            self._driver_conectado = driver
+            self._conexion_intentada = True
+            self._tiempos_conexion = tiempos
+            print(f"Tiempos de conexión a Neo4j: {formatear_fases(tiempos)}.")
+            return driver is not None
+
+    def precalentar(self):
+        """Inicia conectar() en un hilo de fondo y lo retorna, para no bloquear a quien crea el gestor."""
+        hilo = threading.Thread(target=self.conectar, name="conexion-neo4j", daemon=True)
+        hilo.start()
+        return hilo
+
+    def tiempos_conexion(self):
+        """Segundos de cada fase de la conexión (driver, verificacion, esquema); vacío si aún no se conectó."""
+        return dict(self._tiempos_conexion)
 
     def close(self):
-        """Cierra la conexión con la base de datos."""
-        if self._driver is not None:
-            self._driver.close()
+        """Cierra la conexión con la base de datos (sin abrirla si nunca se usó)."""
+        with self._lock_conexion:
+            self._conexion_intentada = True
+            driver, self._driver_conectado = self._driver_conectado, None
+        if driver is not None:
+            driver.close()
             print("Conexión a Neo4j cerrada.")
 
+    # --- Esquema e Índices ---
+    @staticmethod
+    def _obtener_version_esquema_tx(tx):
+        record = tx.run(CYPHER_VERSION_ESQUEMA, nombre=NOMBRE_META_CAMINO).single()
+        return record["version"] if record and record["version"] is not None else 0
+
+    @staticmethod
+    def _guardar_version_esquema_tx(tx, version):
+        tx.run(CYPHER_GUARDAR_VERSION_ESQUEMA, nombre=NOMBRE_META_CAMINO, version=version).consume()
+
+    def asegurar_esquema(self):
+        """
+        Aplica las migraciones pendientes del esquema (constraints de unicidad e índices).
+        Se ejecuta una sola vez por proceso y base de datos; si la versión guardada ya es la actual
+        solo cuesta una lectura.
+        """
+        driver = self._driver
+        if driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return False
+        return self._asegurar_esquema(driver)
+
+    def _asegurar_esquema(self, driver):
+        """Igual que asegurar_esquema, sobre un driver que conectar() todavía no publicó."""
+        clave = (self._uri, self._database)
+        with Neo4jCRUD._lock_esquema:
+            if clave in Neo4jCRUD._esquemas_asegurados:
+                return True
+            try:
+                with driver.session(database=self._database) as session:
+                    version_actual = self._ejecutar_medido(session, False, self._obtener_version_esquema_tx, {})
+                    if version_actual >= VERSION_ESQUEMA:
+                        Neo4jCRUD._esquemas_asegurados.add(clave)
+                        return True
+
+                    for version, sentencias in MIGRACIONES_ESQUEMA:
+                        if version <= version_actual:
+                            continue
+                        for sentencia in sentencias:
+                            session.run(sentencia).consume()
+                        self._ejecutar_medido(session, True, self._guardar_version_esquema_tx, {"version": version})
+                        print(f"Esquema de Neo4j actualizado a la versión {version}.")
+                Neo4jCRUD._esquemas_asegurados.add(clave)
+                return True
+            except Exception as e:
+                print(f"Advertencia al asegurar el esquema de Neo4j (constraints/índices): {e}")
+                return False
+
+    def reportar_uso_de_indices(self):
+        """
+        Ejecuta EXPLAIN sobre las consultas de Neo4jCRUD que buscan por propiedad e informa,
+        para cada método, si el plan usa una búsqueda por índice o un escaneo por etiqueta.
+        """
+        if self._driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return {}
+
+        reporte = {}
+        with self._driver.session(database=self._database) as session:
+            for nombre_metodo, query, params_query in self._consultas_uso_de_indices():
+                try:
+                    summary = session.run("EXPLAIN " + query, **params_query).consume()
+                except Exception as e:
+                    print(f"No se pudo obtener el plan de '{nombre_metodo}': {e}")
+                    continue
+                reporte[nombre_metodo] = self._uso_de_indices_del_plan(nombre_metodo, summary.plan)
+        return reporte
+
+    @staticmethod
+    def _consultas_uso_de_indices():
+        """(método, query, params) de las consultas que revisa reportar_uso_de_indices."""
+        consultas = [
+            ("actualizar_vocacion", Neo4jCRUD._actualizar_vocacion_tx, {"nombre_actual": "x", "nuevo_nombre": "y"}),
+            ("eliminar_vocacion", Neo4jCRUD._eliminar_vocacion_tx, {"nombre": "x"}),
+            ("actualizar_curso", Neo4jCRUD._actualizar_curso_tx, {"nombre_actual": "x", "nuevo_nombre": None, "nueva_dificultad": "y"}),
+            ("eliminar_curso", Neo4jCRUD._eliminar_curso_tx, {"nombre": "x"}),
+            ("vincular_vocacion_a_curso", Neo4jCRUD._vincular_vocacion_a_curso_tx, {"nombre_vocacion": "x", "nombre_curso": "y"}),
+            ("vincular_curso_a_curso", Neo4jCRUD._vincular_curso_a_curso_tx, {"nombre_curso_origen": "x", "nombre_curso_destino": "y"}),
+            ("obtener_cursos_por_dificultad", Neo4jCRUD._obtener_cursos_por_dificultad_tx, {"dificultad": "Principiante"}),
+            ("iterar_vocaciones", Neo4jCRUD._obtener_pagina_vocaciones_tx, {"ultimo_nombre": "", "limite": TAMANO_PAGINA_PREDETERMINADO}),
+            ("iterar_cursos", Neo4jCRUD._obtener_pagina_cursos_tx, {"ultimo_nombre": "", "limite": TAMANO_PAGINA_PREDETERMINADO}),
+            ("iterar_cursos_por_dificultad", Neo4jCRUD._obtener_pagina_cursos_por_dificultad_tx,
+             {"ultimo_nombre": "", "limite": TAMANO_PAGINA_PREDETERMINADO, "dificultad": "Principiante"}),
+            ("obtener_cursos_siguientes", Neo4jCRUD._obtener_cursos_siguientes_tx, {"nombre_curso_actual": "x"}),
+            ("obtener_cursos_anteriores", Neo4jCRUD._obtener_cursos_anteriores_tx, {"nombre_curso_actual": "x"}),
+            ("obtener_rama_cursos_por_vocacion", Neo4jCRUD._obtener_rama_cursos_por_vocacion_tx, {"nombre_vocacion": "x"}),
+            ("obtener_cursos_directos_por_vocacion", Neo4jCRUD._obtener_cursos_directos_por_vocacion_tx, {"nombre_vocacion": "x"}),
+            ("obtener_cursos_siguientes_de_lista", Neo4jCRUD._obtener_cursos_siguientes_de_lista_tx, {"nombres_cursos_actuales": ["x"]}),
+            ("obtener_rama_predecesora_completa", Neo4jCRUD._obtener_rama_predecesora_completa_tx, {"nombres_cursos_actuales": ["x"]}),
+            ("obtener_rama_sucesora_completa", Neo4jCRUD._obtener_rama_sucesora_completa_tx, {"nombres_cursos_actuales": ["x"]}),
+            ("obtener_camino_usuario", Neo4jCRUD._obtener_camino_usuario_tx, {"nombres_cursos_completados": ["x"]}),
+            ("aplicar_cambios_catalogo", Neo4jCRUD._aplicar_cambios_catalogo_tx,
+             {"vocaciones": [], "cursos": [{"id_mongo": "x", "nombre": "x", "dificultad": "x"}], "eliminados": []}),
+        ]
+
+        capturadas = []
+        for nombre_metodo, tx_function, params in consultas:
+            query, params_query = _capturar_consulta(tx_function, **params)
+            if query is not None:
+                capturadas.append((nombre_metodo, query, params_query))
+        return capturadas
+
+    @staticmethod
+    def _uso_de_indices_del_plan(nombre_metodo, plan):
+        """Entrada de reportar_uso_de_indices para el plan EXPLAIN de una consulta (y la informa)."""
+        operadores = _operadores_del_plan(plan)
+        busquedas = [op for op in operadores if "IndexSeek" in op]
+        escaneos = [op for op in operadores if op.endswith("Scan")]
+        estado = "búsqueda por índice" if busquedas else "SIN índice"
+        print(f"  {nombre_metodo}: {estado} {busquedas or escaneos}")
+        return {
+            "usa_indice": bool(busquedas),
+            "busquedas_por_indice": busquedas,
+            "escaneos": escaneos
+        }
+
+    # --- Instrumentación ---
+    def _ejecutar_medido(self, session, escritura, tx_function, kwargs, nombre_metrica=None):
+        """
+        Ejecuta tx_function en una transacción gestionada de la sesión y registra en METRICAS_NEO4J
+        su duración, los tiempos del servidor, las filas, los db hits (si se muestreó) y los errores.
+        """
+        ejecutar = session.execute_write if escritura else session.execute_read
+        if not self._instrumentacion_activa:
+            return ejecutar(tx_function, **kwargs)
+
+        nombre_metrica = nombre_metrica or getattr(tx_function, "__name__", repr(tx_function))
+        tipo = "escritura" if escritura else "lectura"
+        consultas = []
+        tasa_muestreo_profile = self._tasa_muestreo_profile
+
+        def _tx_medida(tx, **kwargs_tx):
+            # Si el driver reintenta la transacción, solo cuenta el último intento.
+            consultas.clear()
+            return tx_function(_TxInstrumentada(tx, consultas, tasa_muestreo_profile), **kwargs_tx)
+
+        inicio = time.perf_counter()
+        try:
+            resultado = ejecutar(_tx_medida, **kwargs)
+        except Exception as e:
+            METRICAS_NEO4J.registrar_transaccion(nombre_metrica, tipo, time.perf_counter() - inicio, consultas, error=type(e).__name__)
+            raise
+        METRICAS_NEO4J.registrar_transaccion(nombre_metrica, tipo, time.perf_counter() - inicio, consultas)
+        return resultado
+
+    def configurar_instrumentacion(self, activa=True, tasa_muestreo_profile=0.0):
+        """
+        Activa o desactiva el registro de métricas de esta instancia. 'tasa_muestreo_profile'
+        (entre 0 y 1) es la fracción de consultas que se ejecutan con PROFILE para medir db hits.
+        """
+        if not 0.0 <= tasa_muestreo_profile <= 1.0:
+            print("Error: tasa_muestreo_profile debe estar entre 0 y 1.")
+            return False
+        self._instrumentacion_activa = activa
+        self._tasa_muestreo_profile = tasa_muestreo_profile
+        return True
+
+    def obtener_metricas(self):
+        """Retorna las métricas acumuladas por función transaccional como diccionario."""
+        return METRICAS_NEO4J.a_dict()
+
+    def exportar_metricas_json(self):
+        return METRICAS_NEO4J.a_json()
+
+    def exportar_metricas_prometheus(self):
+        """Retorna las métricas en formato de texto de Prometheus (para un endpoint /metrics)."""
+        return METRICAS_NEO4J.a_prometheus()
+
+    def reiniciar_metricas(self):
+        METRICAS_NEO4J.reiniciar()
+
     def _ejecutar_transaccion(self, tx_function, **kwargs):
         """
         Método auxiliar para ejecutar una transacción de escritura.
+        Retorna (resultado, versión del grafo que dejó la escritura), o (None, None) si falla.
+        Si la escritura no cambió nada la versión no se incrementa y se retorna None en su lugar.
         """
         if self._driver is None:
             print("No hay conexión activa a Neo4j.")
-            return None
+            return None, None
+        def _tx_con_version(tx, **kwargs_tx):
+            tx_cambios = _TxConCambios(tx)
+            resultado = tx_function(tx_cambios, **kwargs_tx)
+            # Solo las escrituras que cambiaron algo pasan por :MetaCamino, que serializa a los escritores.
+            version = Neo4jCRUD._incrementar_version_grafo_tx(tx) if tx_cambios.hubo_cambios else None
+            return resultado, version
+
         with self._driver.session(database=self._database) as session:
             try:
-                return session.execute_write(tx_function, **kwargs)
+                resultado, version = self._ejecutar_medido(session, True, _tx_con_version, kwargs, tx_function.__name__)
+                if version is not None:
+                    self._instantanea_verificada_en = 0.0
+                    self._cache_lecturas.invalidar()
+                return resultado, version
             except exceptions.ConstraintError as e:
                 print(f"Error de restricción (ConstraintError): {e}")
-                return None
+                return None, None
             except Exception as e:
                 print(f"Error durante la transacción de escritura: {e}")
-                return None
+                return None, None
     
     def _ejecutar_lectura(self, tx_function, **kwargs):
         """
         Método auxiliar para ejecutar una transacción de lectura.
+        Los resultados se guardan en la caché de lecturas; cualquier escritura la invalida.
         """
         if self._driver is None:
             print("No hay conexión activa a Neo4j.")
             return []
+        cache = self._cache_lecturas
+        clave = CacheLecturas.clave(tx_function, kwargs)
+        encontrado, resultado = cache.obtener(clave)
+        if encontrado:
+            return resultado
+        generacion = cache.generacion()
         with self._driver.session(database=self._database) as session:
             try:
-                return session.execute_read(tx_function, **kwargs)
+                resultado = self._ejecutar_medido(session, False, tx_function, kwargs)
             except Exception as e:
                 print(f"Error durante la transacción de lectura: {e}")
                 return []
+        # Si una escritura invalidó la caché mientras se leía, el resultado puede ser anterior a ella.
+        cache.guardar(clave, resultado, generacion)
+        return resultado
+
+    def _iterar_paginado(self, tx_pagina, tamano_pagina, **kwargs):
+        """
+        Generador que recorre una consulta paginada por nombre (keyset): cada página es una
+        transacción de lectura corta que continúa después del último nombre entregado.
+        tx_pagina(tx, ultimo_nombre, limite, **kwargs) debe retornar la página ordenada por nombre.
+        Los nodos sin nombre no tienen clave de paginación y no se incluyen.
+        """
+        if self._driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return
+        if tamano_pagina <= 0:
+            print("Error: tamano_pagina debe ser mayor que cero.")
+            return
+        ultimo_nombre = ""
+        with self._driver.session(database=self._database, fetch_size=tamano_pagina) as session:
+            while True:
+                try:
+                    pagina = self._ejecutar_medido(session, False, tx_pagina, dict(kwargs, ultimo_nombre=ultimo_nombre, limite=tamano_pagina))
+                except Exception as e:
+                    print(f"Error durante la lectura paginada: {e}")
+                    return
+                yield from pagina
+                if len(pagina) < tamano_pagina:
+                    return
+                ultimo_nombre = pagina[-1]["nombre"]
+
+    def configurar_cache_lecturas(self, max_entradas=256, ttl_segundos=30.0):
+        """
+        Ajusta el tamaño máximo y el tiempo de vida de la caché de lecturas.
+        Con max_entradas=0 la caché queda desactivada.
+        """
+        self._cache_lecturas = CacheLecturas(max_entradas=max_entradas, ttl_segundos=ttl_segundos)
+
+    def invalidar_cache_lecturas(self):
+        """Descarta todos los resultados en caché (por ejemplo, tras cambios hechos por otro proceso)."""
+        self._cache_lecturas.invalidar()
+
+    def estadisticas_cache_lecturas(self):
+        """Retorna aciertos, fallos, invalidaciones y ocupación de la caché de lecturas."""
+        return self._cache_lecturas.estadisticas()
+
+    # --- Versión del Grafo e Instantánea Local ---
+    @staticmethod
+    def _obtener_version_grafo_tx(tx):
+        record = tx.run(CYPHER_VERSION_GRAFO, nombre=NOMBRE_META_CAMINO).single()
+        return record["version"] if record and record["version"] is not None else 0
+
+    @staticmethod
+    def _incrementar_version_grafo_tx(tx):
+        """Incrementa el contador de versión del grafo; lo usan las instantáneas locales para saber si recargar."""
+        return tx.run(CYPHER_INCREMENTAR_VERSION_GRAFO, nombre=NOMBRE_META_CAMINO).single()["version"]
+
+    @staticmethod
+    def _cargar_instantanea_tx(tx):
+        version = Neo4jCRUD._obtener_version_grafo_tx(tx)
+        instantanea = InstantaneaGrafo(version)
+        for record in tx.run(CYPHER_NODOS_INSTANTANEA):
+            instantanea.agregar_nodo(record["id"], record["tipo_nodo"], record["nombre"], record["dificultad"])
+        for record in tx.run(CYPHER_RELACIONES_INSTANTANEA):
+            instantanea.agregar_relacion(record["origen"], record["destino"], record["tipo"])
+        return instantanea
+
+    def activar_instantanea_local(self, intervalo_verificacion=30.0, instantanea=None):
+        """
+        Carga una sola vez el grafo de cursos en memoria. Mientras esté activa, las consultas de
+        caminos se responden localmente; cada 'intervalo_verificacion' segundos se compara la versión
+        del grafo en Neo4j y, si cambió, la instantánea se recarga.
+        Si se pasa 'instantanea' (por ejemplo, leída de un archivo) solo se consulta la versión del
+        grafo: se usa esa copia si sigue al día y se recarga desde Neo4j si no.
+        """
+        if self._driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return False
+        self._intervalo_verificacion_instantanea = intervalo_verificacion
+        self._instantanea_activa = True
+        with self._lock_instantanea:
+            if instantanea is None:
+                return self._recargar_instantanea()
+            self._instantanea = instantanea.precalcular_clausura()
+            self._instantanea_verificada_en = 0.0
+        return self._instantanea_vigente() is not None
+
+    def desactivar_instantanea_local(self):
+        """Vuelve a resolver todas las consultas contra Neo4j y libera la instantánea."""
+        with self._lock_instantanea:
+            self._instantanea_activa = False
+            self._instantanea = None
+
+    def instantanea_local(self):
+        """Retorna la instantánea local si el modo está activo y sigue al día con Neo4j, o None."""
+        return self._instantanea_vigente()
+
+    def version_grafo(self):
+        """
+        Retorna la versión actual del grafo: la de la instantánea local si está al día o, si no,
+        la guardada en Neo4j. None si no se puede leer.
+        """
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.version
+        if self._driver is None:
+            print("No hay conexión activa a Neo4j.")
+            return None
+        try:
+            with self._driver.session(database=self._database) as session:
+                return self._ejecutar_medido(session, False, self._obtener_version_grafo_tx, {})
+        except Exception as e:
+            print(f"No se pudo leer la versión del grafo: {e}")
+            return None
+
+    def _recargar_instantanea(self):
+        try:
+            with self._driver.session(database=self._database) as session:
+                inicio = time.perf_counter()
+                instantanea = self._ejecutar_medido(session, False, self._cargar_instantanea_tx, {})
+            # La clausura se arma antes de publicar la instantánea: las consultas solo la leen.
+            self._instantanea = instantanea.precalcular_clausura()
+            self._instantanea_verificada_en = time.monotonic()
+            print(f"Instantánea local del grafo cargada: {len(self._instantanea)} nodos, versión {self._instantanea.version} "
+                  f"({time.perf_counter() - inicio:.2f}s).")
+            return True
+        except Exception as e:
+            print(f"Error al cargar la instantánea local del grafo: {e}")
+            self._instantanea = None
+            return False
+
+    def _instantanea_vigente(self):
+        """
+        Retorna la instantánea local si el modo está activo y sigue al día con Neo4j, o None para
+        que la consulta vaya a la base de datos.
+        """
+        if not self._instantanea_activa or self._driver is None:
+            return None
+        with self._lock_instantanea:
+            if time.monotonic() - self._instantanea_verificada_en >= self._intervalo_verificacion_instantanea:
+                try:
+                    with self._driver.session(database=self._database) as session:
+                        version_actual = self._ejecutar_medido(session, False, self._obtener_version_grafo_tx, {})
+                except Exception as e:
+                    print(f"No se pudo verificar la versión del grafo: {e}")
+                    return None
+                if self._instantanea is None or version_actual != self._instantanea.version:
+                    if not self._recargar_instantanea():
+                        return None
+                else:
+                    self._instantanea_verificada_en = time.monotonic()
+            return self._instantanea
+
+    def _actualizar_instantanea(self, cambio, version):
+        """
+        Aplica a la instantánea local (y a su índice de clausura) una escritura ya confirmada en Neo4j,
+        sin recargarla, siempre que la instantánea estuviera al día justo antes de esa escritura.
+        El cambio se aplica sobre una copia que luego reemplaza a la instantánea: los lectores que
+        ya tomaron la anterior la siguen recorriendo sin que cambie debajo de ellos.
+        """
+        with self._lock_instantanea:
+            instantanea = self._instantanea
+            if instantanea is None or version != instantanea.version + 1:
+                return
+            copia = instantanea.copiar()
+            cambio(copia)
+            copia.version = version
+            self._instantanea = copia
+            self._instantanea_verificada_en = time.monotonic()
 
     # --- CRUD Vocaciones ---
     @staticmethod
     def _crear_vocacion_tx(tx, nombre):
-        query = "CREATE (v:Vocacion {nombre: $nombre}) RETURN id(v) AS id, v.nombre AS nombre"
-        result = tx.run(query, nombre=nombre)
-        record = result.single()
+        record = tx.run(CYPHER_CREAR_VOCACION, nombre=nombre).single()
         if record:
             print(f"Vocación '{record['nombre']}' creada con ID interno: {record['id']}.")
-            return {"id_interno_neo4j": record["id"], "nombre": record["nombre"]}
+            return _vocacion_de_registro(record)
         return None
 
     def crear_vocacion(self, nombre):
         """Crea un nuevo nodo Vocacion."""
-        return self._ejecutar_transaccion(self._crear_vocacion_tx, nombre=nombre)
+        resultado, version = self._ejecutar_transaccion(self._crear_vocacion_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_nodo(resultado["id_interno_neo4j"], "Vocacion", resultado["nombre"]), version)
+        return resultado
 
     @staticmethod
     def _obtener_vocaciones_tx(tx):
-        query = "MATCH (v:Vocacion) RETURN id(v) AS id, v.nombre AS nombre ORDER BY v.nombre"
-        results = tx.run(query)
-        return [{"id_interno_neo4j": record["id"], "nombre": record["nombre"]} for record in results]
+        return [_vocacion_de_registro(record) for record in tx.run(CYPHER_VOCACIONES)]
 
     def obtener_vocaciones(self):
         """Obtiene todas las vocaciones."""
         return self._ejecutar_lectura(self._obtener_vocaciones_tx)
 
+    @staticmethod
+    def _obtener_pagina_vocaciones_tx(tx, ultimo_nombre, limite):
+        results = tx.run(CYPHER_PAGINA_VOCACIONES, ultimo_nombre=ultimo_nombre, limite=limite)
+        return [_vocacion_de_registro(record) for record in results]
+
+    def iterar_vocaciones(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """
+        Igual que obtener_vocaciones, pero como generador: entrega las vocaciones a medida que llegan,
+        en páginas de 'tamano_pagina' ordenadas por nombre, con memoria acotada.
+        """
+        return self._iterar_paginado(self._obtener_pagina_vocaciones_tx, tamano_pagina)
+
     @staticmethod
     def _actualizar_vocacion_tx(tx, nombre_actual, nuevo_nombre):
-        query = (
-            "MATCH (v:Vocacion {nombre: $nombre_actual}) "
-            "SET v.nombre = $nuevo_nombre "
-            "RETURN id(v) AS id, v.nombre AS nombre_actualizado"
-        )
-        result = tx.run(query, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre)
-        record = result.single()
+        record = tx.run(CYPHER_ACTUALIZAR_VOCACION, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre).single()
         if record:
             print(f"Vocación '{nombre_actual}' actualizada a '{record['nombre_actualizado']}'.")
             return {"id_interno_neo4j": record["id"], "nombre": record["nombre_actualizado"]}
@@ -97,15 +1121,12 @@ class Neo4jCRUD:
             
     def actualizar_vocacion(self, nombre_actual, nuevo_nombre):
         """Actualiza el nombre de una vocación existente."""
-        return self._ejecutar_transaccion(self._actualizar_vocacion_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre)
+        resultado, _ = self._ejecutar_transaccion(self._actualizar_vocacion_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre)
+        return resultado
 
     @staticmethod
     def _eliminar_vocacion_tx(tx, nombre):
-        query = (
-            "MATCH (v:Vocacion {nombre: $nombre}) "
-            "DETACH DELETE v" 
-        )
-        summary = tx.run(query, nombre=nombre).consume()
+        summary = tx.run(CYPHER_ELIMINAR_VOCACION, nombre=nombre).consume()
         if summary.counters.nodes_deleted > 0:
             print(f"Vocación '{nombre}' y sus relaciones directas eliminadas.")
             return True
@@ -115,66 +1136,61 @@ class Neo4jCRUD:
 
     def eliminar_vocacion(self, nombre):
         """Elimina una vocación y sus relaciones TIENE_CURSO."""
-        return self._ejecutar_transaccion(self._eliminar_vocacion_tx, nombre=nombre)
+        resultado, version = self._ejecutar_transaccion(self._eliminar_vocacion_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.eliminar_por_nombre("Vocacion", nombre), version)
+        return resultado
     
     @staticmethod
     def _crear_o_encontrar_vocacion_tx(tx, nombre):
-        query = "MERGE (v:Vocacion {nombre: $nombre}) RETURN id(v) AS id, v.nombre AS nombre"
-        result = tx.run(query, nombre=nombre).single()
+        result = tx.run(CYPHER_MERGE_VOCACION, nombre=nombre).single()
         if result:
-            return {"id_interno_neo4j": result["id"], "nombre": result["nombre"]}
+            return _vocacion_de_registro(result)
         raise Exception(f"No se pudo crear o encontrar la vocación '{nombre}'.")
 
     # --- CRUD Cursos ---
     @staticmethod
     def _crear_curso_tx(tx, nombre, dificultad):
-        query = "CREATE (c:Curso {nombre: $nombre, dificultad: $dificultad}) RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
-        result = tx.run(query, nombre=nombre, dificultad=dificultad)
-        record = result.single()
+        record = tx.run(CYPHER_CREAR_CURSO, nombre=nombre, dificultad=dificultad).single()
         if record:
             print(f"Curso '{record['nombre']}' (Dificultad: {record['dificultad']}) creado con ID interno: {record['id']}.")
-            return {"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]}
+            return _curso_de_registro(record)
         return None
 
     def crear_curso(self, nombre, dificultad):
         """Crea un nuevo nodo Curso."""
-        return self._ejecutar_transaccion(self._crear_curso_tx, nombre=nombre, dificultad=dificultad)
+        resultado, version = self._ejecutar_transaccion(self._crear_curso_tx, nombre=nombre, dificultad=dificultad)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_nodo(resultado["id_interno_neo4j"], "Curso", resultado["nombre"], resultado["dificultad"]), version)
+        return resultado
 
     @staticmethod
     def _obtener_cursos_tx(tx):
-        query = "MATCH (c:Curso) RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre"
-        results = tx.run(query)
-        return [{"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]} for record in results]
+        return [_curso_de_registro(record) for record in tx.run(CYPHER_CURSOS)]
 
     def obtener_cursos(self):
         """Obtiene todos los cursos."""
         return self._ejecutar_lectura(self._obtener_cursos_tx)
 
+    @staticmethod
+    def _obtener_pagina_cursos_tx(tx, ultimo_nombre, limite):
+        results = tx.run(CYPHER_PAGINA_CURSOS, ultimo_nombre=ultimo_nombre, limite=limite)
+        return [_curso_de_registro(record) for record in results]
+
+    def iterar_cursos(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """
+        Igual que obtener_cursos, pero como generador: entrega los cursos a medida que llegan,
+        en páginas de 'tamano_pagina' ordenadas por nombre, con memoria acotada.
+        """
+        return self._iterar_paginado(self._obtener_pagina_cursos_tx, tamano_pagina)
+
     @staticmethod
     def _actualizar_curso_tx(tx, nombre_actual, nuevo_nombre, nueva_dificultad):
-        query_parts = []
-        params = {"nombre_actual": nombre_actual}
-        
-        if nuevo_nombre is not None:
-            query_parts.append("c.nombre = $nuevo_nombre")
-            params["nuevo_nombre"] = nuevo_nombre
-        if nueva_dificultad is not None:
-            query_parts.append("c.dificultad = $nueva_dificultad")
-            params["nueva_dificultad"] = nueva_dificultad
-        
-        if not query_parts:
+        query, params = consulta_actualizar_curso(nuevo_nombre, nueva_dificultad)
+        if query is None:
             print("No se proporcionaron datos para actualizar el curso.")
             return None
-
-        set_clause = "SET " + ", ".join(query_parts)
-        query = (
-            f"MATCH (c:Curso {{nombre: $nombre_actual}}) "
-            f"{set_clause} "
-            "RETURN id(c) AS id, c.nombre AS nombre_actualizado, c.dificultad AS dificultad_actualizada"
-        )
-        
-        result = tx.run(query, **params)
-        record = result.single()
+        record = tx.run(query, nombre_actual=nombre_actual, **params).single()
         if record:
             print(f"Curso '{nombre_actual}' actualizado a '{record['nombre_actualizado']}' (Dificultad: {record['dificultad_actualizada']}).")
             return {"id_interno_neo4j": record["id"], "nombre": record["nombre_actualizado"], "dificultad": record["dificultad_actualizada"]}
@@ -187,15 +1203,12 @@ class Neo4jCRUD:
         if nuevo_nombre is None and nueva_dificultad is None:
             print("Debe proporcionar al menos un nuevo nombre o una nueva dificultad para actualizar.")
             return None
-        return self._ejecutar_transaccion(self._actualizar_curso_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre, nueva_dificultad=nueva_dificultad)
+        resultado, _ = self._ejecutar_transaccion(self._actualizar_curso_tx, nombre_actual=nombre_actual, nuevo_nombre=nuevo_nombre, nueva_dificultad=nueva_dificultad)
+        return resultado
 
     @staticmethod
     def _eliminar_curso_tx(tx, nombre):
-        query = (
-            "MATCH (c:Curso {nombre: $nombre}) "
-            "DETACH DELETE c"
-        )
-        summary = tx.run(query, nombre=nombre).consume()
+        summary = tx.run(CYPHER_ELIMINAR_CURSO, nombre=nombre).consume()
         if summary.counters.nodes_deleted > 0:
             print(f"Curso '{nombre}' y todas sus relaciones eliminadas.")
             return True
@@ -205,32 +1218,22 @@ class Neo4jCRUD:
 
     def eliminar_curso(self, nombre):
         """Elimina un curso y todas sus relaciones."""
-        return self._ejecutar_transaccion(self._eliminar_curso_tx, nombre=nombre)
+        resultado, version = self._ejecutar_transaccion(self._eliminar_curso_tx, nombre=nombre)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.eliminar_por_nombre("Curso", nombre), version)
+        return resultado
     
     @staticmethod
     def _crear_o_encontrar_curso_tx(tx, nombre, dificultad):
-        query = (
-            "MERGE (c:Curso {nombre: $nombre}) "
-            "ON CREATE SET c.dificultad = $dificultad "
-            "ON MATCH SET c.dificultad = $dificultad " 
-            "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad"
-        )
-        result = tx.run(query, nombre=nombre, dificultad=dificultad).single()
+        result = tx.run(CYPHER_MERGE_CURSO, nombre=nombre, dificultad=dificultad).single()
         if result:
-            return {"id_interno_neo4j": result["id"], "nombre": result["nombre"], "dificultad": result["dificultad"]}
+            return _curso_de_registro(result)
         raise Exception(f"No se pudo crear o encontrar el curso '{nombre}'.")
 
     # --- Gestión de Relaciones ---
     @staticmethod
     def _vincular_vocacion_a_curso_tx(tx, nombre_vocacion, nombre_curso):
-        query = (
-            "MATCH (v:Vocacion {nombre: $nombre_vocacion}) "
-            "MATCH (c:Curso {nombre: $nombre_curso}) "
-            "MERGE (v)-[r:TIENE_CURSO]->(c) " 
-            "RETURN type(r) AS tipo_relacion"
-        )
-        result = tx.run(query, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso)
-        record = result.single()
+        record = tx.run(CYPHER_VINCULAR_VOCACION_CURSO, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso).single()
         if record:
             print(f"Vocación '{nombre_vocacion}' vinculada al curso '{nombre_curso}' con relación '{record['tipo_relacion']}'.")
             return True
@@ -240,18 +1243,14 @@ class Neo4jCRUD:
 
     def vincular_vocacion_a_curso(self, nombre_vocacion, nombre_curso):
         """Crea una relación TIENE_CURSO de una Vocacion a un Curso (primer curso de una rama)."""
-        return self._ejecutar_transaccion(self._vincular_vocacion_a_curso_tx, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso)
+        resultado, version = self._ejecutar_transaccion(self._vincular_vocacion_a_curso_tx, nombre_vocacion=nombre_vocacion, nombre_curso=nombre_curso)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_relacion_por_nombres("Vocacion", nombre_vocacion, nombre_curso, "TIENE_CURSO"), version)
+        return resultado
 
     @staticmethod
     def _vincular_curso_a_curso_tx(tx, nombre_curso_origen, nombre_curso_destino):
-        query = (
-            "MATCH (c1:Curso {nombre: $nombre_curso_origen}) "
-            "MATCH (c2:Curso {nombre: $nombre_curso_destino}) "
-            "MERGE (c1)-[r:PRECEDE_A]->(c2) "
-            "RETURN type(r) AS tipo_relacion"
-        )
-        result = tx.run(query, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino)
-        record = result.single()
+        record = tx.run(CYPHER_VINCULAR_CURSO_CURSO, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino).single()
         if record:
             print(f"Curso '{nombre_curso_origen}' vinculado para preceder al curso '{nombre_curso_destino}'.")
             return True
@@ -261,30 +1260,32 @@ class Neo4jCRUD:
             
     def vincular_curso_a_curso(self, nombre_curso_origen, nombre_curso_destino):
         """Crea una relación PRECEDE_A entre dos cursos."""
-        return self._ejecutar_transaccion(self._vincular_curso_a_curso_tx, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino)
+        resultado, version = self._ejecutar_transaccion(self._vincular_curso_a_curso_tx, nombre_curso_origen=nombre_curso_origen, nombre_curso_destino=nombre_curso_destino)
+        if resultado:
+            self._actualizar_instantanea(lambda inst: inst.agregar_relacion_por_nombres("Curso", nombre_curso_origen, nombre_curso_destino, "PRECEDE_A"), version)
+        return resultado
 
     # --- Consultas Especializadas ---
     @staticmethod
     def _obtener_cursos_por_dificultad_tx(tx, dificultad):
-        query = (
-            "MATCH (c:Curso {dificultad: $dificultad}) "
-            "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad ORDER BY c.nombre"
-        )
-        results = tx.run(query, dificultad=dificultad)
-        return [{"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]} for record in results]
+        return [_curso_de_registro(record) for record in tx.run(CYPHER_CURSOS_POR_DIFICULTAD, dificultad=dificultad)]
 
     def obtener_cursos_por_dificultad(self, dificultad):
         """Obtiene cursos filtrados por dificultad."""
         return self._ejecutar_lectura(self._obtener_cursos_por_dificultad_tx, dificultad=dificultad)
 
+    @staticmethod
+    def _obtener_pagina_cursos_por_dificultad_tx(tx, ultimo_nombre, limite, dificultad):
+        results = tx.run(CYPHER_PAGINA_CURSOS_POR_DIFICULTAD, dificultad=dificultad, ultimo_nombre=ultimo_nombre, limite=limite)
+        return [_curso_de_registro(record) for record in results]
+
+    def iterar_cursos_por_dificultad(self, dificultad, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        """Igual que obtener_cursos_por_dificultad, pero como generador paginado por nombre."""
+        return self._iterar_paginado(self._obtener_pagina_cursos_por_dificultad_tx, tamano_pagina, dificultad=dificultad)
+
     @staticmethod
     def _obtener_cursos_siguientes_tx(tx, nombre_curso_actual):
-        query = (
-            "MATCH (c_actual:Curso {nombre: $nombre_curso_actual})-[:PRECEDE_A]->(c_siguiente:Curso) "
-            "RETURN id(c_siguiente) AS id, c_siguiente.nombre AS nombre, c_siguiente.dificultad AS dificultad ORDER BY c_siguiente.nombre"
-        )
-        results = tx.run(query, nombre_curso_actual=nombre_curso_actual)
-        return [{"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]} for record in results]
+        return [_curso_de_registro(record) for record in tx.run(CYPHER_CURSOS_SIGUIENTES, nombre_curso_actual=nombre_curso_actual)]
 
     def obtener_cursos_siguientes(self, nombre_curso_actual):
         """Obtiene los cursos que son directamente siguientes (precedidos por) al curso actual."""
@@ -292,20 +1293,7 @@ class Neo4jCRUD:
 
     @staticmethod
     def _obtener_cursos_anteriores_tx(tx, nombre_curso_actual):
-        query = (
-            "MATCH (nodo_anterior)-[r:PRECEDE_A|TIENE_CURSO]->(c_actual:Curso {nombre: $nombre_curso_actual}) "
-            "RETURN id(nodo_anterior) AS id, labels(nodo_anterior)[0] AS tipo_nodo, nodo_anterior.nombre AS nombre, "
-            "CASE WHEN 'Curso' IN labels(nodo_anterior) THEN nodo_anterior.dificultad ELSE NULL END AS dificultad "
-            "ORDER BY nodo_anterior.nombre"
-        )
-        results = tx.run(query, nombre_curso_actual=nombre_curso_actual)
-        cursos_anteriores = []
-        for record in results:
-            data = {"id_interno_neo4j": record["id"], "tipo_nodo": record["tipo_nodo"], "nombre": record["nombre"]}
-            if record["tipo_nodo"] == "Curso":
-                data["dificultad"] = record["dificultad"]
-            cursos_anteriores.append(data)
-        return cursos_anteriores
+        return [_nodo_de_registro(record) for record in tx.run(CYPHER_CURSOS_ANTERIORES, nombre_curso_actual=nombre_curso_actual)]
 
     def obtener_cursos_anteriores(self, nombre_curso_actual):
         """
@@ -314,63 +1302,214 @@ class Neo4jCRUD:
         """
         return self._ejecutar_lectura(self._obtener_cursos_anteriores_tx, nombre_curso_actual=nombre_curso_actual)
     
-    def crear_vocacion_con_ramas_desde_dict(self, datos_vocacion_completa):
+    @staticmethod
+    def _aplanar_cursos_rama(vocacion_nombre, cursos_rama_data):
+        """
+        Recorre el árbol 'cursos_rama' (en el mismo orden que la carga recursiva) y lo
+        convierte en listas planas de cursos y relaciones, sin duplicados.
+        Retorna (cursos, raices, vinculos, orden_procesado).
+        """
+        cursos = {}
+        raices = []
+        vinculos = []
+        orden_procesado = []
+        raices_vistas = set()
+        vinculos_vistos = set()
+
+        pila = [(None, curso_data) for curso_data in reversed(cursos_rama_data)]
+        while pila:
+            nombre_padre, curso_data_actual = pila.pop()
+            nombre_curso = curso_data_actual.get("nombre")
+            dificultad_curso = curso_data_actual.get("dificultad")
+
+            if not nombre_curso or not dificultad_curso:
+                print(f"  Advertencia: Datos incompletos para un curso bajo '{nombre_padre or vocacion_nombre}'. Omitiendo.")
+                continue
+
+            # Igual que los MERGE secuenciales, la última dificultad encontrada es la que queda.
+            cursos[nombre_curso] = dificultad_curso
+            orden_procesado.append(nombre_curso)
+
+            if nombre_padre is None:
+                if nombre_curso not in raices_vistas:
+                    raices_vistas.add(nombre_curso)
+                    raices.append(nombre_curso)
+            elif (nombre_padre, nombre_curso) not in vinculos_vistos:
+                vinculos_vistos.add((nombre_padre, nombre_curso))
+                vinculos.append({"origen": nombre_padre, "destino": nombre_curso})
+
+            for curso_siguiente in reversed(curso_data_actual.get("siguientes", [])):
+                pila.append((nombre_curso, curso_siguiente))
+
+        return cursos, raices, vinculos, orden_procesado
+
+    @staticmethod
+    def _crear_estructura_masiva_tx(tx, datos_voc, actualizar_cursos=True):
+        """
+        Carga una vocación y todo su árbol de cursos con unas pocas sentencias UNWIND,
+        en lugar de un MERGE por curso y por relación.
+        Con actualizar_cursos=False los cursos deben existir previamente y solo se leen,
+        sin tomar bloqueos de escritura sobre ellos.
+        """
+        vocacion_nombre = datos_voc.get("vocacion_nombre")
+        if not vocacion_nombre:
+            raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+        cursos, raices, vinculos, orden_procesado = Neo4jCRUD._aplanar_cursos_rama(vocacion_nombre, datos_voc.get("cursos_rama", []))
+
+        voc_result = Neo4jCRUD._crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+        print(f"Procesando Vocación (carga masiva): '{voc_result['nombre']}' con {len(cursos)} cursos y {len(raices) + len(vinculos)} relaciones.")
+
+        # Se ordenan los lotes por nombre para que transacciones concurrentes tomen los bloqueos en el mismo orden.
+        lote_cursos = [{"nombre": nombre, "dificultad": dificultad} for nombre, dificultad in sorted(cursos.items())]
+        query_cursos = CYPHER_MERGE_CURSOS_LOTE if actualizar_cursos else CYPHER_LEER_CURSOS_LOTE
+        cursos_por_nombre = {record["nombre"]: _curso_de_registro(record) for record in tx.run(query_cursos, cursos=lote_cursos)}
+
+        if raices:
+            tx.run(CYPHER_VINCULAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=sorted(raices)).consume()
+
+        if vinculos:
+            lote_vinculos = sorted(vinculos, key=lambda v: (v["origen"], v["destino"]))
+            tx.run(CYPHER_VINCULAR_LOTE, vinculos=lote_vinculos).consume()
+
+        return _resultado_estructura(voc_result, cursos, cursos_por_nombre, orden_procesado)
+
+    @staticmethod
+    def _obtener_subgrafo_vocacion_tx(tx, nombre_vocacion, nombres_cursos):
+        """
+        Trae en una sola consulta lo que hay hoy en Neo4j para una vocación: sus cursos iniciales,
+        los cursos alcanzables desde ella, los cursos pedidos que ya existen y las relaciones
+        PRECEDE_A entre todos ellos.
+        """
+        record = tx.run(CYPHER_SUBGRAFO_VOCACION, nombre_vocacion=nombre_vocacion, nombres_cursos=nombres_cursos).single()
+        return _subgrafo_de_registro(record)
+
+    @staticmethod
+    def _crear_estructura_diferencial_tx(tx, datos_voc):
+        """
+        Compara el árbol pedido con lo que ya existe para la vocación y escribe solo la diferencia:
+        cursos nuevos o con otra dificultad, cursos iniciales y relaciones PRECEDE_A que faltan o sobran.
+        Los cursos nunca se borran (pueden pertenecer a otras vocaciones); una relación PRECEDE_A que
+        sobra solo se elimina si su curso de origen no es alcanzable desde otra vocación.
+        """
+        vocacion_nombre = datos_voc.get("vocacion_nombre")
+        if not vocacion_nombre:
+            raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+        cursos, raices, vinculos, orden_procesado = Neo4jCRUD._aplanar_cursos_rama(vocacion_nombre, datos_voc.get("cursos_rama", []))
+        actual = Neo4jCRUD._obtener_subgrafo_vocacion_tx(tx, vocacion_nombre, sorted(cursos))
+        diferencia = _diferencia_estructura(cursos, raices, vinculos, actual)
+        cambios = diferencia["cambios"]
+        print(f"Procesando Vocación (carga diferencial): '{vocacion_nombre}': {len(diferencia['cursos_a_escribir'])} cursos, "
+              f"{len(diferencia['raices_a_agregar']) + len(diferencia['vinculos_a_agregar'])} relaciones nuevas y "
+              f"{len(diferencia['raices_a_quitar']) + len(diferencia['vinculos_a_quitar'])} por revisar.")
+
+        if actual["existe_vocacion"]:
+            voc_result = {"id_interno_neo4j": actual["id_vocacion"], "nombre": vocacion_nombre}
+        else:
+            voc_result = Neo4jCRUD._crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+
+        cursos_por_nombre = {nombre: {"id_interno_neo4j": curso["id"], "nombre": nombre, "dificultad": curso["dificultad"]}
+                             for nombre, curso in actual["cursos"].items()}
+        if diferencia["cursos_a_escribir"]:
+            for record in tx.run(CYPHER_MERGE_CURSOS_LOTE, cursos=diferencia["cursos_a_escribir"]):
+                cursos_por_nombre[record["nombre"]] = _curso_de_registro(record)
+
+        if diferencia["raices_a_agregar"]:
+            tx.run(CYPHER_VINCULAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=diferencia["raices_a_agregar"]).consume()
+        if diferencia["raices_a_quitar"]:
+            tx.run(CYPHER_QUITAR_RAICES, nombre_vocacion=vocacion_nombre, nombres_cursos=diferencia["raices_a_quitar"]).consume()
+
+        if diferencia["vinculos_a_agregar"]:
+            tx.run(CYPHER_VINCULAR_LOTE, vinculos=[{"origen": origen, "destino": destino} for origen, destino in diferencia["vinculos_a_agregar"]]).consume()
+        if diferencia["vinculos_a_quitar"]:
+            cambios["vinculos_eliminados"] = tx.run(CYPHER_QUITAR_VINCULOS, nombre_vocacion=vocacion_nombre,
+                                                    vinculos=[{"origen": origen, "destino": destino} for origen, destino in diferencia["vinculos_a_quitar"]]).single()["eliminados"]
+        cambios["vinculos_conservados"] = len(diferencia["vinculos_a_quitar"]) - cambios["vinculos_eliminados"]
 
+        return _resultado_estructura(voc_result, cursos, cursos_por_nombre, orden_procesado, cambios)
+
+    @staticmethod
+    def _crear_estructura_recursiva_tx(tx, datos_voc):
+        """Carga una vocación y su árbol de cursos con un MERGE por curso y por relación."""
+        vocacion_nombre = datos_voc.get("vocacion_nombre")
+        if not vocacion_nombre:
+            raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+
+        voc_result = Neo4jCRUD._crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
+        print(f"Procesando Vocación: '{voc_result['nombre']}'")
+
+        cursos_creados_info = []
+
+        def _procesar_cursos_recursivo(tx_inner, nombre_nodo_padre_actual, tipo_nodo_padre, lista_cursos_hijos_data):
+            for curso_data_actual in lista_cursos_hijos_data:
+                nombre_curso = curso_data_actual.get("nombre")
+                dificultad_curso = curso_data_actual.get("dificultad")
+
+                if not nombre_curso or not dificultad_curso:
+                    print(f"  Advertencia: Datos incompletos para un curso bajo '{nombre_nodo_padre_actual}'. Omitiendo.")
+                    continue
+
+                curso_result = Neo4jCRUD._crear_o_encontrar_curso_tx(tx_inner, nombre_curso, dificultad_curso)
+                print(f"  Procesando Curso: '{curso_result['nombre']}' (Dificultad: {dificultad_curso})")
+                cursos_creados_info.append(curso_result)
+
+                if tipo_nodo_padre == "Vocacion":
+                    if Neo4jCRUD._vincular_vocacion_a_curso_tx(tx_inner, nombre_nodo_padre_actual, nombre_curso):
+                        print(f"    Relación: Vocación '{nombre_nodo_padre_actual}' --TIENE_CURSO--> Curso '{nombre_curso}'")
+                    else:
+                        print(f"    Advertencia: No se pudo vincular Vocación '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
+                elif tipo_nodo_padre == "Curso":
+                    if Neo4jCRUD._vincular_curso_a_curso_tx(tx_inner, nombre_nodo_padre_actual, nombre_curso):
+                        print(f"    Relación: Curso '{nombre_nodo_padre_actual}' --PRECEDE_A--> Curso '{nombre_curso}'")
+                    else:
+                        print(f"    Advertencia: No se pudo vincular Curso '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
+                
+                cursos_siguientes_data = curso_data_actual.get("siguientes", [])
+                if cursos_siguientes_data:
+                    _procesar_cursos_recursivo(tx_inner, nombre_curso, "Curso", cursos_siguientes_data)
+        
+        cursos_rama_data = datos_voc.get("cursos_rama", [])
+        _procesar_cursos_recursivo(tx, vocacion_nombre, "Vocacion", cursos_rama_data)
+        
+        return {
+            "vocacion_procesada": voc_result,
+            "cursos_procesados_count": len(cursos_creados_info),
+            "detalle_cursos": cursos_creados_info,
+            "status": "Estructura de vocación y cursos procesada."
+        }
+
+    def crear_vocacion_con_ramas_desde_dict(self, datos_vocacion_completa, modo="recursivo"):
+        """
+        Crea (o actualiza) una vocación con todas sus ramas de cursos a partir de un diccionario.
+        modo="recursivo" procesa curso por curso; modo="masivo" aplana el árbol y lo escribe
+        con sentencias UNWIND en pocas idas y vueltas al servidor; modo="diferencial" lee lo que ya
+        existe de la vocación y escribe solo lo que cambió, incluidas las relaciones que ya no están
+        en el árbol (el resultado incluye el detalle en "cambios").
+        """
         if self._driver is None:
             print("Error: No hay conexión activa a Neo4j.")
             return None
 
-        def _tx_crear_estructura_completa(tx, datos_voc):
-            vocacion_nombre = datos_voc.get("vocacion_nombre")
-            if not vocacion_nombre:
-                raise ValueError("El diccionario debe contener 'vocacion_nombre'.")
+        if modo not in MODOS_CARGA:
+            print(f"Error: Modo de carga '{modo}' no válido. Use 'recursivo', 'masivo' o 'diferencial'.")
+            return None
 
-            voc_result = Neo4jCRUD._crear_o_encontrar_vocacion_tx(tx, vocacion_nombre)
-            print(f"Procesando Vocación: '{voc_result['nombre']}'")
-
-            cursos_creados_info = []
-
-            def _procesar_cursos_recursivo(tx_inner, nombre_nodo_padre_actual, tipo_nodo_padre, lista_cursos_hijos_data):
-                for curso_data_actual in lista_cursos_hijos_data:
-                    nombre_curso = curso_data_actual.get("nombre")
-                    dificultad_curso = curso_data_actual.get("dificultad")
-
-                    if not nombre_curso or not dificultad_curso:
-                        print(f"  Advertencia: Datos incompletos para un curso bajo '{nombre_nodo_padre_actual}'. Omitiendo.")
-                        continue
-
-                    curso_result = Neo4jCRUD._crear_o_encontrar_curso_tx(tx_inner, nombre_curso, dificultad_curso)
-                    print(f"  Procesando Curso: '{curso_result['nombre']}' (Dificultad: {dificultad_curso})")
-                    cursos_creados_info.append(curso_result)
-
-                    if tipo_nodo_padre == "Vocacion":
-                        if Neo4jCRUD._vincular_vocacion_a_curso_tx(tx_inner, nombre_nodo_padre_actual, nombre_curso):
-                            print(f"    Relación: Vocación '{nombre_nodo_padre_actual}' --TIENE_CURSO--> Curso '{nombre_curso}'")
-                        else:
-                            print(f"    Advertencia: No se pudo vincular Vocación '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
-                    elif tipo_nodo_padre == "Curso":
-                        if Neo4jCRUD._vincular_curso_a_curso_tx(tx_inner, nombre_nodo_padre_actual, nombre_curso):
-                            print(f"    Relación: Curso '{nombre_nodo_padre_actual}' --PRECEDE_A--> Curso '{nombre_curso}'")
-                        else:
-                            print(f"    Advertencia: No se pudo vincular Curso '{nombre_nodo_padre_actual}' a Curso '{nombre_curso}'. ¿Nodos existen?")
-                    
-                    cursos_siguientes_data = curso_data_actual.get("siguientes", [])
-                    if cursos_siguientes_data:
-                        _procesar_cursos_recursivo(tx_inner, nombre_curso, "Curso", cursos_siguientes_data)
-            
-            cursos_rama_data = datos_voc.get("cursos_rama", [])
-            _procesar_cursos_recursivo(tx, vocacion_nombre, "Vocacion", cursos_rama_data)
-            
-            return {
-                "vocacion_procesada": voc_result,
-                "cursos_procesados_count": len(cursos_creados_info),
-                "detalle_cursos": cursos_creados_info,
-                "status": "Estructura de vocación y cursos procesada."
-            }
+        tx_carga = MODOS_CARGA[modo]
+
+        def tx_estructura(tx, datos_voc):
+            tx_cambios = _TxConCambios(tx)
+            resultado_tx = tx_carga(tx_cambios, datos_voc)
+            if tx_cambios.hubo_cambios:
+                Neo4jCRUD._incrementar_version_grafo_tx(tx)
+            return resultado_tx, tx_cambios.hubo_cambios
 
         with self._driver.session(database=self._database) as session:
             try:
-                resultado = session.execute_write(_tx_crear_estructura_completa, datos_voc=datos_vocacion_completa)
+                resultado, hubo_cambios = self._ejecutar_medido(session, True, tx_estructura, {"datos_voc": datos_vocacion_completa}, tx_carga.__name__)
+                if hubo_cambios:
+                    self._instantanea_verificada_en = 0.0
+                    self._cache_lecturas.invalidar()
                 print(f"Resultado final del procesamiento de '{datos_vocacion_completa.get('vocacion_nombre')}': {resultado['status']}")
                 return resultado
             except ValueError as ve:
@@ -381,32 +1520,192 @@ class Neo4jCRUD:
                 return None 
 
     @staticmethod
-    def _obtener_rama_cursos_por_vocacion_tx(tx, nombre_vocacion):
-        query = (
-            "MATCH (v:Vocacion {nombre: $nombre_vocacion})-[r:TIENE_CURSO|PRECEDE_A*0..]->(c:Curso) "
-            "WITH v, c, r as rels "
-            "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad, size(rels) AS nivel "
-            "ORDER BY nivel, c.nombre" 
-        )
-        results = tx.run(query, nombre_vocacion=nombre_vocacion)
-        return [{"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"], "nivel_en_rama": record["nivel"]} for record in results]
+    def _crear_cursos_masivo_tx(tx, cursos):
+        """Crea o actualiza en una sola sentencia UNWIND una lista de cursos ordenada por nombre."""
+        summary = tx.run(CYPHER_CREAR_CURSOS_MASIVO, cursos=cursos).consume()
+        return summary.counters.nodes_created
+
+    def _cargar_vocacion_con_reintentos(self, datos_voc, max_reintentos):
+        """
+        Carga la estructura de una vocación en su propia sesión. execute_write ya reintenta, con espera
+        exponencial, los conflictos transitorios de bloqueo (p. ej. DeadlockDetected); aquí solo se cuentan
+        los intentos y se corta al llegar a max_reintentos. Retorna las métricas de la carga.
+        """
+        vocacion_nombre = datos_voc.get("vocacion_nombre")
+        intentos = 0
+        hubo_cambios = False
+
+        def _tx_vocacion(tx, datos_voc):
+            nonlocal intentos, hubo_cambios
+            intentos += 1
+            if intentos > max_reintentos:
+                raise RuntimeError(f"Se agotaron los {max_reintentos} intentos por conflictos transitorios.")
+            if intentos > 1:
+                print(f"Conflicto transitorio al cargar '{vocacion_nombre}' (intento {intentos}/{max_reintentos}).")
+            tx_cambios = _TxConCambios(tx)
+            resultado_tx = Neo4jCRUD._crear_estructura_masiva_tx(tx_cambios, datos_voc, actualizar_cursos=False)
+            hubo_cambios = tx_cambios.hubo_cambios
+            return resultado_tx
+
+        resultado = None
+        error = None
+        inicio = time.perf_counter()
+        try:
+            with self._driver.session(database=self._database) as session:
+                resultado = self._ejecutar_medido(session, True, _tx_vocacion, {"datos_voc": datos_voc}, "_crear_estructura_masiva_tx")
+        except Exception as e:
+            error = str(e)
+
+        return {
+            "vocacion_nombre": vocacion_nombre,
+            "exito": resultado is not None,
+            "segundos": time.perf_counter() - inicio,
+            "intentos": min(intentos, max_reintentos),
+            "hubo_cambios": hubo_cambios,
+            "cursos_procesados_count": resultado["cursos_procesados_count"] if resultado else 0,
+            "resultado": resultado,
+            "error": error
+        }
+
+    def cargar_vocaciones_en_paralelo(self, lista_datos_vocaciones, max_workers=4, max_reintentos=5):
+        """
+        Carga muchas vocaciones (mismo formato que crear_vocacion_con_ramas_desde_dict) de forma
+        concurrente, con un pool acotado de hilos que comparten el mismo driver.
+        Primero se crean, en una sola transacción y en orden, todos los cursos distintos del lote,
+        de modo que las cargas concurrentes solo agregan relaciones y no compiten por crear
+        los cursos compartidos. Retorna un reporte con tiempos por vocación y rendimiento total.
+        """
+        if self._driver is None:
+            print("Error: No hay conexión activa a Neo4j.")
+            return None
+
+        datos_validos = []
+        reporte_vocaciones = []
+        for datos_voc in lista_datos_vocaciones:
+            if not datos_voc.get("vocacion_nombre"):
+                print("Advertencia: Se omitió una vocación sin 'vocacion_nombre'.")
+                reporte_vocaciones.append({"vocacion_nombre": None, "exito": False, "segundos": 0.0, "intentos": 0,
+                                           "hubo_cambios": False, "cursos_procesados_count": 0, "resultado": None,
+                                           "error": "El diccionario debe contener 'vocacion_nombre'."})
+                continue
+            datos_validos.append(datos_voc)
+
+        inicio_total = time.perf_counter()
+
+        cursos_lote = {}
+        for datos_voc in datos_validos:
+            cursos, _, _, _ = Neo4jCRUD._aplanar_cursos_rama(datos_voc["vocacion_nombre"], datos_voc.get("cursos_rama", []))
+            cursos_lote.update(cursos)
+        lista_cursos = [{"nombre": nombre, "dificultad": dificultad} for nombre, dificultad in sorted(cursos_lote.items())]
+
+        def _tx_cursos(tx, cursos):
+            tx_cambios = _TxConCambios(tx)
+            return Neo4jCRUD._crear_cursos_masivo_tx(tx_cambios, cursos), tx_cambios.hubo_cambios
 
-    def obtener_rama_cursos_por_vocacion(self, nombre_vocacion):
-        return self._ejecutar_lectura(self._obtener_rama_cursos_por_vocacion_tx, nombre_vocacion=nombre_vocacion)
+        with self._driver.session(database=self._database) as session:
+            try:
+                cursos_nuevos, cursos_cambiados = self._ejecutar_medido(session, True, _tx_cursos, {"cursos": lista_cursos}, "_crear_cursos_masivo_tx")
+                print(f"Cursos compartidos asegurados: {len(lista_cursos)} ({cursos_nuevos} nuevos).")
+            except Exception as e:
+                print(f"Error al crear los cursos compartidos de la carga paralela: {e}")
+                return None
+        segundos_cursos = time.perf_counter() - inicio_total
+
+        max_workers = max(1, min(max_workers, len(datos_validos) or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            reporte_vocaciones.extend(pool.map(lambda datos_voc: self._cargar_vocacion_con_reintentos(datos_voc, max_reintentos), datos_validos))
+
+        # Un solo incremento de versión al final para no serializar las cargas en el nodo :MetaCamino,
+        # y ninguno si la carga no cambió nada.
+        if cursos_cambiados or any(r["hubo_cambios"] for r in reporte_vocaciones):
+            with self._driver.session(database=self._database) as session:
+                try:
+                    self._ejecutar_medido(session, True, self._incrementar_version_grafo_tx, {})
+                except Exception as e:
+                    print(f"Advertencia: No se pudo actualizar la versión del grafo: {e}")
+            self._instantanea_verificada_en = 0.0
+            self._cache_lecturas.invalidar()
+
+        total_segundos = time.perf_counter() - inicio_total
+        exitosas = [r for r in reporte_vocaciones if r["exito"]]
+        total_cursos = sum(r["cursos_procesados_count"] for r in exitosas)
+        reporte = {
+            "vocaciones": reporte_vocaciones,
+            "vocaciones_exitosas": len(exitosas),
+            "vocaciones_fallidas": len(reporte_vocaciones) - len(exitosas),
+            "cursos_distintos": len(lista_cursos),
+            "max_workers": max_workers,
+            "segundos_cursos_compartidos": segundos_cursos,
+            "total_segundos": total_segundos,
+            "vocaciones_por_segundo": len(exitosas) / total_segundos if total_segundos > 0 else 0.0,
+            "cursos_por_segundo": total_cursos / total_segundos if total_segundos > 0 else 0.0
+        }
+        print(f"Carga paralela finalizada: {reporte['vocaciones_exitosas']} exitosas, {reporte['vocaciones_fallidas']} fallidas "
+              f"en {total_segundos:.2f}s ({reporte['vocaciones_por_segundo']:.2f} vocaciones/s, {max_workers} hilos).")
+        return reporte
+
+    # --- Sincronización desde MongoDB ---
+    @staticmethod
+    def _aplicar_cambios_catalogo_tx(tx, vocaciones, cursos, eliminados):
+        """
+        Aplica un lote de cambios del catálogo de MongoDB con sentencias UNWIND. Cada nodo guarda el
+        _id de Mongo en 'id_mongo': se busca primero por ese id (así un cambio de nombre no crea otro
+        nodo) y si no existe, por nombre, para adoptar los nodos cargados antes de sincronizar.
+        """
+        resumen = {"vocaciones": 0, "cursos": 0, "eliminados": 0}
+        for etiqueta, clave, filas in (("Vocacion", "vocaciones", vocaciones), ("Curso", "cursos", cursos)):
+            if not filas:
+                continue
+            actualizados = {record["id_mongo"] for record in tx.run(CYPHER_CATALOGO_POR_ID[etiqueta], filas=filas)}
+            nuevos = [fila for fila in filas if fila["id_mongo"] not in actualizados]
+            if nuevos:
+                tx.run(CYPHER_CATALOGO_POR_NOMBRE[etiqueta], filas=nuevos).consume()
+            resumen[clave] = len(filas)
+
+        for etiqueta in ("Vocacion", "Curso"):
+            filas = [fila for fila in eliminados if fila["etiqueta"] == etiqueta]
+            if not filas:
+                continue
+            for query in CYPHER_CATALOGO_ELIMINAR[etiqueta]:
+                resumen["eliminados"] += tx.run(query, filas=filas).single()["eliminados"]
+        return resumen
+
+    def aplicar_cambios_catalogo(self, vocaciones=None, cursos=None, eliminados=None):
+        """
+        Aplica en Neo4j, en una sola transacción, un lote de cambios del catálogo de MongoDB:
+        vocaciones [{"id_mongo", "nombre"}], cursos [{"id_mongo", "nombre", "dificultad"}] y
+        eliminados [{"etiqueta", "id_mongo", "nombre"}]. Retorna los conteos aplicados o None si falla.
+        Lo usa SincronizadorCatalogo (sincronizaciontest.py).
+        """
+        resultado, _ = self._ejecutar_transaccion(self._aplicar_cambios_catalogo_tx, vocaciones=vocaciones or [],
+                                                  cursos=cursos or [], eliminados=eliminados or [])
+        return resultado
+
+    @staticmethod
+    def _obtener_rama_cursos_por_vocacion_tx(tx, nombre_vocacion, max_depth=None):
+        """
+        Función transaccional que trae una sola vez cada nodo alcanzable desde la vocación (DISTINCT,
+        sin enumerar caminos) junto con sus sucesores directos; el nivel mínimo se calcula en anchura.
+        """
+        return _rama_cursos_de_registros(tx.run(consulta_rama_cursos(max_depth), nombre_vocacion=nombre_vocacion), max_depth)
+
+    def obtener_rama_cursos_por_vocacion(self, nombre_vocacion, max_depth=None):
+        """
+        Retorna cada curso alcanzable desde la vocación una sola vez, con su nivel mínimo en la rama
+        (1 para los cursos iniciales). 'max_depth' limita la profundidad del recorrido.
+        """
+        if max_depth is not None and max_depth < 0:
+            print("Error: max_depth debe ser un entero no negativo.")
+            return []
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_cursos_por_vocacion(nombre_vocacion, max_depth)
+        return self._ejecutar_lectura(self._obtener_rama_cursos_por_vocacion_tx, nombre_vocacion=nombre_vocacion, max_depth=max_depth)
     
     @staticmethod
     def _obtener_cursos_directos_por_vocacion_tx(tx, nombre_vocacion):
         """Función transaccional para obtener cursos directamente relacionados con una vocación."""
-        query = (
-            "MATCH (v:Vocacion {nombre: $nombre_vocacion})-[:TIENE_CURSO]->(c:Curso) "
-            "RETURN id(c) AS id, c.nombre AS nombre, c.dificultad AS dificultad "
-            "ORDER BY c.nombre"
-        )
-        results = tx.run(query, nombre_vocacion=nombre_vocacion)
-        return [
-            {"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]}
-            for record in results
-        ]
+        return [_curso_de_registro(record) for record in tx.run(CYPHER_CURSOS_DIRECTOS, nombre_vocacion=nombre_vocacion)]
 
     def obtener_cursos_directos_por_vocacion(self, nombre_vocacion):
         """
@@ -414,23 +1713,15 @@ class Neo4jCRUD:
         (los cursos iniciales de cada rama).
         """
         print(f"\nBuscando cursos directamente relacionados con la vocación: '{nombre_vocacion}'...")
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.cursos_directos_por_vocacion(nombre_vocacion)
         return self._ejecutar_lectura(self._obtener_cursos_directos_por_vocacion_tx, nombre_vocacion=nombre_vocacion)
 
     @staticmethod
     def _obtener_cursos_siguientes_de_lista_tx(tx, nombres_cursos_actuales):
         """Función transaccional para obtener el siguiente nivel de cursos desde una lista."""
-        query = (
-            "UNWIND $nombres_cursos AS nombre_curso_actual "
-            "MATCH (:Curso {nombre: nombre_curso_actual})-[:PRECEDE_A]->(c_siguiente:Curso) "
-            "WITH c_siguiente "
-            "RETURN DISTINCT id(c_siguiente) AS id, c_siguiente.nombre AS nombre, c_siguiente.dificultad AS dificultad "
-            "ORDER BY nombre"
-        )
-        results = tx.run(query, nombres_cursos=nombres_cursos_actuales)
-        return [
-            {"id_interno_neo4j": record["id"], "nombre": record["nombre"], "dificultad": record["dificultad"]}
-            for record in results
-        ]
+        return [_curso_de_registro(record) for record in tx.run(CYPHER_SIGUIENTES_DE_LISTA, nombres_cursos=nombres_cursos_actuales)]
 
     def obtener_cursos_siguientes_de_lista(self, nombres_cursos_actuales):
         """
@@ -438,6 +1729,9 @@ class Neo4jCRUD:
         de los cursos en la lista de nombres recibida. Sin duplicados.
         """
         print(f"\nBuscando cursos siguientes a: {nombres_cursos_actuales}...")
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.cursos_siguientes_de_lista(nombres_cursos_actuales)
         return self._ejecutar_lectura(self._obtener_cursos_siguientes_de_lista_tx, nombres_cursos_actuales=nombres_cursos_actuales)
 
     @staticmethod
@@ -446,25 +1740,7 @@ class Neo4jCRUD:
         Función transaccional para obtener todos los nodos predecesores
         de una lista de cursos.
         """
-        query = (
-            "UNWIND $nombres_cursos AS nombre_curso_actual "
-            "MATCH (c_actual:Curso {nombre: nombre_curso_actual}) "
-            "MATCH path = (predecesor)-[:TIENE_CURSO|PRECEDE_A*]->(c_actual) "
-            "UNWIND nodes(path) AS nodo_en_rama "
-            "WITH DISTINCT nodo_en_rama "
-            "RETURN id(nodo_en_rama) AS id, labels(nodo_en_rama)[0] AS tipo_nodo, nodo_en_rama.nombre AS nombre, "
-            "CASE WHEN 'Curso' IN labels(nodo_en_rama) THEN nodo_en_rama.dificultad ELSE NULL "
-            "END AS dificultad "
-            "ORDER BY tipo_nodo DESC, nombre "
-        )
-        results = tx.run(query, nombres_cursos=nombres_cursos_actuales)
-        nodos_predecesores = []
-        for record in results:
-            data = {"id_interno_neo4j": record["id"], "tipo_nodo": record["tipo_nodo"], "nombre": record["nombre"]}
-            if record["tipo_nodo"] == "Curso":
-                data["dificultad"] = record["dificultad"]
-            nodos_predecesores.append(data)
-        return nodos_predecesores
+        return [_nodo_de_registro(record) for record in tx.run(CYPHER_RAMA_PREDECESORA, nombres_cursos=nombres_cursos_actuales)]
 
     def obtener_rama_predecesora_completa(self, nombres_cursos_actuales):
         """
@@ -472,8 +1748,101 @@ class Neo4jCRUD:
         de los cursos en la lista de nombres recibida. Sin duplicados.
         """
         print(f"\nBuscando la rama predecesora completa de: {nombres_cursos_actuales}...")
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_predecesora_completa(nombres_cursos_actuales)
         return self._ejecutar_lectura(self._obtener_rama_predecesora_completa_tx, nombres_cursos_actuales=nombres_cursos_actuales)
-        
+
+    @staticmethod
+    def _obtener_rama_sucesora_completa_tx(tx, nombres_cursos_actuales):
+        """
+        Función transaccional para obtener todos los nodos sucesores
+        de una lista de cursos.
+        """
+        return [_nodo_de_registro(record) for record in tx.run(CYPHER_RAMA_SUCESORA, nombres_cursos=nombres_cursos_actuales)]
+
+    def obtener_rama_sucesora_completa(self, nombres_cursos_actuales):
+        """
+        Retorna toda la rama de cursos sucesores (más lejanos al inicio)
+        de los cursos en la lista de nombres recibida. Sin duplicados.
+        """
+        print(f"\nBuscando la rama sucesora completa de: {nombres_cursos_actuales}...")
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.rama_sucesora_completa(nombres_cursos_actuales)
+        return self._ejecutar_lectura(self._obtener_rama_sucesora_completa_tx, nombres_cursos_actuales=nombres_cursos_actuales)
+
+    @staticmethod
+    def _obtener_camino_usuario_tx(tx, nombres_cursos_completados):
+        """
+        Función transaccional que obtiene en una sola consulta la rama completada (cursos completados
+        y todos sus predecesores), los siguientes pasos y las relaciones entre ellos.
+        """
+        return _camino_de_registro(tx.run(CYPHER_CAMINO_USUARIO, nombres_cursos=nombres_cursos_completados).single())
+
+    def obtener_camino_usuario(self, progreso):
+        """
+        Retorna en una sola ida y vuelta lo que necesitan las vistas de camino y de cursos:
+        {"rama_completada": cursos completados y todos sus predecesores (cursos y vocaciones),
+         "siguientes": cursos un nivel por encima del progreso, sin los ya completados,
+         "profundidad_maxima": nivel más profundo del camino}.
+        Cada nodo incluye su 'nivel' en la rama (0 para el inicio).
+        """
+        print(f"\nBuscando el camino de aprendizaje para el progreso: {progreso}...")
+        if not progreso:
+            return armar_camino_usuario([], [], [])
+        instantanea = self._instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.camino_usuario(progreso)
+        resultado = self._ejecutar_lectura(self._obtener_camino_usuario_tx, nombres_cursos_completados=list(progreso))
+        return resultado or armar_camino_usuario([], [], [])
+
+    def planificar_camino(self, progreso, objetivo, tipo_objetivo="Curso"):
+        """
+        Retorna la secuencia ordenada de todos los cursos que faltan para llegar al curso (o a todos
+        los cursos de la vocación) 'objetivo': respeta PRECEDE_A y, entre los cursos disponibles,
+        sigue el orden de dificultad. Se calcula sobre la instantánea local (se activa si hace falta),
+        sin consultas por paso, y se memoriza por versión del grafo y progreso. Los ciclos de
+        prerrequisitos se informan en 'ciclos' y los cursos que dependen de ellos en 'bloqueados'.
+        """
+        if not self._instantanea_activa and not self.activar_instantanea_local():
+            return None
+        instantanea = self._instantanea_vigente()
+        if instantanea is None:
+            print("Error: No se pudo obtener la instantánea del grafo para planificar el camino.")
+            return None
+        return self._planificador.planificar(instantanea, progreso, objetivo, tipo_objetivo)
+
+    def planificar_caminos(self, progresos_por_usuario, objetivo, tipo_objetivo="Curso"):
+        """planificar_camino para muchos usuarios: {usuario: progreso} -> {usuario: plan}."""
+        return {usuario: self.planificar_camino(progreso, objetivo, tipo_objetivo) for usuario, progreso in progresos_por_usuario.items()}
+
+    def estadisticas_planificador(self):
+        return self._planificador.estadisticas()
+
+
+# modo de crear_vocacion_con_ramas_desde_dict -> función transaccional de carga
+MODOS_CARGA = {
+    "recursivo": Neo4jCRUD._crear_estructura_recursiva_tx,
+    "masivo": Neo4jCRUD._crear_estructura_masiva_tx,
+    "diferencial": Neo4jCRUD._crear_estructura_diferencial_tx,
+}
+
+
+def crear_gestor_grafo(backend=None, **opciones):
+    """
+    Crea el gestor del grafo con la interfaz de Neo4jCRUD para el backend indicado:
+    "neo4j" (por defecto) o "memoria" (GrafoMemoriaCRUD, sin servidor). Si no se indica,
+    se toma de la variable de entorno CAMINO_BACKEND_GRAFO. Las opciones se pasan al constructor.
+    """
+    backend = (backend or os.environ.get(VARIABLE_BACKEND_GRAFO) or "neo4j").lower()
+    if backend == "neo4j":
+        return Neo4jCRUD(**opciones)
+    if backend == "memoria":
+        from grafomemoriacrudtest import GrafoMemoriaCRUD
+        return GrafoMemoriaCRUD(**opciones)
+    print(f"Error: Backend de grafo '{backend}' no válido. Use 'neo4j' o 'memoria'.")
+    return None
 
 
 if __name__ == "__main__":
@@ -485,12 +1854,9 @@ if __name__ == "__main__":
     else:
         print("\n--- Iniciando Demo CRUD Neo4j ---")
 
-        # try:
-        #     gestor_neo4j._ejecutar_transaccion(lambda tx: tx.run("CREATE CONSTRAINT vocacion_nombre_unique IF NOT EXISTS FOR (v:Vocacion) REQUIRE v.nombre IS UNIQUE"))
-        #     gestor_neo4j._ejecutar_transaccion(lambda tx: tx.run("CREATE CONSTRAINT curso_nombre_unique IF NOT EXISTS FOR (c:Curso) REQUIRE c.nombre IS UNIQUE"))
-        #     print("Constraints de unicidad para nombre de Vocacion y Curso aseguradas (o ya existían).")
-        # except Exception as e:
-        #     print(f"Advertencia al crear constraints (pueden ya existir): {e}")
+        # Los constraints e índices se aseguran al crear el driver (ver asegurar_esquema).
+        print("\n--- Uso de índices por consulta ---")
+        gestor_neo4j.reportar_uso_de_indices()
 
 
         datos_para_carga_masiva_neo4j = [
@@ -755,22 +2121,13 @@ if __name__ == "__main__":
         #Carga masiva de datos
         """
         if gestor_neo4j._driver:
-            try:
-                with gestor_neo4j._driver.session() as s:
-                    s.run("CREATE CONSTRAINT vocacion_nombre_unique IF NOT EXISTS FOR (v:Vocacion) REQUIRE v.nombre IS UNIQUE")
-                    s.run("CREATE CONSTRAINT curso_nombre_unique IF NOT EXISTS FOR (c:Curso) REQUIRE c.nombre IS UNIQUE")
-                    print("Constraints de unicidad para Vocacion.nombre y Curso.nombre aseguradas.")
-            except Exception as e_constraint:
-                print(f"Advertencia al crear constraints (pueden ya existir o error de permisos): {e_constraint}")
-
-            for vocacion_data in datos_para_carga_masiva_neo4j:
-                print(f"\n--- Cargando Vocación: {vocacion_data['vocacion_nombre']} ---")
-                resultado = gestor_neo4j.crear_vocacion_con_ramas_desde_dict(vocacion_data)
-                if resultado:
-                    print(f"Carga para '{vocacion_data['vocacion_nombre']}' completada con estado: {resultado.get('status')}")
-                else:
-                    print(f"Error al cargar la vocación: {vocacion_data['vocacion_nombre']}")
-                    gestor_neo4j.close()
+            reporte_carga = gestor_neo4j.cargar_vocaciones_en_paralelo(datos_para_carga_masiva_neo4j, max_workers=4)
+            if reporte_carga:
+                for r in reporte_carga["vocaciones"]:
+                    estado = "OK" if r["exito"] else f"ERROR ({r['error']})"
+                    print(f"  {r['vocacion_nombre']}: {estado} - {r['segundos']:.2f}s, {r['intentos']} intento(s), {r['cursos_procesados_count']} cursos")
+            else:
+                print("Error en la carga masiva de vocaciones.")
         else:
             print("No se pudo conectar a Neo4j para la carga masiva.")
 
@@ -867,8 +2224,8 @@ if __name__ == "__main__":
         print("\n--- Todas las Vocaciones ---")
         for v in gestor_neo4j.obtener_vocaciones(): print(v)
         
-        print("\n--- Todos los Cursos ---")
-        for c in gestor_neo4j.obtener_cursos(): print(c)
+        print("\n--- Todos los Cursos (paginados) ---")
+        for c in gestor_neo4j.iterar_cursos(tamano_pagina=100): print(c)
 
         print("\n--- Cursos de Dificultad 'Fácil' ---")
         for c in gestor_neo4j.obtener_cursos_por_dificultad("Fácil"): print(c)
@@ -916,6 +2273,9 @@ if __name__ == "__main__":
         # print("\n--- Todas las Vocaciones después de eliminar 'Ciencia de Datos' ---")
         # for v in gestor_neo4j.obtener_vocaciones(): print(v)
         """
+        print("\n--- Métricas de las transacciones (JSON) ---")
+        print(gestor_neo4j.exportar_metricas_json())
+
         # Cerrar la conexión
         gestor_neo4j.close()
         print("\n--- Demo Finalizada ---")
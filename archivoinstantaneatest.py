@@ -0,0 +1,360 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+import bson
+from bson.objectid import ObjectId
+from grafomemoriatest import InstantaneaGrafo, TIPOS_RELACION
+from conexionmongotest import ahora_utc
+from metricastest import formatear_fases, medir_fase
+
+MAGICO = b"CMNI"
+VERSION_FORMATO = 1
+SIN_CADENA = 0xFFFFFFFF
+SIN_MARCA = -1
+ALINEACION = 8
+# magico, formato, reservado, version del grafo, generado en (ms), cadenas, nodos, aristas, documentos
+# de cursos y de bibliografías, y la marca (ms) hasta la que se leyó el catálogo de Mongo.
+CABECERA = struct.Struct("<4sHHqqIIIIIq")
+RUTA_ARCHIVO_PREDETERMINADA = "instantanea_camino.bin"
+VARIABLE_ARCHIVO_INSTANTANEA = "CAMINO_ARCHIVO_INSTANTANEA"
+COLLECTION_NAME_CURSOS = "cursos"
+COLLECTION_NAME_BIBLIOGRAFIAS = "bibliografias"
+COLLECTION_NAME_ELIMINACIONES = "catalogo_eliminaciones"
+# Las marcas de eliminación de cursos y bibliografías que deja cada CRUD.
+ETIQUETAS_ELIMINACION = {"Curso": COLLECTION_NAME_CURSOS, "Bibliografia": COLLECTION_NAME_BIBLIOGRAFIAS}
+# Al traer cambios se relee este margen antes de la marca, por escrituras con un reloj algo atrasado.
+MARGEN_SEGUNDOS_CAMBIOS = 5.0
+EPOCA = datetime(1970, 1, 1)
+
+
+def ruta_archivo_instantanea():
+    """Ruta del archivo: la variable de entorno CAMINO_ARCHIVO_INSTANTANEA o instantanea_camino.bin."""
+    return os.environ.get(VARIABLE_ARCHIVO_INSTANTANEA) or RUTA_ARCHIVO_PREDETERMINADA
+
+
+def _a_milisegundos(fecha):
+    return SIN_MARCA if fecha is None else int((fecha - EPOCA).total_seconds() * 1000)
+
+
+def _desde_milisegundos(milisegundos):
+    return None if milisegundos == SIN_MARCA else EPOCA + timedelta(milliseconds=milisegundos)
+
+
+def _relleno(tamano):
+    return b"\0" * (-tamano % ALINEACION)
+
+
+class CatalogoLocal:
+    """
+    Copia en memoria de las colecciones 'cursos' y 'bibliografias', indexadas por _id, con las
+    mismas lecturas por nombre y por título que usan las ventanas (CursosCRUD y BiblioCRUD).
+    'leido_hasta' es el momento de la última lectura en Mongo; traer_cambios parte de ahí.
+    """
+
+    def __init__(self, cursos=(), bibliografias=(), leido_hasta=None):
+        self.documentos = {
+            COLLECTION_NAME_CURSOS: {doc["_id"]: doc for doc in cursos},
+            COLLECTION_NAME_BIBLIOGRAFIAS: {doc["_id"]: doc for doc in bibliografias},
+        }
+        self.leido_hasta = leido_hasta
+
+    @classmethod
+    def desde_mongo(cls, db):
+        """Lee completas ambas colecciones. Retorna None si falla."""
+        try:
+            leido_hasta = ahora_utc()
+            return cls(db[COLLECTION_NAME_CURSOS].find(), db[COLLECTION_NAME_BIBLIOGRAFIAS].find(), leido_hasta)
+        except Exception as e:
+            print(f"Error al leer el catálogo de MongoDB: {e}")
+            return None
+
+    def cursos(self):
+        return list(self.documentos[COLLECTION_NAME_CURSOS].values())
+
+    def bibliografias(self):
+        return list(self.documentos[COLLECTION_NAME_BIBLIOGRAFIAS].values())
+
+    def leer_cursos_por_nombres(self, lista_nombres):
+        nombres = set(lista_nombres)
+        return [doc for doc in self.documentos[COLLECTION_NAME_CURSOS].values() if doc.get("nombre") in nombres]
+
+    def leer_bibliografias_por_titulos(self, lista_titulos):
+        titulos = set(lista_titulos)
+        return [doc for doc in self.documentos[COLLECTION_NAME_BIBLIOGRAFIAS].values() if doc.get("titulo") in titulos]
+
+    def traer_cambios(self, db, margen_segundos=MARGEN_SEGUNDOS_CAMBIOS):
+        """
+        Trae de Mongo solo los documentos creados, modificados ('actualizado_en') o eliminados
+        (marcas de 'catalogo_eliminaciones') desde 'leido_hasta'. Retorna cuántos cambios aplicó,
+        o None si falla; sin 'leido_hasta' no hay desde dónde partir y se retorna None.
+        """
+        if self.leido_hasta is None:
+            return None
+        try:
+            leido_hasta = ahora_utc()
+            desde = {"actualizado_en": {"$gte": self.leido_hasta - timedelta(seconds=margen_segundos)}}
+            cambios = 0
+            for nombre_coleccion, documentos in self.documentos.items():
+                for doc in db[nombre_coleccion].find(desde):
+                    if documentos.get(doc["_id"]) != doc:
+                        documentos[doc["_id"]] = doc
+                        cambios += 1
+            for marca in db[COLLECTION_NAME_ELIMINACIONES].find(dict(desde, etiqueta={"$in": list(ETIQUETAS_ELIMINACION)})):
+                documentos = self.documentos[ETIQUETAS_ELIMINACION[marca["etiqueta"]]]
+                id_mongo = marca.get("id_mongo")
+                if ObjectId.is_valid(id_mongo) and documentos.pop(ObjectId(id_mongo), None) is not None:
+                    cambios += 1
+            self.leido_hasta = leido_hasta
+            return cambios
+        except Exception as e:
+            print(f"Error al traer los cambios del catálogo: {e}")
+            return None
+
+
+def escribir_archivo_instantanea(ruta, instantanea, catalogo):
+    """
+    Escribe el grafo y el catálogo en un archivo binario compacto:
+    cabecera | tabla de cadenas (offsets + UTF-8) | nodos (id, etiqueta, nombre, dificultad)
+    | aristas (origen, destino, tipo) | documentos del catálogo (offsets + BSON).
+    Los nodos se renumeran sin huecos y las secciones quedan alineadas a 8 bytes para poder
+    leerlas directamente del archivo mapeado en memoria. Se escribe a un temporal y se renombra,
+    así quien lo lea nunca ve un archivo a medias. Retorna los bytes escritos o None si falla.
+    """
+    cadenas = {}
+    tabla = []
+
+    def _id_cadena(texto):
+        if texto is None:
+            return SIN_CADENA
+        if texto not in cadenas:
+            cadenas[texto] = len(tabla)
+            tabla.append(texto.encode("utf-8"))
+        return cadenas[texto]
+
+    vivos = [indice for indice in range(len(instantanea.nombres)) if indice not in instantanea.eliminados]
+    nuevo_indice = {indice: posicion for posicion, indice in enumerate(vivos)}
+    ids = array("q", (instantanea.ids_neo4j[indice] for indice in vivos))
+    etiquetas = array("I", (_id_cadena(instantanea.etiqueta(indice)) for indice in vivos))
+    nombres = array("I", (_id_cadena(instantanea.nombres[indice]) for indice in vivos))
+    dificultades = array("I", (_id_cadena(instantanea.dificultades[indice]) for indice in vivos))
+    origenes, destinos, tipos = array("I"), array("I"), bytearray()
+    for indice in vivos:
+        for vecino, tipo in zip(instantanea.sucesores[indice], instantanea.tipos_sucesores[indice]):
+            origenes.append(nuevo_indice[indice])
+            destinos.append(nuevo_indice[vecino])
+            tipos.append(tipo)
+
+    offsets_cadenas = array("I", [0])
+    for cadena in tabla:
+        offsets_cadenas.append(offsets_cadenas[-1] + len(cadena))
+    cursos = catalogo.cursos() if catalogo else []
+    bibliografias = catalogo.bibliografias() if catalogo else []
+    bloques = [bson.encode(doc) for doc in cursos + bibliografias]
+    offsets_documentos = array("I", [0])
+    for bloque in bloques:
+        offsets_documentos.append(offsets_documentos[-1] + len(bloque))
+
+    if sys.byteorder != "little":
+        for arreglo in (ids, etiquetas, nombres, dificultades, origenes, destinos, offsets_cadenas, offsets_documentos):
+            arreglo.byteswap()
+
+    cabecera = CABECERA.pack(MAGICO, VERSION_FORMATO, 0, instantanea.version, _a_milisegundos(ahora_utc()),
+                             len(tabla), len(vivos), len(origenes), len(cursos), len(bibliografias),
+                             _a_milisegundos(catalogo.leido_hasta if catalogo else None))
+    secciones = [cabecera, offsets_cadenas.tobytes(), b"".join(tabla), ids.tobytes(), etiquetas.tobytes(),
+                 nombres.tobytes(), dificultades.tobytes(), origenes.tobytes(), destinos.tobytes(), bytes(tipos),
+                 offsets_documentos.tobytes(), b"".join(bloques)]
+    temporal = f"{ruta}.tmp"
+    try:
+        escritos = 0
+        with open(temporal, "wb") as archivo:
+            for seccion in secciones:
+                archivo.write(seccion)
+                archivo.write(_relleno(len(seccion)))
+                escritos += len(seccion) + len(_relleno(len(seccion)))
+        os.replace(temporal, ruta)
+        print(f"Archivo de instantánea '{ruta}' escrito: {len(vivos)} nodos, {len(origenes)} relaciones, "
+              f"{len(bloques)} documentos, {escritos} bytes, versión {instantanea.version}.")
+        return escritos
+    except Exception as e:
+        print(f"Error al escribir el archivo de instantánea '{ruta}': {e}")
+        return None
+
+
+class ArchivoInstantanea:
+    """
+    Lectura de un archivo escrito por escribir_archivo_instantanea. El archivo se mapea en memoria
+    y los arreglos de enteros se leen sin copiarlos; las cadenas y los documentos se decodifican
+    solo al pedirlos. Lanza ValueError si el archivo no tiene el formato esperado.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._archivo.close()
+            raise
+        self._vistas = [memoryview(self._mapa)]
+        try:
+            self._leer_secciones()
+        except Exception:
+            self.close()
+            raise
+
+    def _leer_secciones(self):
+        if len(self._mapa) < CABECERA.size:
+            raise ValueError("archivo incompleto")
+        (magico, formato, _, self.version_grafo, generado_en, num_cadenas, self.num_nodos, self.num_aristas,
+         self.num_cursos, self.num_bibliografias, leido_hasta) = CABECERA.unpack_from(self._mapa, 0)
+        if magico != MAGICO or formato != VERSION_FORMATO:
+            raise ValueError(f"formato no reconocido ({magico!r}, versión {formato})")
+        self.generado_en = _desde_milisegundos(generado_en)
+        self.leido_hasta = _desde_milisegundos(leido_hasta)
+        self._posicion = CABECERA.size + len(_relleno(CABECERA.size))
+        self._offsets_cadenas = self._seccion("I", num_cadenas + 1)
+        self._cadenas = self._seccion("B", self._offsets_cadenas[-1])
+        self._ids = self._seccion("q", self.num_nodos)
+        self._etiquetas = self._seccion("I", self.num_nodos)
+        self._nombres = self._seccion("I", self.num_nodos)
+        self._dificultades = self._seccion("I", self.num_nodos)
+        self._origenes = self._seccion("I", self.num_aristas)
+        self._destinos = self._seccion("I", self.num_aristas)
+        self._tipos = self._seccion("B", self.num_aristas)
+        self._offsets_documentos = self._seccion("I", self.num_cursos + self.num_bibliografias + 1)
+        self._documentos = self._seccion("B", self._offsets_documentos[-1])
+
+    def _seccion(self, formato, cantidad):
+        tamano = struct.calcsize(formato) * cantidad
+        if self._posicion + tamano > len(self._mapa):
+            raise ValueError("archivo incompleto")
+        vista = self._vistas[0][self._posicion:self._posicion + tamano]
+        self._vistas.append(vista)
+        self._posicion += tamano + len(_relleno(tamano))
+        if sys.byteorder != "little" and formato != "B":
+            arreglo = array(formato, vista)
+            arreglo.byteswap()
+            return arreglo
+        arreglo = vista.cast(formato)
+        self._vistas.append(arreglo)
+        return arreglo
+
+    def cadena(self, indice):
+        if indice == SIN_CADENA:
+            return None
+        return bytes(self._cadenas[self._offsets_cadenas[indice]:self._offsets_cadenas[indice + 1]]).decode("utf-8")
+
+    def instantanea(self, usar_indice_clausura=True):
+        """Arma una InstantaneaGrafo con los nodos y relaciones del archivo."""
+        instantanea = InstantaneaGrafo(self.version_grafo, usar_indice_clausura=usar_indice_clausura)
+        cadenas = {}
+
+        def _cadena(indice):
+            if indice not in cadenas:
+                cadenas[indice] = self.cadena(indice)
+            return cadenas[indice]
+
+        for indice in range(self.num_nodos):
+            instantanea.agregar_nodo(self._ids[indice], _cadena(self._etiquetas[indice]), _cadena(self._nombres[indice]),
+                                     _cadena(self._dificultades[indice]))
+        for origen, destino, tipo in zip(self._origenes, self._destinos, self._tipos):
+            instantanea.agregar_relacion(self._ids[origen], self._ids[destino], TIPOS_RELACION[tipo])
+        return instantanea
+
+    def _leer_documentos(self, desde, hasta):
+        return [bson.decode(bytes(self._documentos[self._offsets_documentos[i]:self._offsets_documentos[i + 1]]))
+                for i in range(desde, hasta)]
+
+    def catalogo(self):
+        """Retorna un CatalogoLocal con los cursos y bibliografías del archivo."""
+        return CatalogoLocal(self._leer_documentos(0, self.num_cursos),
+                             self._leer_documentos(self.num_cursos, self.num_cursos + self.num_bibliografias),
+                             self.leido_hasta)
+
+    def close(self):
+        # El mapa no se puede cerrar mientras queden vistas sobre él.
+        for vista in reversed(self._vistas):
+            vista.release()
+        self._vistas = []
+        self._mapa.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def exportar_archivo_instantanea(gestor_grafo, db, ruta=None):
+    """
+    Escribe el archivo con el grafo del gestor (cargando su instantánea local si hace falta) y el
+    catálogo completo de Mongo. Retorna el CatalogoLocal exportado o None si falla.
+    """
+    ruta = ruta or ruta_archivo_instantanea()
+    instantanea = gestor_grafo.instantanea_local()
+    if instantanea is None and gestor_grafo.activar_instantanea_local():
+        instantanea = gestor_grafo.instantanea_local()
+    if instantanea is None:
+        print("Error: No se pudo cargar el grafo para exportar la instantánea.")
+        return None
+    catalogo = CatalogoLocal.desde_mongo(db)
+    if catalogo is None or escribir_archivo_instantanea(ruta, instantanea, catalogo) is None:
+        return None
+    return catalogo
+
+
+def cargar_archivo_instantanea(gestor_grafo, db=None, ruta=None, actualizar_archivo=True):
+    """
+    Arranque en frío desde el archivo: el grafo leído se entrega al gestor, que solo consulta la
+    versión del grafo y lo recarga si cambió; con 'db' se traen de Mongo únicamente los cambios del
+    catálogo posteriores al archivo. Si algo cambió y 'actualizar_archivo' es True, el archivo se
+    reescribe. Retorna el CatalogoLocal, o None si el archivo no existe o no es válido.
+    """
+    ruta = ruta or ruta_archivo_instantanea()
+    tiempos = {}
+    try:
+        with medir_fase(tiempos, "archivo"):
+            with ArchivoInstantanea(ruta) as archivo:
+                instantanea = archivo.instantanea()
+                catalogo = archivo.catalogo()
+    except FileNotFoundError:
+        print(f"No existe el archivo de instantánea '{ruta}'.")
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Archivo de instantánea '{ruta}' no válido: {e}")
+        return None
+
+    with medir_fase(tiempos, "grafo"):
+        if not gestor_grafo.activar_instantanea_local(instantanea=instantanea):
+            print("Advertencia: No se pudo verificar la versión del grafo del archivo.")
+    cambios = 0
+    if db is not None:
+        with medir_fase(tiempos, "catalogo"):
+            cambios = catalogo.traer_cambios(db) or 0
+    vigente = gestor_grafo.instantanea_local()
+    if actualizar_archivo and vigente is not None and (cambios or vigente.version != instantanea.version):
+        with medir_fase(tiempos, "reescritura"):
+            escribir_archivo_instantanea(ruta, vigente, catalogo)
+    print(f"Instantánea cargada desde '{ruta}' ({cambios} cambios del catálogo): {formatear_fases(tiempos)}.")
+    return catalogo
+
+
+if __name__ == "__main__":
+    from conexionmongotest import obtener_db, cerrar_cliente_mongo
+    from Neo4jtest import crear_gestor_grafo
+
+    gestor = crear_gestor_grafo()
+    if gestor is not None and gestor._driver is not None:
+        inicio = time.perf_counter()
+        if exportar_archivo_instantanea(gestor, obtener_db()) is not None:
+            print(f"Exportación completada en {time.perf_counter() - inicio:.2f}s.")
+        cerrar_cliente_mongo()
+        gestor.close()
+    else:
+        print("No se pudo conectar al grafo. Saliendo.")
@@ -0,0 +1,433 @@
+import threading
+import time
+from grafomemoriatest import (InstantaneaGrafo, ETIQUETA_VOCACION, ETIQUETA_CURSO, REL_TIENE_CURSO, REL_PRECEDE_A,
+                              armar_camino_usuario, _iterar_bits)
+from Neo4jtest import Neo4jCRUD, TAMANO_PAGINA_PREDETERMINADO
+from planificadortest import PlanificadorCaminos
+
+
+class GrafoMemoriaCRUD:
+    """
+    Backend en memoria con la misma interfaz y los mismos formatos de retorno que Neo4jCRUD.
+    Guarda el grafo en una InstantaneaGrafo y respeta la unicidad de nombres de Vocacion y Curso
+    (como los constraints del esquema). Sirve para pruebas y benchmarks sin conexión a Neo4j.
+    """
+
+    def __init__(self, usar_indice_clausura=False, conexion_diferida=False):
+        # La clausura se construye desde el grafo vacío y se mantiene con cada escritura.
+        self._grafo = InstantaneaGrafo(usar_indice_clausura=usar_indice_clausura).precalcular_clausura()
+        # El grafo en memoria es siempre su propia instantánea local.
+        self._instantanea = self._grafo
+        self._siguiente_id = 0
+        self._indices_por_id_mongo = {}
+        self._planificador = PlanificadorCaminos()
+        # Se mantiene el atributo para que el código que verifica la conexión funcione igual.
+        self._driver = self
+        self._database = "memoria"
+
+    def close(self):
+        print("Backend de grafo en memoria cerrado.")
+
+    # --- Compatibilidad con Neo4jCRUD (sin efecto en memoria) ---
+    def conectar(self):
+        return True
+
+    def precalentar(self):
+        hilo = threading.Thread(target=self.conectar, name="conexion-memoria", daemon=True)
+        hilo.start()
+        return hilo
+
+    def tiempos_conexion(self):
+        return {}
+
+    def asegurar_esquema(self):
+        return True
+
+    def reportar_uso_de_indices(self):
+        return {}
+
+    def activar_instantanea_local(self, intervalo_verificacion=30.0, instantanea=None):
+        # El grafo en memoria ya es la fuente de verdad: una copia externa no lo reemplaza.
+        return True
+
+    def desactivar_instantanea_local(self):
+        pass
+
+    def instantanea_local(self):
+        return self._grafo
+
+    def version_grafo(self):
+        return self._grafo.version
+
+    def configurar_cache_lecturas(self, max_entradas=256, ttl_segundos=30.0):
+        pass
+
+    def invalidar_cache_lecturas(self):
+        pass
+
+    def estadisticas_cache_lecturas(self):
+        return {"aciertos": 0, "fallos": 0, "tasa_aciertos": 0.0, "invalidaciones": 0, "entradas": 0,
+                "max_entradas": 0, "ttl_segundos": 0.0}
+
+    def configurar_instrumentacion(self, activa=True, tasa_muestreo_profile=0.0):
+        return True
+
+    def obtener_metricas(self):
+        return {}
+
+    def exportar_metricas_json(self):
+        return "{}"
+
+    def exportar_metricas_prometheus(self):
+        return ""
+
+    def reiniciar_metricas(self):
+        pass
+
+    # --- Auxiliares ---
+    # Cada escritura incrementa self._grafo.version, igual que el nodo :MetaCamino en Neo4j,
+    # para que los planes memorizados de versiones anteriores se descarten.
+    def _nuevo_id(self):
+        self._siguiente_id += 1
+        return self._siguiente_id
+
+    def _indice(self, etiqueta, nombre):
+        indices = self._grafo.indices_por_nombre.get((etiqueta, nombre))
+        return indices[0] if indices else None
+
+    def _crear_o_encontrar(self, etiqueta, nombre, dificultad=None):
+        indice = self._indice(etiqueta, nombre)
+        if indice is None:
+            indice = self._grafo.agregar_nodo(self._nuevo_id(), etiqueta, nombre, dificultad)
+        elif etiqueta == ETIQUETA_CURSO:
+            self._grafo.dificultades[indice] = dificultad
+        return indice
+
+    def _listar(self, etiqueta, filtro=None):
+        indices = self._grafo.indices_por_etiqueta(etiqueta)
+        if filtro is not None:
+            indices = [i for i in indices if filtro(i)]
+        return self._grafo._ordenar_por_nombre(indices)
+
+    def _vocacion_a_dict(self, indice):
+        return {"id_interno_neo4j": self._grafo.ids_neo4j[indice], "nombre": self._grafo.nombres[indice]}
+
+    def _iterar_paginado(self, indices, a_dict, tamano_pagina):
+        if tamano_pagina <= 0:
+            print("Error: tamano_pagina debe ser mayor que cero.")
+            return
+        for indice in indices:
+            if self._grafo.nombres[indice]:
+                yield a_dict(indice)
+
+    # --- CRUD Vocaciones ---
+    def crear_vocacion(self, nombre):
+        """Crea un nuevo nodo Vocacion."""
+        if self._indice(ETIQUETA_VOCACION, nombre) is not None:
+            print(f"Error de restricción (ConstraintError): Ya existe una vocación con nombre '{nombre}'.")
+            return None
+        indice = self._grafo.agregar_nodo(self._nuevo_id(), ETIQUETA_VOCACION, nombre)
+        print(f"Vocación '{nombre}' creada con ID interno: {self._grafo.ids_neo4j[indice]}.")
+        self._grafo.version += 1
+        return self._vocacion_a_dict(indice)
+
+    def obtener_vocaciones(self):
+        """Obtiene todas las vocaciones."""
+        return [self._vocacion_a_dict(i) for i in self._listar(ETIQUETA_VOCACION)]
+
+    def iterar_vocaciones(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        return self._iterar_paginado(self._listar(ETIQUETA_VOCACION), self._vocacion_a_dict, tamano_pagina)
+
+    def actualizar_vocacion(self, nombre_actual, nuevo_nombre):
+        """Actualiza el nombre de una vocación existente."""
+        indice = self._indice(ETIQUETA_VOCACION, nombre_actual)
+        if indice is None:
+            print(f"No se encontró la vocación '{nombre_actual}' para actualizar.")
+            return None
+        if nuevo_nombre != nombre_actual and self._indice(ETIQUETA_VOCACION, nuevo_nombre) is not None:
+            print(f"Error de restricción (ConstraintError): Ya existe una vocación con nombre '{nuevo_nombre}'.")
+            return None
+        self._grafo.renombrar_nodo(indice, nuevo_nombre)
+        print(f"Vocación '{nombre_actual}' actualizada a '{nuevo_nombre}'.")
+        self._grafo.version += 1
+        return self._vocacion_a_dict(indice)
+
+    def eliminar_vocacion(self, nombre):
+        """Elimina una vocación y sus relaciones TIENE_CURSO."""
+        if self._grafo.eliminar_por_nombre(ETIQUETA_VOCACION, nombre):
+            print(f"Vocación '{nombre}' y sus relaciones directas eliminadas.")
+            self._grafo.version += 1
+            return True
+        print(f"No se encontró la vocación '{nombre}' para eliminar.")
+        return False
+
+    # --- CRUD Cursos ---
+    def crear_curso(self, nombre, dificultad):
+        """Crea un nuevo nodo Curso."""
+        if self._indice(ETIQUETA_CURSO, nombre) is not None:
+            print(f"Error de restricción (ConstraintError): Ya existe un curso con nombre '{nombre}'.")
+            return None
+        indice = self._grafo.agregar_nodo(self._nuevo_id(), ETIQUETA_CURSO, nombre, dificultad)
+        print(f"Curso '{nombre}' (Dificultad: {dificultad}) creado con ID interno: {self._grafo.ids_neo4j[indice]}.")
+        self._grafo.version += 1
+        return self._grafo._curso_a_dict(indice)
+
+    def obtener_cursos(self):
+        """Obtiene todos los cursos."""
+        return [self._grafo._curso_a_dict(i) for i in self._listar(ETIQUETA_CURSO)]
+
+    def iterar_cursos(self, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        return self._iterar_paginado(self._listar(ETIQUETA_CURSO), self._grafo._curso_a_dict, tamano_pagina)
+
+    def actualizar_curso(self, nombre_actual, nuevo_nombre=None, nueva_dificultad=None):
+        """Actualiza propiedades de un curso existente."""
+        if nuevo_nombre is None and nueva_dificultad is None:
+            print("Debe proporcionar al menos un nuevo nombre o una nueva dificultad para actualizar.")
+            return None
+        indice = self._indice(ETIQUETA_CURSO, nombre_actual)
+        if indice is None:
+            print(f"No se encontró el curso '{nombre_actual}' para actualizar.")
+            return None
+        if nuevo_nombre is not None and nuevo_nombre != nombre_actual and self._indice(ETIQUETA_CURSO, nuevo_nombre) is not None:
+            print(f"Error de restricción (ConstraintError): Ya existe un curso con nombre '{nuevo_nombre}'.")
+            return None
+        if nuevo_nombre is not None:
+            self._grafo.renombrar_nodo(indice, nuevo_nombre)
+        if nueva_dificultad is not None:
+            self._grafo.dificultades[indice] = nueva_dificultad
+        curso = self._grafo._curso_a_dict(indice)
+        print(f"Curso '{nombre_actual}' actualizado a '{curso['nombre']}' (Dificultad: {curso['dificultad']}).")
+        self._grafo.version += 1
+        return curso
+
+    def eliminar_curso(self, nombre):
+        """Elimina un curso y todas sus relaciones."""
+        if self._grafo.eliminar_por_nombre(ETIQUETA_CURSO, nombre):
+            print(f"Curso '{nombre}' y todas sus relaciones eliminadas.")
+            self._grafo.version += 1
+            return True
+        print(f"No se encontró el curso '{nombre}' para eliminar.")
+        return False
+
+    # --- Gestión de Relaciones ---
+    def vincular_vocacion_a_curso(self, nombre_vocacion, nombre_curso):
+        """Crea una relación TIENE_CURSO de una Vocacion a un Curso (primer curso de una rama)."""
+        if self._indice(ETIQUETA_VOCACION, nombre_vocacion) is None or self._indice(ETIQUETA_CURSO, nombre_curso) is None:
+            print(f"No se pudo vincular. Asegúrese que la vocación '{nombre_vocacion}' y el curso '{nombre_curso}' existen.")
+            return False
+        if self._grafo.agregar_relacion_por_nombres(ETIQUETA_VOCACION, nombre_vocacion, nombre_curso, "TIENE_CURSO"):
+            self._grafo.version += 1
+        return True
+
+    def vincular_curso_a_curso(self, nombre_curso_origen, nombre_curso_destino):
+        """Crea una relación PRECEDE_A entre dos cursos."""
+        if self._indice(ETIQUETA_CURSO, nombre_curso_origen) is None or self._indice(ETIQUETA_CURSO, nombre_curso_destino) is None:
+            print(f"No se pudo vincular. Asegúrese que ambos cursos ('{nombre_curso_origen}', '{nombre_curso_destino}') existen.")
+            return False
+        if self._grafo.agregar_relacion_por_nombres(ETIQUETA_CURSO, nombre_curso_origen, nombre_curso_destino, "PRECEDE_A"):
+            self._grafo.version += 1
+        return True
+
+    # --- Carga de Estructuras ---
+    def crear_vocacion_con_ramas_desde_dict(self, datos_vocacion_completa, modo="recursivo"):
+        """
+        Crea (o actualiza) una vocación con todas sus ramas de cursos a partir de un diccionario.
+        En memoria 'recursivo' y 'masivo' hacen lo mismo; 'diferencial' además quita las relaciones
+        que ya no están en el árbol, con las mismas reglas que Neo4jCRUD._crear_estructura_diferencial_tx.
+        """
+        if modo not in ("recursivo", "masivo", "diferencial"):
+            print(f"Error: Modo de carga '{modo}' no válido. Use 'recursivo', 'masivo' o 'diferencial'.")
+            return None
+        resultado, _ = self._cargar_estructura(datos_vocacion_completa, modo)
+        return resultado
+
+    def _cargar_estructura(self, datos_vocacion_completa, modo):
+        """Carga de crear_vocacion_con_ramas_desde_dict; retorna (resultado, hubo_cambios)."""
+        vocacion_nombre = datos_vocacion_completa.get("vocacion_nombre")
+        if not vocacion_nombre:
+            print("Error de datos al procesar la estructura: El diccionario debe contener 'vocacion_nombre'.")
+            return None, False
+
+        cursos, raices, vinculos, orden_procesado = Neo4jCRUD._aplanar_cursos_rama(vocacion_nombre, datos_vocacion_completa.get("cursos_rama", []))
+        existia_vocacion = self._indice(ETIQUETA_VOCACION, vocacion_nombre) is not None
+        indice_vocacion = self._crear_o_encontrar(ETIQUETA_VOCACION, vocacion_nombre)
+        cambios = None
+        if modo == "diferencial":
+            cambios = self._quitar_sobrantes(indice_vocacion, set(raices), {(v["origen"], v["destino"]) for v in vinculos})
+        previos = {nombre: self._indice(ETIQUETA_CURSO, nombre) for nombre in cursos}
+        cursos_creados = sum(1 for indice in previos.values() if indice is None)
+        cursos_actualizados = sum(1 for nombre, indice in previos.items()
+                                  if indice is not None and self._grafo.dificultades[indice] != cursos[nombre])
+
+        indices_cursos = {nombre: self._crear_o_encontrar(ETIQUETA_CURSO, nombre, dificultad) for nombre, dificultad in cursos.items()}
+        ids = self._grafo.ids_neo4j
+        raices_agregadas = sum(1 for nombre in raices
+                               if self._grafo.agregar_relacion(ids[indice_vocacion], ids[indices_cursos[nombre]], "TIENE_CURSO"))
+        vinculos_agregados = sum(1 for vinculo in vinculos
+                                 if self._grafo.agregar_relacion(ids[indices_cursos[vinculo["origen"]]], ids[indices_cursos[vinculo["destino"]]], "PRECEDE_A"))
+
+        resultado = {
+            "vocacion_procesada": self._vocacion_a_dict(indice_vocacion),
+            "cursos_procesados_count": len(orden_procesado),
+            "detalle_cursos": [self._grafo._curso_a_dict(indices_cursos[nombre]) for nombre in orden_procesado],
+            "status": "Estructura de vocación y cursos procesada."
+        }
+        hubo_cambios = bool(not existia_vocacion or cursos_creados or cursos_actualizados or raices_agregadas or vinculos_agregados)
+        if cambios is not None:
+            hubo_cambios = hubo_cambios or bool(cambios["raices_eliminadas"] or cambios["vinculos_eliminados"])
+            cambios.update({"vocacion_creada": not existia_vocacion, "cursos_creados": cursos_creados,
+                            "cursos_actualizados": cursos_actualizados, "raices_agregadas": raices_agregadas,
+                            "vinculos_agregados": vinculos_agregados})
+            resultado["cambios"] = cambios
+        print(f"Resultado final del procesamiento de '{vocacion_nombre}': {resultado['status']}")
+        # Como en Neo4jCRUD, la versión solo cambia si la carga escribió algo.
+        if hubo_cambios:
+            self._grafo.version += 1
+        return resultado, hubo_cambios
+
+    def _quitar_sobrantes(self, indice_vocacion, raices, deseadas):
+        """Quita los cursos iniciales y las relaciones PRECEDE_A de la vocación que ya no están en el árbol."""
+        grafo = self._grafo
+        alcanzables = [i for i in _iterar_bits(grafo.descendientes(indice_vocacion)) if grafo.es_curso(i)]
+        raices_eliminadas = 0
+        for posicion, destino in reversed(list(enumerate(grafo.sucesores[indice_vocacion]))):
+            if grafo.tipos_sucesores[indice_vocacion][posicion] == REL_TIENE_CURSO and grafo.nombres[destino] not in raices:
+                raices_eliminadas += grafo.eliminar_relacion(indice_vocacion, destino, "TIENE_CURSO")
+
+        vinculos_eliminados = vinculos_conservados = 0
+        for origen in alcanzables:
+            sobrantes = [destino for posicion, destino in enumerate(grafo.sucesores[origen])
+                         if grafo.tipos_sucesores[origen][posicion] == REL_PRECEDE_A
+                         and (grafo.nombres[origen], grafo.nombres[destino]) not in deseadas]
+            if not sobrantes:
+                continue
+            # Igual que en Neo4j: se conservan si el curso de origen es alcanzable desde otra vocación.
+            if any(not grafo.es_curso(i) and i != indice_vocacion for i in _iterar_bits(grafo.ancestros(origen))):
+                vinculos_conservados += len(sobrantes)
+                continue
+            for destino in sobrantes:
+                vinculos_eliminados += grafo.eliminar_relacion(origen, destino, "PRECEDE_A")
+        return {"raices_eliminadas": raices_eliminadas, "vinculos_eliminados": vinculos_eliminados, "vinculos_conservados": vinculos_conservados}
+
+    def cargar_vocaciones_en_paralelo(self, lista_datos_vocaciones, max_workers=4, max_reintentos=5):
+        """Misma interfaz y reporte que Neo4jCRUD.cargar_vocaciones_en_paralelo; en memoria la carga es secuencial."""
+        inicio_total = time.perf_counter()
+        reporte_vocaciones = []
+        cursos_lote = set()
+        for datos_voc in lista_datos_vocaciones:
+            inicio = time.perf_counter()
+            resultado, hubo_cambios = self._cargar_estructura(datos_voc, "masivo") if datos_voc.get("vocacion_nombre") else (None, False)
+            if resultado:
+                cursos_lote.update(curso["nombre"] for curso in resultado["detalle_cursos"])
+            reporte_vocaciones.append({
+                "vocacion_nombre": datos_voc.get("vocacion_nombre"),
+                "exito": resultado is not None,
+                "segundos": time.perf_counter() - inicio,
+                "intentos": 1 if resultado else 0,
+                "hubo_cambios": hubo_cambios,
+                "cursos_procesados_count": resultado["cursos_procesados_count"] if resultado else 0,
+                "resultado": resultado,
+                "error": None if resultado else "El diccionario debe contener 'vocacion_nombre'."
+            })
+        total_segundos = time.perf_counter() - inicio_total
+        exitosas = [r for r in reporte_vocaciones if r["exito"]]
+        total_cursos = sum(r["cursos_procesados_count"] for r in exitosas)
+        return {
+            "vocaciones": reporte_vocaciones,
+            "vocaciones_exitosas": len(exitosas),
+            "vocaciones_fallidas": len(reporte_vocaciones) - len(exitosas),
+            "cursos_distintos": len(cursos_lote),
+            "max_workers": 1,
+            "segundos_cursos_compartidos": 0.0,
+            "total_segundos": total_segundos,
+            "vocaciones_por_segundo": len(exitosas) / total_segundos if total_segundos > 0 else 0.0,
+            "cursos_por_segundo": total_cursos / total_segundos if total_segundos > 0 else 0.0
+        }
+
+    # --- Consultas Especializadas ---
+    def obtener_cursos_por_dificultad(self, dificultad):
+        """Obtiene cursos filtrados por dificultad."""
+        return [self._grafo._curso_a_dict(i) for i in self._listar(ETIQUETA_CURSO, lambda i: self._grafo.dificultades[i] == dificultad)]
+
+    def iterar_cursos_por_dificultad(self, dificultad, tamano_pagina=TAMANO_PAGINA_PREDETERMINADO):
+        indices = self._listar(ETIQUETA_CURSO, lambda i: self._grafo.dificultades[i] == dificultad)
+        return self._iterar_paginado(indices, self._grafo._curso_a_dict, tamano_pagina)
+
+    def obtener_cursos_siguientes(self, nombre_curso_actual):
+        """Obtiene los cursos que son directamente siguientes (precedidos por) al curso actual."""
+        return self._grafo.cursos_siguientes_de_lista([nombre_curso_actual])
+
+    def obtener_cursos_anteriores(self, nombre_curso_actual):
+        """Obtiene los nodos (Cursos o Vocaciones) que preceden directamente al curso actual."""
+        anteriores = []
+        for indice in self._grafo.indices_cursos([nombre_curso_actual]):
+            # Una fila por relación, como el MATCH de Neo4jCRUD.
+            for predecesor in self._grafo.predecesores[indice]:
+                anteriores.extend(predecesor for destino in self._grafo.sucesores[predecesor] if destino == indice)
+        return [self._grafo._nodo_a_dict(i) for i in self._grafo._ordenar_por_nombre(anteriores)]
+
+    # --- Sincronización desde MongoDB ---
+    def aplicar_cambios_catalogo(self, vocaciones=None, cursos=None, eliminados=None):
+        """Mismo contrato que Neo4jCRUD.aplicar_cambios_catalogo: busca por id_mongo y, si no, por nombre."""
+        resumen = {"vocaciones": 0, "cursos": 0, "eliminados": 0}
+        hubo_cambios = False
+        for etiqueta, clave, filas in ((ETIQUETA_VOCACION, "vocaciones", vocaciones or []), (ETIQUETA_CURSO, "cursos", cursos or [])):
+            for fila in filas:
+                indice = self._indices_por_id_mongo.get((etiqueta, fila["id_mongo"]))
+                if indice is None or indice in self._grafo.eliminados:
+                    indice = self._indice(etiqueta, fila["nombre"])
+                    if indice is None:
+                        indice = self._grafo.agregar_nodo(self._nuevo_id(), etiqueta, fila["nombre"])
+                        hubo_cambios = True
+                    self._indices_por_id_mongo[(etiqueta, fila["id_mongo"])] = indice
+                elif self._grafo.nombres[indice] != fila["nombre"]:
+                    self._grafo.renombrar_nodo(indice, fila["nombre"])
+                    hubo_cambios = True
+                if etiqueta == ETIQUETA_CURSO and self._grafo.dificultades[indice] != fila.get("dificultad"):
+                    self._grafo.dificultades[indice] = fila.get("dificultad")
+                    hubo_cambios = True
+                resumen[clave] += 1
+        for fila in eliminados or []:
+            indice = self._indices_por_id_mongo.pop((fila["etiqueta"], fila["id_mongo"]), None)
+            if indice is not None and self._grafo.eliminar_nodo(indice):
+                resumen["eliminados"] += 1
+            elif indice is None:
+                vinculados = set(self._indices_por_id_mongo.values())
+                for candidato in list(self._grafo.indices_por_nombre.get((fila["etiqueta"], fila["nombre"]), [])):
+                    if candidato not in vinculados and self._grafo.eliminar_nodo(candidato):
+                        resumen["eliminados"] += 1
+        if hubo_cambios or resumen["eliminados"]:
+            self._grafo.version += 1
+        return resumen
+
+    def obtener_rama_cursos_por_vocacion(self, nombre_vocacion, max_depth=None):
+        if max_depth is not None and max_depth < 0:
+            print("Error: max_depth debe ser un entero no negativo.")
+            return []
+        return self._grafo.rama_cursos_por_vocacion(nombre_vocacion, max_depth)
+
+    def obtener_cursos_directos_por_vocacion(self, nombre_vocacion):
+        return self._grafo.cursos_directos_por_vocacion(nombre_vocacion)
+
+    def obtener_cursos_siguientes_de_lista(self, nombres_cursos_actuales):
+        return self._grafo.cursos_siguientes_de_lista(nombres_cursos_actuales)
+
+    def obtener_rama_predecesora_completa(self, nombres_cursos_actuales):
+        return self._grafo.rama_predecesora_completa(nombres_cursos_actuales)
+
+    def obtener_rama_sucesora_completa(self, nombres_cursos_actuales):
+        return self._grafo.rama_sucesora_completa(nombres_cursos_actuales)
+
+    def obtener_camino_usuario(self, progreso):
+        if not progreso:
+            return armar_camino_usuario([], [], [])
+        return self._grafo.camino_usuario(progreso)
+
+    def planificar_camino(self, progreso, objetivo, tipo_objetivo="Curso"):
+        return self._planificador.planificar(self._grafo, progreso, objetivo, tipo_objetivo)
+
+    def planificar_caminos(self, progresos_por_usuario, objetivo, tipo_objetivo="Curso"):
+        return {usuario: self.planificar_camino(progreso, objetivo, tipo_objetivo) for usuario, progreso in progresos_por_usuario.items()}
+
+    def estadisticas_planificador(self):
+        return self._planificador.estadisticas()
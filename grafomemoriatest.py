@@ -0,0 +1,460 @@
+from array import array
+from collections import deque
+
+ETIQUETA_VOCACION = "Vocacion"
+ETIQUETA_CURSO = "Curso"
+TIPOS_RELACION = ("TIENE_CURSO", "PRECEDE_A")
+REL_TIENE_CURSO = 0
+REL_PRECEDE_A = 1
+
+
+def _iterar_bits(bits):
+    """Recorre los índices de los bits encendidos de un entero (bitset), de menor a mayor."""
+    while bits:
+        bit_bajo = bits & -bits
+        yield bit_bajo.bit_length() - 1
+        bits ^= bit_bajo
+
+
+def _agregar_a_clausura(ancestros_bits, descendientes_bits, origen, destino):
+    """Agrega a los bitsets de clausura la relación origen -> destino."""
+    nuevos_ancestros = ancestros_bits[origen] | (1 << origen)
+    nuevos_descendientes = descendientes_bits[destino] | (1 << destino)
+    for indice in _iterar_bits(nuevos_ancestros):
+        descendientes_bits[indice] |= nuevos_descendientes
+    for indice in _iterar_bits(nuevos_descendientes):
+        ancestros_bits[indice] |= nuevos_ancestros
+
+
+def niveles_bfs(raices, vecinos_de, nivel_maximo=None):
+    """
+    Recorrido en anchura desde 'raices' (nivel 0). Retorna {nodo: nivel mínimo}; cada nodo y cada
+    arista se visitan una sola vez. Con 'nivel_maximo' no se expande más allá de ese nivel.
+    """
+    niveles = {raiz: 0 for raiz in raices}
+    pendientes = deque(niveles)
+    while pendientes:
+        nodo = pendientes.popleft()
+        if nivel_maximo is not None and niveles[nodo] >= nivel_maximo:
+            continue
+        for vecino in vecinos_de(nodo):
+            if vecino not in niveles:
+                niveles[vecino] = niveles[nodo] + 1
+                pendientes.append(vecino)
+    return niveles
+
+
+def armar_camino_usuario(rama, siguientes, aristas):
+    """
+    Completa el resultado de obtener_camino_usuario: asigna a cada nodo su 'nivel' (distancia mínima
+    desde el inicio de la rama, donde los nodos sin predecesores dentro del camino tienen nivel 0)
+    usando las aristas (id_origen, id_destino) entre ellos, y ordena por nivel y por nombre.
+    """
+    vecinos = {nodo["id_interno_neo4j"]: [] for nodo in rama + siguientes}
+    con_entrada = set()
+    for origen, destino in aristas:
+        if origen in vecinos and destino in vecinos and origen != destino:
+            vecinos[origen].append(destino)
+            con_entrada.add(destino)
+
+    niveles = niveles_bfs([id_nodo for id_nodo in vecinos if id_nodo not in con_entrada], vecinos.__getitem__)
+
+    for nodo in rama + siguientes:
+        nodo["nivel"] = niveles.get(nodo["id_interno_neo4j"])
+    # Los nodos en un ciclo sin entrada desde la rama no tienen nivel y quedan al final.
+    clave_nombre = lambda nodo: (nodo["nombre"] is None, nodo["nombre"] or "")
+    return {
+        "rama_completada": sorted(rama, key=lambda nodo: (nodo["nivel"] is None, nodo["nivel"] or 0) + clave_nombre(nodo)),
+        "siguientes": sorted(siguientes, key=clave_nombre),
+        "profundidad_maxima": max(niveles.values(), default=0)
+    }
+
+
+class InstantaneaGrafo:
+    """
+    Copia en memoria del grafo Vocacion/Curso con relaciones TIENE_CURSO y PRECEDE_A.
+    Cada nodo se identifica por un índice entero; las listas de adyacencia son arrays de enteros.
+    Responde las consultas de caminos con el mismo formato que Neo4jCRUD, sin ir a la red.
+
+    Mantiene además un índice de clausura transitiva: para cada nodo, el conjunto de ancestros y
+    de descendientes como bitset (un int de Python con un bit por índice de nodo). Se construye con
+    precalcular_clausura() antes de compartir la instantánea (o, si no, al primer uso) y se
+    actualiza de forma incremental al agregar relaciones o eliminar nodos.
+    Con usar_indice_clausura=False no se construye (su memoria crece con el cuadrado del número de
+    nodos) y los ancestros/descendientes se calculan con un recorrido en cada consulta.
+    """
+
+    def __init__(self, version=0, usar_indice_clausura=True):
+        self.version = version
+        self.usar_indice_clausura = usar_indice_clausura
+        self.ids_neo4j = array('q')
+        self.etiquetas = []
+        self.tipos = bytearray()
+        self.nombres = []
+        self.dificultades = []
+        self.sucesores = []
+        self.tipos_sucesores = []
+        self.predecesores = []
+        self.indice_por_id = {}
+        self.indices_por_nombre = {}
+        self.eliminados = set()
+        self._ancestros_bits = None
+        self._descendientes_bits = None
+
+    def __len__(self):
+        return len(self.nombres) - len(self.eliminados)
+
+    def copiar(self):
+        """
+        Retorna una copia independiente (listas de adyacencia, índices y clausura incluidos), para
+        aplicar escrituras sin tocar la instantánea que otros hilos pueden estar recorriendo.
+        """
+        copia = InstantaneaGrafo(self.version, self.usar_indice_clausura)
+        copia.ids_neo4j = array('q', self.ids_neo4j)
+        copia.etiquetas = list(self.etiquetas)
+        copia.tipos = bytearray(self.tipos)
+        copia.nombres = list(self.nombres)
+        copia.dificultades = list(self.dificultades)
+        copia.sucesores = [array('i', vecinos) for vecinos in self.sucesores]
+        copia.tipos_sucesores = [bytearray(tipos) for tipos in self.tipos_sucesores]
+        copia.predecesores = [array('i', vecinos) for vecinos in self.predecesores]
+        copia.indice_por_id = dict(self.indice_por_id)
+        copia.indices_por_nombre = {clave: list(indices) for clave, indices in self.indices_por_nombre.items()}
+        copia.eliminados = set(self.eliminados)
+        if self._ancestros_bits is not None:
+            copia._ancestros_bits = list(self._ancestros_bits)
+            copia._descendientes_bits = list(self._descendientes_bits)
+        return copia
+
+    # --- Construcción ---
+    def agregar_nodo(self, id_neo4j, etiqueta, nombre, dificultad=None):
+        """Agrega un nodo y retorna su índice. Si el id ya existe, retorna el índice existente."""
+        if id_neo4j in self.indice_por_id:
+            return self.indice_por_id[id_neo4j]
+        if etiqueta not in self.etiquetas:
+            self.etiquetas.append(etiqueta)
+        indice = len(self.nombres)
+        self.ids_neo4j.append(id_neo4j)
+        self.tipos.append(self.etiquetas.index(etiqueta))
+        self.nombres.append(nombre)
+        self.dificultades.append(dificultad if etiqueta == ETIQUETA_CURSO else None)
+        self.sucesores.append(array('i'))
+        self.tipos_sucesores.append(bytearray())
+        self.predecesores.append(array('i'))
+        self.indice_por_id[id_neo4j] = indice
+        self.indices_por_nombre.setdefault((etiqueta, nombre), []).append(indice)
+        if self._ancestros_bits is not None:
+            self._ancestros_bits.append(0)
+            self._descendientes_bits.append(0)
+        return indice
+
+    def agregar_relacion(self, id_origen, id_destino, tipo_relacion):
+        """Agrega una relación TIENE_CURSO o PRECEDE_A entre dos nodos ya cargados (por id de Neo4j)."""
+        origen = self.indice_por_id.get(id_origen)
+        destino = self.indice_por_id.get(id_destino)
+        if origen is None or destino is None or tipo_relacion not in TIPOS_RELACION:
+            return False
+        tipo = TIPOS_RELACION.index(tipo_relacion)
+        for posicion, vecino in enumerate(self.sucesores[origen]):
+            if vecino == destino and self.tipos_sucesores[origen][posicion] == tipo:
+                return False
+        self.sucesores[origen].append(destino)
+        self.tipos_sucesores[origen].append(tipo)
+        if origen not in self.predecesores[destino]:
+            self.predecesores[destino].append(origen)
+            if self._ancestros_bits is not None:
+                self._agregar_a_clausura(origen, destino)
+        return True
+
+    def agregar_relacion_por_nombres(self, etiqueta_origen, nombre_origen, nombre_destino, tipo_relacion):
+        """Igual que el MATCH ... MERGE por nombre de Neo4jCRUD: vincula todos los nodos que coinciden."""
+        agregadas = 0
+        for origen in list(self.indices_por_nombre.get((etiqueta_origen, nombre_origen), [])):
+            for destino in list(self.indices_por_nombre.get((ETIQUETA_CURSO, nombre_destino), [])):
+                if self.agregar_relacion(self.ids_neo4j[origen], self.ids_neo4j[destino], tipo_relacion):
+                    agregadas += 1
+        return agregadas
+
+    def eliminar_relacion(self, origen, destino, tipo_relacion):
+        """Elimina una relación entre dos índices; el índice de clausura se recalcula si estaba construido."""
+        tipo = TIPOS_RELACION.index(tipo_relacion)
+        conservar = [posicion for posicion, vecino in enumerate(self.sucesores[origen])
+                     if not (vecino == destino and self.tipos_sucesores[origen][posicion] == tipo)]
+        if len(conservar) == len(self.sucesores[origen]):
+            return False
+        self.sucesores[origen] = array('i', (self.sucesores[origen][posicion] for posicion in conservar))
+        self.tipos_sucesores[origen] = bytearray(self.tipos_sucesores[origen][posicion] for posicion in conservar)
+        if destino not in self.sucesores[origen]:
+            self.predecesores[destino] = array('i', (p for p in self.predecesores[destino] if p != origen))
+            if self._ancestros_bits is not None:
+                self.construir_indice_clausura()
+        return True
+
+    def eliminar_nodo(self, indice):
+        """Elimina un nodo y todas sus relaciones (DETACH DELETE), actualizando la clausura."""
+        if indice in self.eliminados:
+            return False
+        ancestros = descendientes = None
+        if self._ancestros_bits is not None:
+            ancestros = self._ancestros_bits[indice]
+            descendientes = self._descendientes_bits[indice]
+
+        for vecino in set(self.sucesores[indice]):
+            self.predecesores[vecino] = array('i', (p for p in self.predecesores[vecino] if p != indice))
+        for vecino in set(self.predecesores[indice]):
+            conservar = [posicion for posicion, destino in enumerate(self.sucesores[vecino]) if destino != indice]
+            self.sucesores[vecino] = array('i', (self.sucesores[vecino][posicion] for posicion in conservar))
+            self.tipos_sucesores[vecino] = bytearray(self.tipos_sucesores[vecino][posicion] for posicion in conservar)
+        self.sucesores[indice] = array('i')
+        self.tipos_sucesores[indice] = bytearray()
+        self.predecesores[indice] = array('i')
+
+        self.eliminados.add(indice)
+        del self.indice_por_id[self.ids_neo4j[indice]]
+        self.indices_por_nombre[(self.etiqueta(indice), self.nombres[indice])].remove(indice)
+
+        if ancestros is not None:
+            self._ancestros_bits[indice] = 0
+            self._descendientes_bits[indice] = 0
+            bit = 1 << indice
+            if not self._recalcular_clausura(descendientes & ~bit, ancestros & ~bit):
+                self.construir_indice_clausura()
+        return True
+
+    def renombrar_nodo(self, indice, nuevo_nombre):
+        etiqueta = self.etiqueta(indice)
+        self.indices_por_nombre[(etiqueta, self.nombres[indice])].remove(indice)
+        self.nombres[indice] = nuevo_nombre
+        self.indices_por_nombre.setdefault((etiqueta, nuevo_nombre), []).append(indice)
+
+    def eliminar_por_nombre(self, etiqueta, nombre):
+        """Elimina todos los nodos con la etiqueta y el nombre dados. Retorna cuántos se eliminaron."""
+        indices = list(self.indices_por_nombre.get((etiqueta, nombre), []))
+        for indice in indices:
+            self.eliminar_nodo(indice)
+        return len(indices)
+
+    # --- Índice de clausura transitiva ---
+    def _orden_topologico(self, indices, vecinos_de):
+        """Orden topológico (Kahn) del subgrafo inducido por 'indices'; None si contiene un ciclo."""
+        grado = {i: 0 for i in indices}
+        for i in indices:
+            for vecino in set(vecinos_de[i]):
+                if vecino in grado:
+                    grado[vecino] += 1
+        pendientes = [i for i, g in grado.items() if g == 0]
+        orden = []
+        while pendientes:
+            actual = pendientes.pop()
+            orden.append(actual)
+            for vecino in set(vecinos_de[actual]):
+                if vecino in grado:
+                    grado[vecino] -= 1
+                    if grado[vecino] == 0:
+                        pendientes.append(vecino)
+        return orden if len(orden) == len(grado) else None
+
+    def construir_indice_clausura(self):
+        """
+        Calcula los bitsets de ancestros y descendientes de todos los nodos. Se arman en listas nuevas
+        y se publican al final, así un lector nunca ve un índice a medio construir.
+        """
+        total = len(self.nombres)
+        ancestros_bits = [0] * total
+        descendientes_bits = [0] * total
+        vivos = [i for i in range(total) if i not in self.eliminados]
+        orden = self._orden_topologico(vivos, self.sucesores)
+        if orden is None:
+            # Con ciclos se agrega relación por relación, que también es correcto.
+            for origen in vivos:
+                for destino in set(self.sucesores[origen]):
+                    _agregar_a_clausura(ancestros_bits, descendientes_bits, origen, destino)
+        else:
+            for indice in orden:
+                bits = 0
+                for predecesor in self.predecesores[indice]:
+                    bits |= ancestros_bits[predecesor] | (1 << predecesor)
+                ancestros_bits[indice] = bits
+            for indice in reversed(orden):
+                bits = 0
+                for sucesor in set(self.sucesores[indice]):
+                    bits |= descendientes_bits[sucesor] | (1 << sucesor)
+                descendientes_bits[indice] = bits
+        # _ancestros_bits se asigna último: es el que se consulta para saber si el índice existe.
+        self._descendientes_bits = descendientes_bits
+        self._ancestros_bits = ancestros_bits
+
+    def precalcular_clausura(self):
+        """
+        Construye el índice de clausura, si está habilitado y aún no existe. Se llama antes de
+        compartir la instantánea con otros hilos, para que las consultas solo lean.
+        """
+        if self.usar_indice_clausura and self._ancestros_bits is None:
+            self.construir_indice_clausura()
+        return self
+
+    def _asegurar_clausura(self):
+        if self._ancestros_bits is None:
+            self.construir_indice_clausura()
+
+    def _agregar_a_clausura(self, origen, destino):
+        _agregar_a_clausura(self._ancestros_bits, self._descendientes_bits, origen, destino)
+
+    def _recalcular_clausura(self, bits_descendientes, bits_ancestros):
+        """
+        Recalcula los ancestros de los nodos en 'bits_descendientes' y los descendientes de los nodos
+        en 'bits_ancestros' tras eliminar un nodo. Retorna False si la zona afectada tiene ciclos.
+        """
+        afectados_desc = list(_iterar_bits(bits_descendientes))
+        orden = self._orden_topologico(afectados_desc, self.sucesores)
+        if orden is None:
+            return False
+        for indice in orden:
+            bits = 0
+            for predecesor in self.predecesores[indice]:
+                bits |= self._ancestros_bits[predecesor] | (1 << predecesor)
+            self._ancestros_bits[indice] = bits
+
+        afectados_anc = list(_iterar_bits(bits_ancestros))
+        orden = self._orden_topologico(afectados_anc, self.sucesores)
+        if orden is None:
+            return False
+        for indice in reversed(orden):
+            bits = 0
+            for sucesor in set(self.sucesores[indice]):
+                bits |= self._descendientes_bits[sucesor] | (1 << sucesor)
+            self._descendientes_bits[indice] = bits
+        return True
+
+    # --- Auxiliares ---
+    def etiqueta(self, indice):
+        return self.etiquetas[self.tipos[indice]]
+
+    def es_curso(self, indice):
+        return self.etiqueta(indice) == ETIQUETA_CURSO
+
+    def indices_cursos(self, nombres_cursos):
+        """Índices de los nodos :Curso con alguno de los nombres dados (sin duplicados)."""
+        indices = []
+        vistos = set()
+        for nombre in nombres_cursos:
+            for indice in self.indices_por_nombre.get((ETIQUETA_CURSO, nombre), []):
+                if indice not in vistos:
+                    vistos.add(indice)
+                    indices.append(indice)
+        return indices
+
+    def _curso_a_dict(self, indice):
+        return {"id_interno_neo4j": self.ids_neo4j[indice], "nombre": self.nombres[indice], "dificultad": self.dificultades[indice]}
+
+    def _nodo_a_dict(self, indice):
+        data = {"id_interno_neo4j": self.ids_neo4j[indice], "tipo_nodo": self.etiqueta(indice), "nombre": self.nombres[indice]}
+        if self.es_curso(indice):
+            data["dificultad"] = self.dificultades[indice]
+        return data
+
+    def _ordenar_por_nombre(self, indices):
+        # Igual que ORDER BY en Cypher: los nombres nulos quedan al final.
+        return sorted(indices, key=lambda i: (self.nombres[i] is None, self.nombres[i] or ""))
+
+    def indices_por_etiqueta(self, etiqueta):
+        """Índices de los nodos vivos con la etiqueta dada."""
+        if etiqueta not in self.etiquetas:
+            return []
+        tipo = self.etiquetas.index(etiqueta)
+        return [i for i in range(len(self.nombres)) if self.tipos[i] == tipo and i not in self.eliminados]
+
+    def _alcanzables(self, indice, vecinos_de):
+        """Bitset de los nodos alcanzables desde 'indice' (él mismo solo si está en un ciclo)."""
+        vistos = set()
+        pendientes = list(vecinos_de[indice])
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo not in vistos:
+                vistos.add(nodo)
+                pendientes.extend(vecinos_de[nodo])
+        if not vistos:
+            return 0
+        bits = bytearray(max(vistos) // 8 + 1)
+        for nodo in vistos:
+            bits[nodo >> 3] |= 1 << (nodo & 7)
+        return int.from_bytes(bits, "little")
+
+    def ancestros(self, indice):
+        """Bitset de todos los nodos desde los que se llega a 'indice' por TIENE_CURSO|PRECEDE_A."""
+        if not self.usar_indice_clausura:
+            return self._alcanzables(indice, self.predecesores)
+        self._asegurar_clausura()
+        return self._ancestros_bits[indice]
+
+    def descendientes(self, indice):
+        """Bitset de todos los nodos a los que se llega desde 'indice' por TIENE_CURSO|PRECEDE_A."""
+        if not self.usar_indice_clausura:
+            return self._alcanzables(indice, self.sucesores)
+        self._asegurar_clausura()
+        return self._descendientes_bits[indice]
+
+    # --- Consultas (mismo formato que Neo4jCRUD) ---
+    def cursos_siguientes_de_lista(self, nombres_cursos_actuales):
+        siguientes = set()
+        for indice in self.indices_cursos(nombres_cursos_actuales):
+            for posicion, vecino in enumerate(self.sucesores[indice]):
+                if self.tipos_sucesores[indice][posicion] == REL_PRECEDE_A and self.es_curso(vecino):
+                    siguientes.add(vecino)
+        return [self._curso_a_dict(i) for i in self._ordenar_por_nombre(siguientes)]
+
+    def rama_cursos_por_vocacion(self, nombre_vocacion, max_depth=None):
+        raices = self.indices_por_nombre.get((ETIQUETA_VOCACION, nombre_vocacion), [])
+        niveles = niveles_bfs(raices, lambda indice: self.sucesores[indice], max_depth)
+        cursos = [indice for indice in self._ordenar_por_nombre(niveles) if self.es_curso(indice)]
+        cursos.sort(key=niveles.__getitem__)
+        return [dict(self._curso_a_dict(indice), nivel_en_rama=niveles[indice]) for indice in cursos]
+
+    def cursos_directos_por_vocacion(self, nombre_vocacion):
+        directos = set()
+        for indice in self.indices_por_nombre.get((ETIQUETA_VOCACION, nombre_vocacion), []):
+            for posicion, vecino in enumerate(self.sucesores[indice]):
+                if self.tipos_sucesores[indice][posicion] == REL_TIENE_CURSO and self.es_curso(vecino):
+                    directos.add(vecino)
+        return [self._curso_a_dict(i) for i in self._ordenar_por_nombre(directos)]
+
+    def rama_predecesora_completa(self, nombres_cursos_actuales):
+        bits = 0
+        for indice in self.indices_cursos(nombres_cursos_actuales):
+            ancestros = self.ancestros(indice)
+            if ancestros:
+                # Como en nodes(path), el propio curso forma parte de la rama si tiene predecesores.
+                bits |= ancestros | (1 << indice)
+        ordenados = sorted(self._ordenar_por_nombre(_iterar_bits(bits)), key=self.etiqueta, reverse=True)
+        return [self._nodo_a_dict(i) for i in ordenados]
+
+    def rama_sucesora_completa(self, nombres_cursos_actuales):
+        bits = 0
+        for indice in self.indices_cursos(nombres_cursos_actuales):
+            descendientes = self.descendientes(indice)
+            if descendientes:
+                bits |= descendientes | (1 << indice)
+        ordenados = sorted(self._ordenar_por_nombre(_iterar_bits(bits)), key=self.etiqueta, reverse=True)
+        return [self._nodo_a_dict(i) for i in ordenados]
+
+    def camino_usuario(self, nombres_cursos_completados):
+        """Equivalente local de Neo4jCRUD.obtener_camino_usuario."""
+        completados = self.indices_cursos(nombres_cursos_completados)
+        bits_completados = 0
+        bits_rama = 0
+        for indice in completados:
+            bits_completados |= 1 << indice
+            bits_rama |= self.ancestros(indice) | (1 << indice)
+
+        siguientes = set()
+        for indice in completados:
+            for posicion, vecino in enumerate(self.sucesores[indice]):
+                if (self.tipos_sucesores[indice][posicion] == REL_PRECEDE_A and self.es_curso(vecino)
+                        and not (bits_completados >> vecino) & 1):
+                    siguientes.add(vecino)
+
+        rama = list(_iterar_bits(bits_rama))
+        en_camino = set(rama) | siguientes
+        aristas = [(self.ids_neo4j[indice], self.ids_neo4j[vecino])
+                   for indice in rama for vecino in self.sucesores[indice] if vecino in en_camino]
+        return armar_camino_usuario([self._nodo_a_dict(i) for i in rama], [self._curso_a_dict(i) for i in siguientes], aristas)
@@ -21,6 +21,12 @@ except ImportError as e:
                     return [{'nombre': f'Curso Predecesor {i}', 'tipo_nodo': 'Curso', 'dificultad': 'Básica'} for i in range(15)]
                 if name == 'obtener_cursos_siguientes_de_lista':
                     return [{'nombre': f'Curso Siguiente {i}', 'dificultad': 'Avanzada'} for i in range(15)]
+                if name == 'obtener_camino_usuario':
+                    return {
+                        'rama_completada': [{'nombre': f'Curso Predecesor {i}', 'tipo_nodo': 'Curso', 'dificultad': 'Básica', 'nivel': i} for i in range(15)],
+                        'siguientes': [{'nombre': f'Curso Siguiente {i}', 'dificultad': 'Avanzada', 'nivel': 15} for i in range(15)],
+                        'profundidad_maxima': 15
+                    }
                 return []
             return placeholder_method
 
@@ -103,17 +109,21 @@ class VentanaCamino:
         for curso_nombre in cursos_completados:
             ttk.Label(parent_frame, text=f"- ✓ {curso_nombre} (Completado)").pack(anchor="w", padx=20)
 
+        # Rama completada y próximos pasos llegan en una sola consulta.
+        camino = self.neo4j_crud.obtener_camino_usuario(cursos_completados) or {}
+
         ttk.Label(parent_frame, text="\nRuta de Aprendizaje Completada:", font=('Helvetica', 11, 'bold')).pack(anchor="w")
-        predecesores = self.neo4j_crud.obtener_rama_predecesora_completa(cursos_completados)
+        predecesores = camino.get('rama_completada', [])
         if predecesores:
             for nodo in predecesores:
-                texto_nodo = f"- {nodo.get('nombre', 'N/A')} ({nodo.get('tipo_nodo', 'N/A')})"
+                sangria = "  " * (nodo.get('nivel') or 0)
+                texto_nodo = f"{sangria}- {nodo.get('nombre', 'N/A')} ({nodo.get('tipo_nodo', 'N/A')})"
                 if nodo.get('dificultad'):
                     texto_nodo += f" - Dificultad: {nodo['dificultad']}"
                 ttk.Label(parent_frame, text=texto_nodo).pack(anchor="w", padx=20)
         
         ttk.Label(parent_frame, text="\nPróximos Pasos Recomendados:", font=('Helvetica', 11, 'bold')).pack(anchor="w")
-        siguientes = self.neo4j_crud.obtener_cursos_siguientes_de_lista(cursos_completados)
+        siguientes = camino.get('siguientes', [])
         if siguientes:
             for curso in siguientes:
                 ttk.Label(parent_frame, text=f"- {curso.get('nombre', 'N/A')} (Dificultad: {curso.get('dificultad', 'N/A')})").pack(anchor="w", padx=20)
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from datetime import datetime
@@ -6,6 +7,8 @@ try:
     import crudvocactest as vocaciones
     import crudcursostest as cursos
     import Neo4jtest as neo4j
+    from sincronizaciontest import SincronizadorCatalogo
+    from conexionmongotest import cerrar_cliente_mongo
 except ImportError as e:
     print(f"Error de importación: {e}. Asegúrate de que los archivos CRUD existan.")
     class PlaceholderCRUD:
@@ -16,6 +19,8 @@ except ImportError as e:
     vocaciones = type("vocaciones", (object,), {"VocacionesCRUD": PlaceholderCRUD})
     cursos = type("cursos", (object,), {"CursosCRUD": PlaceholderCRUD}) 
     neo4j = type("neo4j", (object,), {"Neo4jCRUD": PlaceholderCRUD})
+    SincronizadorCatalogo = PlaceholderCRUD
+    cerrar_cliente_mongo = lambda: None
 
 
 class AuraLoaderApp:
@@ -27,6 +32,7 @@ class AuraLoaderApp:
         self.cursos_crud = cursos.CursosCRUD()
         self.vocaciones_crud = vocaciones.VocacionesCRUD()
         self.neo4j_crud = None 
+        self._hilo_conexion = None
         self.todos_los_cursos_mongo = []
 
         self.notebook = ttk.Notebook(master)
@@ -117,6 +123,8 @@ class AuraLoaderApp:
         bottom_frame.pack(fill=tk.X, pady=(10, 0))
         self.load_button = ttk.Button(bottom_frame, text="Cargar Vocación y Estructura a Neo4j", command=self.iniciar_carga)
         self.load_button.pack()
+        self.sync_button = ttk.Button(bottom_frame, text="Sincronizar Cambios del Catálogo (MongoDB → Neo4j)", command=self.sincronizar_catalogo)
+        self.sync_button.pack(pady=(5, 0))
         
     def _crear_widgets_log(self):
         log_frame = ttk.Frame(self.tab_log)
@@ -140,8 +148,23 @@ class AuraLoaderApp:
             messagebox.showerror("Credenciales Incompletas", "Por favor, ingrese URI, usuario y contraseña de Neo4j válidos.")
             return
 
+        if self._hilo_conexion is not None and self._hilo_conexion.is_alive():
+            return
+
         self.log(f"Intentando conectar a {uri}...")
-        self.neo4j_crud = neo4j.Neo4jCRUD() 
+        self.estado_label.config(text=f"Conectando a {uri}...", foreground="black")
+        self.connect_button.config(state="disabled")
+        # La conexión (con la verificación y las migraciones del esquema) corre en un hilo de fondo.
+        self.neo4j_crud = neo4j.Neo4jCRUD(uri=uri, auth=(user, password), conexion_diferida=True)
+        self._hilo_conexion = threading.Thread(target=self.neo4j_crud.conectar, name="conexion-cargador", daemon=True)
+        self._hilo_conexion.start()
+        self.master.after(100, self._esperar_conexion, uri)
+
+    def _esperar_conexion(self, uri):
+        # Tkinter solo se toca desde el hilo principal: se consulta el hilo de fondo hasta que termine.
+        if self._hilo_conexion.is_alive():
+            self.master.after(100, self._esperar_conexion, uri)
+            return
         if self.neo4j_crud and self.neo4j_crud._driver:
             self.estado_label.config(text=f"Conectado a {uri} (DB: {self.neo4j_crud._database})", foreground="green")
             self.log("Conexión a Neo4j exitosa.")
@@ -153,13 +176,14 @@ class AuraLoaderApp:
             self.notebook.tab(1, state="normal")
             self.notebook.select(self.tab_disenador)
         else:
+            self.connect_button.config(state="normal")
             self.estado_label.config(text="Falló la conexión. Revise la consola.", foreground="red")
             self.log("Error en la conexión a Neo4j.")
             messagebox.showerror("Error de Conexión", "No se pudo conectar a Neo4j. Revise la consola y sus credenciales.")
 
     def _cargar_datos_disenador(self):
         self.log("Obteniendo vocaciones de MongoDB...")
-        vocaciones_lista = self.vocaciones_crud.leer_vocaciones()
+        vocaciones_lista = self.vocaciones_crud.leer_vocaciones(proyeccion="listado")
         if vocaciones_lista:
             nombres_voc = [v['nombre'] for v in vocaciones_lista]
             self.vocacion_combobox['values'] = nombres_voc
@@ -169,7 +193,7 @@ class AuraLoaderApp:
             self.log("No se encontraron vocaciones en MongoDB.")
 
         self.log("Obteniendo cursos de MongoDB...")
-        self.todos_los_cursos_mongo = self.cursos_crud.leer_cursos()
+        self.todos_los_cursos_mongo = self.cursos_crud.leer_cursos(proyeccion="listado")
         for item in self.cursos_disponibles_tree.get_children():
             self.cursos_disponibles_tree.delete(item)
             
@@ -280,7 +304,7 @@ class AuraLoaderApp:
         
         if messagebox.askyesno("Confirmar Carga", f"Se cargará la estructura para la vocación '{nombre_vocacion}' con {len(cursos_rama)} rama(s) principal(es). ¿Desea continuar?"):
             try:
-                resultado = self.neo4j_crud.crear_vocacion_con_ramas_desde_dict(diccionario_final)
+                resultado = self.neo4j_crud.crear_vocacion_con_ramas_desde_dict(diccionario_final, modo="masivo")
                 if resultado and resultado.get('status'):
                     self.log(f"Éxito: {resultado.get('status')}")
                     messagebox.showinfo("Carga Completa", "La vocación y su estructura de cursos han sido cargadas exitosamente en Neo4j.")
@@ -290,10 +314,22 @@ class AuraLoaderApp:
                 self.log(f"Error durante la carga a Neo4j: {e}")
                 messagebox.showerror("Error de Carga", f"Ocurrió un error al cargar los datos. Revise el log.\n\n{e}")
 
+    def sincronizar_catalogo(self):
+        if not self.neo4j_crud or not self.neo4j_crud._driver:
+            messagebox.showerror("Sin Conexión", "No hay una conexión activa a Neo4j. Por favor, conéctese primero.")
+            self.notebook.select(self.tab_conexion)
+            return
+        self.log("--- Sincronizando cambios del catálogo de MongoDB ---")
+        reporte = SincronizadorCatalogo(self.neo4j_crud, self.vocaciones_crud.db).sincronizar()
+        if reporte and reporte.get("completa"):
+            self.log(f"Sincronización completa: {reporte.get('vocaciones', 0)} vocaciones, {reporte.get('cursos', 0)} cursos, "
+                     f"{reporte.get('eliminaciones', 0)} eliminaciones.")
+        else:
+            self.log("La sincronización no se completó. Revise la consola; se retomará desde el último lote aplicado.")
+
     def cerrar_aplicacion(self):
         if messagebox.askokcancel("Salir", "¿Estás seguro de que quieres salir?"):
-            if hasattr(self.vocaciones_crud, 'client') and self.vocaciones_crud.client: self.vocaciones_crud.client.close()
-            if hasattr(self.cursos_crud, 'client') and self.cursos_crud.client: self.cursos_crud.client.close()
+            cerrar_cliente_mongo()
             if self.neo4j_crud: self.neo4j_crud.close()
             self.master.destroy()
 
@@ -4,7 +4,9 @@ from tkinter import messagebox
 from pymongo import MongoClient
 import bcrypt 
 from datetime import datetime 
+import threading
 import Neo4jtest as neo4jcrud
+from metricastest import formatear_fases, medir_fase
 import crudbibliotest as bibliografias
 import crudusuariostest as usuarios
 import crudcursostest as cursos
@@ -12,15 +14,45 @@ import guipantallausuariotinker as pantallaprincipal
 
 # --- Lógica de Backend ---
 
-usuarios_crud = usuarios.UsuariosCRUD()  
-bibliografias_crud = bibliografias.BiblioCRUD() 
-cursos_crud = cursos.CursosCRUD() 
+# Los clientes se crean en un hilo de fondo cuando la ventana ya está dibujada (ver iniciar_conexiones).
+usuarios_crud = None
+bibliografias_crud = None
+cursos_crud = None
+_hilo_conexiones = None
+
+
+def _crear_conexiones():
+    """Crea los clientes de MongoDB y verifica la conexión con un ping, midiendo cada fase."""
+    global usuarios_crud, bibliografias_crud, cursos_crud
+    tiempos = {}
+    try:
+        with medir_fase(tiempos, "usuarios"):
+            crud = usuarios.UsuariosCRUD()
+            crud.client.admin.command("ping")
+        usuarios_crud = crud
+        with medir_fase(tiempos, "bibliografias"):
+            bibliografias_crud = bibliografias.BiblioCRUD()
+        with medir_fase(tiempos, "cursos"):
+            cursos_crud = cursos.CursosCRUD()
+    except Exception as e:
+        print(f"Error al conectar a MongoDB: {e}")
+    print(f"Tiempos de conexión (inicio de sesión): {formatear_fases(tiempos)}.")
+
+
+def iniciar_conexiones():
+    """Inicia, una sola vez, la creación de los clientes en segundo plano y retorna el hilo."""
+    global _hilo_conexiones
+    if _hilo_conexiones is None:
+        _hilo_conexiones = threading.Thread(target=_crear_conexiones, name="conexiones-login", daemon=True)
+        _hilo_conexiones.start()
+    return _hilo_conexiones
+
 def verificar_login_usuario(username_ingresado, password_plano_ingresado):
     """Verifica las credenciales de inicio de sesión de un usuario."""
     if not username_ingresado or not password_plano_ingresado:
         return False, "El nombre de usuario y la contraseña no pueden estar vacíos.", None
     try:
-        usuario_doc = usuarios_crud.leer_usuario(username_ingresado)
+        usuario_doc = usuarios_crud.leer_usuario(username_ingresado, proyeccion="autenticacion")
         if usuario_doc is None:
             return False, "Nombre de usuario no encontrado.", None
         hashed_pw_almacenado = usuario_doc.get("password")
@@ -99,6 +131,9 @@ class VentanaLogin:
         self.password_entry.bind("<Return>", self.intentar_login_event)
         self.username_entry.bind("<Return>", lambda event: self.password_entry.focus_set())
 
+        # Las conexiones empiezan cuando la ventana ya se mostró, sin bloquear el dibujado.
+        master.after_idle(iniciar_conexiones)
+
     def intentar_login_event(self, event=None):
         self.intentar_login()
 
@@ -106,6 +141,12 @@ class VentanaLogin:
         username = self.username_entry.get()
         password = self.password_entry.get()
 
+        if iniciar_conexiones().is_alive():
+            # Todavía se está conectando: se reintenta en cuanto termine, sin congelar la ventana.
+            self.status_label_var.set("Conectando a la base de datos...")
+            self.master.after(200, self.intentar_login)
+            return
+
         if usuarios_crud is None:
             messagebox.showerror("Error de Conexión", "No se pudo conectar a la base de datos. Verifique la consola.")
             self.status_label_var.set("Error: Sin conexión a la DB.")
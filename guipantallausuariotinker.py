@@ -1,12 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+import threading
+from metricastest import formatear_fases, medir_fase
 
 try:
     import Neo4jtest as neo4jcrud
     import crudbibliotest as bibliografias
     import crudusuariostest as usuarios
     import crudcursostest as cursos
+    import archivoinstantaneatest as archivoinstantanea
+    import conexionmongotest as conexionmongo
 except ImportError as e:
     print(f"Error de importación: {e}. Asegúrate de que los archivos CRUD existan.")
     class PlaceholderCRUD:
@@ -14,10 +18,13 @@ except ImportError as e:
         def __getattr__(self, name): return lambda *args, **kwargs: print(f"Llamada a método placeholder: {name}") or []
         def close(self): print(f"Cerrando placeholder CRUD {self.__class__.__name__}")
     
-    neo4jcrud = type("neo4jcrud", (object,), {"Neo4jCRUD": PlaceholderCRUD})
+    neo4jcrud = type("neo4jcrud", (object,), {"Neo4jCRUD": PlaceholderCRUD, "crear_gestor_grafo": PlaceholderCRUD})
     bibliografias = type("bibliografias", (object,), {"BiblioCRUD": PlaceholderCRUD})
     usuarios = type("usuarios", (object,), {"UsuariosCRUD": PlaceholderCRUD})
     cursos = type("cursos", (object,), {"CursosCRUD": PlaceholderCRUD})
+    archivoinstantanea = type("archivoinstantanea", (object,), {"cargar_archivo_instantanea": PlaceholderCRUD,
+                                                                "exportar_archivo_instantanea": PlaceholderCRUD})
+    conexionmongo = type("conexionmongo", (object,), {"cerrar_cliente_mongo": staticmethod(lambda: None)})
 
 
 class VentanaEnlaceBiblio:
@@ -104,11 +111,15 @@ class VentanaCamino:
         for curso_nombre in cursos_completados:
             ttk.Label(parent_frame, text=f"  ✓ {curso_nombre} (Completado)").pack(anchor="w", padx=20)
 
+        # Rama completada y próximos pasos llegan en una sola consulta.
+        camino = self.neo4j_crud.obtener_camino_usuario(cursos_completados)
+
         ttk.Label(parent_frame, text="\nRuta de Aprendizaje Requerida:", font=('Helvetica', 11, 'bold')).pack(anchor="w")
-        predecesores = self.neo4j_crud.obtener_rama_predecesora_completa(cursos_completados)
+        predecesores = camino["rama_completada"]
         if predecesores:
             for nodo in predecesores:
-                texto_nodo = f"  - {nodo['nombre']} ({nodo['tipo_nodo']})"
+                sangria = "  " * (nodo['nivel'] or 0)
+                texto_nodo = f"  {sangria}- {nodo['nombre']} ({nodo['tipo_nodo']})"
                 if nodo.get('dificultad'):
                     texto_nodo += f" - Dificultad: {nodo['dificultad']}"
                 ttk.Label(parent_frame, text=texto_nodo).pack(anchor="w", padx=20)
@@ -116,7 +127,7 @@ class VentanaCamino:
              ttk.Label(parent_frame, text="  No hay cursos predecesores definidos para tu progreso actual.").pack(anchor="w", padx=20)
         
         ttk.Label(parent_frame, text="\nPróximos Pasos Recomendados:", font=('Helvetica', 11, 'bold')).pack(anchor="w")
-        siguientes = self.neo4j_crud.obtener_cursos_siguientes_de_lista(cursos_completados)
+        siguientes = camino["siguientes"]
         if siguientes:
             for curso in siguientes:
                 ttk.Label(parent_frame, text=f"  - {curso['nombre']} (Dificultad: {curso['dificultad']})").pack(anchor="w", padx=20)
@@ -151,15 +162,14 @@ class VentanaCurso:
         if messagebox.askyesno("Confirmar Finalización", f"¿Estás seguro de que deseas marcar '{self.nombre_curso}' como completado?"):
             progreso_actual = self.datos_usuario.get('progreso', [])
             if self.nombre_curso not in progreso_actual:
-                nuevo_progreso = progreso_actual + [self.nombre_curso]
-                datos_a_actualizar = {"progreso": nuevo_progreso}
                 id_usuario_mongo = self.datos_usuario.get('_id')
                 
-                exito = self.usuarios_crud.actualizar_usuario(id_usuario_mongo, datos_a_actualizar)
+                # Retorna el usuario ya actualizado: la ventana principal se refresca sin volver a leerlo.
+                usuario_actualizado = self.usuarios_crud.completar_curso(id_usuario_mongo, self.nombre_curso)
                 
-                if exito:
+                if usuario_actualizado:
                     messagebox.showinfo("¡Felicidades!", f"Has completado el curso: {self.nombre_curso}.")
-                    self.on_close_callback()
+                    self.on_close_callback(usuario_actualizado)
                     self.curso_window.destroy()
                 else:
                     messagebox.showerror("Error", "No se pudo actualizar tu progreso. Inténtalo de nuevo.")
@@ -172,43 +182,84 @@ class VentanaPrincipalApp:
     def __init__(self, master, datos_usuario):
         self.master = master
         self.datos_usuario = datos_usuario
-        self.neo4j_crud = neo4jcrud.Neo4jCRUD()
-        self.bibliografias_crud = bibliografias.BiblioCRUD()
-        self.cursos_crud = cursos.CursosCRUD() 
-        self.usuarios_crud = usuarios.UsuariosCRUD() 
-
-        master.title(f"Plataforma de Aprendizaje - Usuario: {datos_usuario['username']}")
-        master.geometry("800x600")
-        master.protocol("WM_DELETE_WINDOW", self._al_cerrar_ventana_principal)
-
-        style = ttk.Style()
-        style.theme_use('clam')
-        style.configure("TNotebook.Tab", padding=[10, 5], font=('Helvetica', 10, 'bold'))
-        style.configure("Treeview.Heading", font=('Helvetica', 10, 'bold'))
-
-        self.notebook = ttk.Notebook(master)
-        
-        self.tab_perfil = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.tab_perfil, text='Mi Perfil')
-        self._crear_widgets_perfil()
-
-        self.tab_cursos = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.tab_cursos, text='Cursos') 
-        self._crear_widgets_cursos()
-
-        self.tab_bibliografias = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.tab_bibliografias, text='Mi Enciclopedia')
-        self._crear_widgets_bibliografias()
-
-        self.notebook.pack(expand=True, fill='both')
-
-        self.refrescar_toda_la_interfaz()
+        self._tiempos_inicio = {}
+        # Crear los clientes no abre conexiones: se conectan en segundo plano después de dibujar la ventana.
+        with medir_fase(self._tiempos_inicio, "clientes"):
+            self.neo4j_crud = neo4jcrud.crear_gestor_grafo(conexion_diferida=True)
+            self.bibliografias_crud = bibliografias.BiblioCRUD()
+            self.cursos_crud = cursos.CursosCRUD() 
+            self.usuarios_crud = usuarios.UsuariosCRUD() 
+        # Copia local de cursos y bibliografías leída del archivo de instantánea, si lo hay.
+        self.catalogo_local = None
+
+        with medir_fase(self._tiempos_inicio, "ventana"):
+            master.title(f"Plataforma de Aprendizaje - Usuario: {datos_usuario['username']}")
+            master.geometry("800x600")
+            master.protocol("WM_DELETE_WINDOW", self._al_cerrar_ventana_principal)
+
+            style = ttk.Style()
+            style.theme_use('clam')
+            style.configure("TNotebook.Tab", padding=[10, 5], font=('Helvetica', 10, 'bold'))
+            style.configure("Treeview.Heading", font=('Helvetica', 10, 'bold'))
+
+            self.notebook = ttk.Notebook(master)
+
+            self.tab_perfil = ttk.Frame(self.notebook, padding=20)
+            self.notebook.add(self.tab_perfil, text='Mi Perfil')
+            self._crear_widgets_perfil()
+
+            self.tab_cursos = ttk.Frame(self.notebook, padding=20)
+            self.notebook.add(self.tab_cursos, text='Cursos') 
+            self._crear_widgets_cursos()
+
+            self.tab_bibliografias = ttk.Frame(self.notebook, padding=20)
+            self.notebook.add(self.tab_bibliografias, text='Mi Enciclopedia')
+            self._crear_widgets_bibliografias()
+
+            self.notebook.pack(expand=True, fill='both')
+            self._mostrar_progreso()
+            self.tree_cursos.insert("", tk.END, values=("Cargando cursos...", ""))
+
+        self._hilo_precalentamiento = threading.Thread(target=self._precalentar_conexiones, name="conexiones-principal", daemon=True)
+        master.after_idle(self._hilo_precalentamiento.start)
+        master.after(100, self._esperar_precalentamiento)
+
+    def _precalentar_conexiones(self):
+        """Se ejecuta en un hilo de fondo: conecta el grafo, carga su instantánea y verifica MongoDB."""
+        try:
+            with medir_fase(self._tiempos_inicio, "neo4j"):
+                self.neo4j_crud.conectar()
+            # El grafo de cursos cambia poco: se consulta desde memoria y solo se recarga si cambia su versión.
+            # Se parte del archivo local y solo se traen los cambios; sin archivo, se carga todo y se guarda.
+            with medir_fase(self._tiempos_inicio, "instantanea"):
+                self.catalogo_local = archivoinstantanea.cargar_archivo_instantanea(self.neo4j_crud, self.usuarios_crud.db)
+                if self.catalogo_local is None:
+                    self.neo4j_crud.activar_instantanea_local()
+                    self.catalogo_local = archivoinstantanea.exportar_archivo_instantanea(self.neo4j_crud, self.usuarios_crud.db)
+            with medir_fase(self._tiempos_inicio, "mongo"):
+                self.usuarios_crud.client.admin.command("ping")
+        except Exception as e:
+            print(f"Error al preparar las conexiones de la ventana principal: {e}")
+
+    def _esperar_precalentamiento(self):
+        # Tkinter solo se toca desde el hilo principal: se consulta el hilo de fondo hasta que termine.
+        if self._hilo_precalentamiento.is_alive() or self._hilo_precalentamiento.ident is None:
+            self.master.after(100, self._esperar_precalentamiento)
+            return
+        with medir_fase(self._tiempos_inicio, "primer_refresco"):
+            self.refrescar_toda_la_interfaz()
+        print(f"Tiempos de inicio de la ventana principal: {formatear_fases(self._tiempos_inicio)}.")
 
-    def refrescar_toda_la_interfaz(self):
-        usuario_actualizado_doc = self.usuarios_crud.leer_usuario_por_id(self.datos_usuario.get('_id'))
+    def refrescar_toda_la_interfaz(self, usuario_actualizado_doc=None):
+        if usuario_actualizado_doc is None:
+            usuario_actualizado_doc = self.usuarios_crud.leer_usuario_por_id(self.datos_usuario.get('_id'), proyeccion="sesion")
         if usuario_actualizado_doc:
             self.datos_usuario = usuario_actualizado_doc
         
+        self._mostrar_progreso()
+        self._cargar_cursos_vocacion()
+
+    def _mostrar_progreso(self):
         self.progreso_listbox.delete(0, tk.END)
         cursos_completados = self.datos_usuario.get('progreso', [])
         if cursos_completados:
@@ -217,8 +268,6 @@ class VentanaPrincipalApp:
         else:
             self.progreso_listbox.insert(tk.END, "Aún no has completado cursos.")
 
-        self._cargar_cursos_vocacion()
-
     def _crear_widgets_perfil(self):
         ttk.Label(self.tab_perfil, text="Información del Usuario", font=('Helvetica', 16, 'bold')).pack(pady=(0,15))
         info_frame = ttk.Frame(self.tab_perfil)
@@ -265,16 +314,26 @@ class VentanaPrincipalApp:
             self.tree_cursos.insert("", tk.END, values=("Error: Servicio Neo4j no disponible.", ""))
             return
 
+        # Si el trabajo por lotes ya calculó las recomendaciones para este progreso y esta versión
+        # del grafo, se leen de Mongo.
+        recomendacion = self.usuarios_crud.obtener_recomendacion(self.datos_usuario.get('_id'), cursos_completados,
+                                                                 nombre_vocacion, self.neo4j_crud.version_grafo())
+
         if not cursos_completados:
             self.notebook.tab(self.tab_cursos, text='Cursos de mi Vocación')
             self.cursos_titulo_label.config(text=f"Cursos Recomendados para: {nombre_vocacion}")
-            if nombre_vocacion:
+            if recomendacion:
+                cursos_a_mostrar = recomendacion["siguientes"]
+            elif nombre_vocacion:
                 cursos_a_mostrar = self.neo4j_crud.obtener_cursos_directos_por_vocacion(nombre_vocacion)
-                nombres_reales_para_biblios = [c.get("nombre") for c in cursos_a_mostrar]
+            nombres_reales_para_biblios = [c.get("nombre") for c in cursos_a_mostrar]
         else:
             self.notebook.tab(self.tab_cursos, text='Mis Próximos Pasos')
             self.cursos_titulo_label.config(text="Tus Próximos Pasos Recomendados")
-            cursos_siguientes = self.neo4j_crud.obtener_cursos_siguientes_de_lista(cursos_completados)
+            if recomendacion:
+                cursos_siguientes = recomendacion["siguientes"]
+            else:
+                cursos_siguientes = self.neo4j_crud.obtener_camino_usuario(cursos_completados)["siguientes"]
             for nombre_curso in cursos_completados:
                 cursos_a_mostrar.append({"nombre": f"✓ {nombre_curso}", "dificultad": "Completado"})
             cursos_a_mostrar.extend(cursos_siguientes)
@@ -297,6 +356,7 @@ class VentanaPrincipalApp:
         
         nombre_curso_display = item_values[0]
         estado_curso = item_values[1]
+        if not estado_curso: return
 
         if estado_curso == "Completado":
             messagebox.showinfo("Curso Completado", f"Ya has completado el curso:\n'{nombre_curso_display.replace('✓ ', '')}'")
@@ -328,15 +388,18 @@ class VentanaPrincipalApp:
             return
             
         titulos_biblios_a_buscar = set()
-        if self.cursos_crud:
-            cursos_docs_mongo = self.cursos_crud.leer_cursos_por_nombres(nombres_cursos)
+        # Con el catálogo local las mismas lecturas se resuelven en memoria, sin ir a MongoDB.
+        fuente_cursos = self.catalogo_local or self.cursos_crud
+        fuente_bibliografias = self.catalogo_local or self.bibliografias_crud
+        if fuente_cursos:
+            cursos_docs_mongo = fuente_cursos.leer_cursos_por_nombres(nombres_cursos)
             for curso_doc in cursos_docs_mongo:
                 biblio_desbloqueada = curso_doc.get("enciclopedia_desbloqueada")
                 if biblio_desbloqueada:
                     titulos_biblios_a_buscar.add(biblio_desbloqueada)
 
-        if titulos_biblios_a_buscar and self.bibliografias_crud:
-            bibliografias_data = self.bibliografias_crud.leer_bibliografias_por_titulos(list(titulos_biblios_a_buscar))
+        if titulos_biblios_a_buscar and fuente_bibliografias:
+            bibliografias_data = fuente_bibliografias.leer_bibliografias_por_titulos(list(titulos_biblios_a_buscar))
             if bibliografias_data:
                 self.biblios_data_cache = {b.get("titulo"): b for b in bibliografias_data}
                 for biblio in bibliografias_data:
@@ -365,7 +428,6 @@ class VentanaPrincipalApp:
         if messagebox.askokcancel("Salir", "¿Estás seguro de que quieres cerrar la aplicación?"):
             if self.neo4j_crud:
                 self.neo4j_crud.close()
-            if self.usuarios_crud and getattr(self.usuarios_crud, 'client', None):
-                self.usuarios_crud.client.close()
-                print("Conexión a MongoDB cerrada.")
+            # Todos los CRUD comparten un único cliente de MongoDB.
+            conexionmongo.cerrar_cliente_mongo()
             self.master.destroy()
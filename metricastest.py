@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONTEO = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# nombre de la métrica -> (límites de los buckets, descripción)
+HISTOGRAMAS = {
+    "transaccion_segundos": (LIMITES_SEGUNDOS, "Duración total (reloj) de la transacción, incluida la red."),
+    "servidor_disponible_segundos": (LIMITES_SEGUNDOS, "Suma de result_available_after de las consultas de la transacción."),
+    "servidor_consumido_segundos": (LIMITES_SEGUNDOS, "Suma de result_consumed_after de las consultas de la transacción."),
+    "filas": (LIMITES_CONTEO, "Filas devueltas por la transacción."),
+    "db_hits": (LIMITES_CONTEO, "Accesos a la base (db hits) de las transacciones muestreadas con PROFILE."),
+}
+
+
+@contextmanager
+def medir_fase(tiempos, fase):
+    """Anota en tiempos[fase] los segundos que tarda el bloque, aunque termine con error."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[fase] = time.perf_counter() - inicio
+
+
+def formatear_fases(tiempos):
+    """Texto de una línea con la duración de cada fase, en el orden en que se midieron."""
+    return ", ".join(f"{fase} {segundos:.3f}s" for fase, segundos in tiempos.items())
+
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos, compatible con el formato de Prometheus."""
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor):
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+    def acumulados(self):
+        """Lista de (límite, observaciones <= límite); el último límite es '+Inf'."""
+        total = 0
+        resultado = []
+        for limite, conteo in zip(self.limites + ("+Inf",), self.conteos):
+            total += conteo
+            resultado.append((limite, total))
+        return resultado
+
+    def percentil(self, fraccion):
+        """Aproximación de un percentil: el límite superior del bucket que lo contiene."""
+        if not self.cuenta:
+            return None
+        objetivo = fraccion * self.cuenta
+        for limite, acumulado in self.acumulados():
+            if acumulado >= objetivo:
+                return limite
+        return "+Inf"
+
+    def a_dict(self):
+        return {
+            "cuenta": self.cuenta,
+            "suma": self.suma,
+            "promedio": self.suma / self.cuenta if self.cuenta else 0.0,
+            "p50": self.percentil(0.5),
+            "p95": self.percentil(0.95),
+            "buckets": {str(limite): acumulado for limite, acumulado in self.acumulados()}
+        }
+
+
+class RegistroMetricas:
+    """
+    Métricas en memoria por (función transaccional, tipo de transacción): histogramas de duración,
+    tiempos del servidor, filas y db hits, más contadores de errores. Es seguro entre hilos.
+    """
+
+    def __init__(self, prefijo):
+        self.prefijo = prefijo
+        self._operaciones = {}
+        self._lock = threading.Lock()
+
+    def _operacion(self, funcion, tipo):
+        clave = (funcion, tipo)
+        operacion = self._operaciones.get(clave)
+        if operacion is None:
+            operacion = {
+                "histogramas": {nombre: Histograma(limites) for nombre, (limites, _) in HISTOGRAMAS.items()},
+                "errores": {}
+            }
+            self._operaciones[clave] = operacion
+        return operacion
+
+    def registrar_transaccion(self, funcion, tipo, segundos, consultas, error=None):
+        """
+        Registra una transacción. 'consultas' es la lista de métricas por sentencia
+        ({"disponible_ms", "consumido_ms", "filas", "db_hits"}) tomadas de cada ResultSummary.
+        """
+        with self._lock:
+            operacion = self._operacion(funcion, tipo)
+            histogramas = operacion["histogramas"]
+            histogramas["transaccion_segundos"].observar(segundos)
+            if error is not None:
+                operacion["errores"][error] = operacion["errores"].get(error, 0) + 1
+                return
+            histogramas["servidor_disponible_segundos"].observar(sum(c["disponible_ms"] or 0 for c in consultas) / 1000.0)
+            histogramas["servidor_consumido_segundos"].observar(sum(c["consumido_ms"] or 0 for c in consultas) / 1000.0)
+            histogramas["filas"].observar(sum(c["filas"] for c in consultas))
+            muestreadas = [c["db_hits"] for c in consultas if c["db_hits"] is not None]
+            if muestreadas:
+                histogramas["db_hits"].observar(sum(muestreadas))
+
+    def reiniciar(self):
+        with self._lock:
+            self._operaciones.clear()
+
+    def a_dict(self):
+        with self._lock:
+            return {
+                f"{funcion}|{tipo}": {
+                    "funcion": funcion,
+                    "tipo": tipo,
+                    "errores": dict(operacion["errores"]),
+                    **{nombre: histograma.a_dict() for nombre, histograma in operacion["histogramas"].items()}
+                }
+                for (funcion, tipo), operacion in sorted(self._operaciones.items())
+            }
+
+    def a_json(self, indent=2):
+        return json.dumps(self.a_dict(), indent=indent, ensure_ascii=False)
+
+    def a_prometheus(self):
+        """Exporta todas las métricas en el formato de texto de Prometheus."""
+        lineas = []
+        with self._lock:
+            operaciones = sorted(self._operaciones.items())
+            for nombre, (_, descripcion) in HISTOGRAMAS.items():
+                metrica = f"{self.prefijo}_{nombre}"
+                lineas.append(f"# HELP {metrica} {descripcion}")
+                lineas.append(f"# TYPE {metrica} histogram")
+                for (funcion, tipo), operacion in operaciones:
+                    histograma = operacion["histogramas"][nombre]
+                    etiquetas = f'funcion="{funcion}",tipo="{tipo}"'
+                    for limite, acumulado in histograma.acumulados():
+                        lineas.append(f'{metrica}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+                    lineas.append(f"{metrica}_sum{{{etiquetas}}} {histograma.suma}")
+                    lineas.append(f"{metrica}_count{{{etiquetas}}} {histograma.cuenta}")
+
+            metrica = f"{self.prefijo}_errores_total"
+            lineas.append(f"# HELP {metrica} Transacciones que terminaron con error, por tipo de excepción.")
+            lineas.append(f"# TYPE {metrica} counter")
+            for (funcion, tipo), operacion in operaciones:
+                for error, cantidad in sorted(operacion["errores"].items()):
+                    lineas.append(f'{metrica}{{funcion="{funcion}",tipo="{tipo}",error="{error}"}} {cantidad}')
+        return "\n".join(lineas) + "\n"
@@ -0,0 +1,203 @@
+import copy
+import heapq
+import threading
+import unicodedata
+from collections import OrderedDict
+from grafomemoriatest import ETIQUETA_VOCACION, ETIQUETA_CURSO, REL_PRECEDE_A, _iterar_bits
+
+# Rango de cada dificultad que aparece en el catálogo; se comparan sin tildes ni mayúsculas.
+# "Todos los niveles" no exige nivel previo y va con las de principiante. Las desconocidas van al final.
+ORDEN_DIFICULTAD = {
+    "Principiante": 0, "Fácil": 0, "Básica": 0, "Básico": 0, "Todos los niveles": 0,
+    "Intermedio": 1, "Intermedia": 1,
+    "Avanzado": 2, "Avanzada": 2,
+    "Muy Avanzado": 3, "Muy Avanzada": 3,
+}
+RANGO_DIFICULTAD_DESCONOCIDA = max(ORDEN_DIFICULTAD.values()) + 1
+
+
+def _normalizar_dificultad(dificultad):
+    sin_tildes = unicodedata.normalize("NFKD", dificultad).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sin_tildes.casefold().split())
+
+
+_RANGOS_NORMALIZADOS = {_normalizar_dificultad(nombre): rango for nombre, rango in ORDEN_DIFICULTAD.items()}
+
+
+def _rango_dificultad(dificultad):
+    if not isinstance(dificultad, str):
+        return RANGO_DIFICULTAD_DESCONOCIDA
+    return _RANGOS_NORMALIZADOS.get(_normalizar_dificultad(dificultad), RANGO_DIFICULTAD_DESCONOCIDA)
+
+
+class PlanificadorCaminos:
+    """
+    Calcula, sobre una InstantaneaGrafo, la secuencia completa de cursos que le faltan a un usuario
+    para llegar a un curso o a una vocación objetivo. Los cursos se ordenan topológicamente según
+    PRECEDE_A y, entre los disponibles en cada paso, primero los de menor dificultad.
+    Los planes se memorizan por (versión del grafo, progreso, objetivo); si cambia la versión de la
+    instantánea, la memoria se descarta.
+    """
+
+    def __init__(self, max_entradas=4096):
+        self.max_entradas = max_entradas
+        self._planes = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "entradas": len(self._planes),
+                "max_entradas": self.max_entradas
+            }
+
+    def invalidar(self):
+        with self._lock:
+            self._planes.clear()
+
+    def planificar(self, instantanea, progreso, objetivo, tipo_objetivo=ETIQUETA_CURSO):
+        """
+        Retorna {"objetivo", "tipo_objetivo", "version_grafo", "cursos" (en orden, cada uno con su 'paso'),
+        "total_cursos", "ciclos" (listas de nombres), "bloqueados" (cursos que dependen de un ciclo),
+        "completo"}, o None si el objetivo no existe.
+        """
+        if tipo_objetivo not in (ETIQUETA_CURSO, ETIQUETA_VOCACION):
+            print(f"Error: Tipo de objetivo '{tipo_objetivo}' no válido. Use '{ETIQUETA_CURSO}' o '{ETIQUETA_VOCACION}'.")
+            return None
+        clave = (frozenset(progreso or []), tipo_objetivo, objetivo)
+        with self._lock:
+            if self._version != instantanea.version:
+                self._planes.clear()
+                self._version = instantanea.version
+            plan = self._planes.get(clave)
+            if plan is not None:
+                self._planes.move_to_end(clave)
+                self.aciertos += 1
+                return copy.deepcopy(plan)
+            self.fallos += 1
+
+        plan = self._calcular_plan(instantanea, clave[0], objetivo, tipo_objetivo)
+        if plan is None:
+            return None
+        with self._lock:
+            if self._version == instantanea.version:
+                self._planes[clave] = plan
+                if len(self._planes) > self.max_entradas:
+                    self._planes.popitem(last=False)
+        return copy.deepcopy(plan)
+
+    @staticmethod
+    def _cursos_requeridos(instantanea, objetivo, tipo_objetivo):
+        """Bitset con el objetivo (o los cursos de la vocación) y todos sus cursos previos."""
+        indices = instantanea.indices_por_nombre.get((tipo_objetivo, objetivo), [])
+        if not indices:
+            return None
+        bits = 0
+        for indice in indices:
+            if tipo_objetivo == ETIQUETA_CURSO:
+                bits |= (1 << indice) | instantanea.ancestros(indice)
+            else:
+                for curso in _iterar_bits(instantanea.descendientes(indice)):
+                    bits |= (1 << curso) | instantanea.ancestros(curso)
+        return bits
+
+    @staticmethod
+    def _ciclos(instantanea, pendientes):
+        """Componentes fuertemente conexas (Tarjan iterativo) con ciclo dentro de 'pendientes'."""
+        def vecinos(nodo):
+            return [v for v in instantanea.sucesores[nodo] if v in pendientes]
+
+        indice_de, bajo, en_pila, pila, ciclos = {}, {}, set(), [], []
+        contador = 0
+        for inicio in sorted(pendientes):
+            if inicio in indice_de:
+                continue
+            trabajo = [(inicio, iter(vecinos(inicio)))]
+            indice_de[inicio] = bajo[inicio] = contador
+            contador += 1
+            pila.append(inicio)
+            en_pila.add(inicio)
+            while trabajo:
+                nodo, hijos = trabajo[-1]
+                avanzo = False
+                for hijo in hijos:
+                    if hijo not in indice_de:
+                        indice_de[hijo] = bajo[hijo] = contador
+                        contador += 1
+                        pila.append(hijo)
+                        en_pila.add(hijo)
+                        trabajo.append((hijo, iter(vecinos(hijo))))
+                        avanzo = True
+                        break
+                    if hijo in en_pila:
+                        bajo[nodo] = min(bajo[nodo], indice_de[hijo])
+                if avanzo:
+                    continue
+                trabajo.pop()
+                if trabajo:
+                    padre = trabajo[-1][0]
+                    bajo[padre] = min(bajo[padre], bajo[nodo])
+                if bajo[nodo] == indice_de[nodo]:
+                    componente = []
+                    while True:
+                        miembro = pila.pop()
+                        en_pila.discard(miembro)
+                        componente.append(miembro)
+                        if miembro == nodo:
+                            break
+                    if len(componente) > 1 or nodo in instantanea.sucesores[nodo]:
+                        ciclos.append(componente)
+        return ciclos
+
+    def _calcular_plan(self, instantanea, completados, objetivo, tipo_objetivo):
+        requeridos = self._cursos_requeridos(instantanea, objetivo, tipo_objetivo)
+        if requeridos is None:
+            print(f"No se encontró el objetivo '{objetivo}' ({tipo_objetivo}) para planificar el camino.")
+            return None
+
+        pendientes = {i for i in _iterar_bits(requeridos)
+                      if instantanea.es_curso(i) and instantanea.nombres[i] not in completados}
+
+        # Kahn sobre los cursos pendientes; entre los disponibles se elige el de menor dificultad.
+        grado = dict.fromkeys(pendientes, 0)
+        for indice in pendientes:
+            for predecesor in set(instantanea.predecesores[indice]):
+                if predecesor in grado:
+                    grado[indice] += 1
+        prioridad = lambda i: (_rango_dificultad(instantanea.dificultades[i]), instantanea.nombres[i] or "", i)
+        disponibles = [prioridad(i) for i, g in grado.items() if g == 0]
+        heapq.heapify(disponibles)
+        orden = []
+        while disponibles:
+            indice = heapq.heappop(disponibles)[-1]
+            orden.append(indice)
+            for posicion, sucesor in enumerate(instantanea.sucesores[indice]):
+                if instantanea.tipos_sucesores[indice][posicion] == REL_PRECEDE_A and sucesor in grado:
+                    grado[sucesor] -= 1
+                    if grado[sucesor] == 0:
+                        heapq.heappush(disponibles, prioridad(sucesor))
+
+        restantes = pendientes.difference(orden)
+        ciclos = [sorted(instantanea.nombres[i] for i in ciclo) for ciclo in self._ciclos(instantanea, restantes)]
+        en_ciclo = {nombre for ciclo in ciclos for nombre in ciclo}
+        if ciclos:
+            print(f"Advertencia: El camino hacia '{objetivo}' contiene {len(ciclos)} ciclo(s) de prerrequisitos: {ciclos}")
+
+        cursos = [dict(instantanea._curso_a_dict(indice), paso=paso) for paso, indice in enumerate(orden, start=1)]
+        return {
+            "objetivo": objetivo,
+            "tipo_objetivo": tipo_objetivo,
+            "version_grafo": instantanea.version,
+            "cursos": cursos,
+            "total_cursos": len(cursos),
+            "ciclos": sorted(ciclos),
+            "bloqueados": sorted(instantanea.nombres[i] for i in restantes if instantanea.nombres[i] not in en_ciclo),
+            "completo": not restantes
+        }
@@ -0,0 +1,148 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pymongo import ReplaceOne
+from conexionmongotest import URI_MONGO, BASE_DATOS_MONGO, crear_cliente_mongo, ahora_utc
+
+COLLECTION_NAME_USUARIOS = "usuarios"
+COLLECTION_NAME_RECOMENDACIONES = "recomendaciones"
+TAMANO_LOTE_RECOMENDACIONES = 1000
+
+# Estado de cada proceso trabajador: su propia copia de la instantánea y su propio cliente de Mongo.
+_instantanea_trabajador = None
+_planificador_trabajador = None
+_db_trabajador = None
+
+
+def calcular_recomendacion(instantanea, planificador, usuario):
+    """
+    Calcula, sobre la instantánea del grafo, el documento de recomendaciones de un usuario:
+    sus siguientes pasos (o los cursos iniciales de su vocación si aún no tiene progreso) y
+    el camino restante hasta completar su vocación.
+    """
+    progreso = usuario.get("progreso") or []
+    vocacion = usuario.get("vocacion")
+    if progreso:
+        siguientes = instantanea.camino_usuario(progreso)["siguientes"]
+    else:
+        siguientes = instantanea.cursos_directos_por_vocacion(vocacion) if vocacion else []
+    plan = planificador.planificar(instantanea, progreso, vocacion, "Vocacion") if vocacion else None
+    return {
+        "_id": usuario["_id"],
+        "username": usuario.get("username"),
+        "vocacion": vocacion,
+        "progreso": sorted(progreso),
+        "siguientes": siguientes,
+        "camino_restante": plan["cursos"] if plan else [],
+        "ciclos": plan["ciclos"] if plan else [],
+        "version_grafo": instantanea.version,
+        "generado_en": ahora_utc()
+    }
+
+
+def calcular_particiones(coleccion, num_particiones):
+    """
+    Divide la colección en rangos de _id de tamaño parecido con $bucketAuto.
+    Retorna una lista de (min, max, incluir_max); solo el último rango incluye su máximo.
+    """
+    buckets = list(coleccion.aggregate([{"$bucketAuto": {"groupBy": "$_id", "buckets": max(1, num_particiones)}}]))
+    return [(b["_id"]["min"], b["_id"]["max"], posicion == len(buckets) - 1) for posicion, b in enumerate(buckets)]
+
+
+def _inicializar_trabajador(instantanea, uri_mongo, base_datos):
+    global _instantanea_trabajador, _planificador_trabajador, _db_trabajador
+    from planificadortest import PlanificadorCaminos
+    _instantanea_trabajador = instantanea
+    _planificador_trabajador = PlanificadorCaminos()
+    # Cada proceso abre su propio cliente: MongoClient no debe compartirse entre procesos.
+    _db_trabajador = crear_cliente_mongo(uri_mongo)[base_datos]
+
+
+def _procesar_particion(particion, tamano_lote=TAMANO_LOTE_RECOMENDACIONES):
+    """Recorre los usuarios de un rango de _id y guarda sus recomendaciones con upserts en lote."""
+    minimo, maximo, incluir_maximo = particion
+    inicio = time.perf_counter()
+    filtro = {"_id": {"$gte": minimo, "$lte" if incluir_maximo else "$lt": maximo}}
+    proyeccion = {"username": 1, "vocacion": 1, "progreso": 1}
+    destino = _db_trabajador[COLLECTION_NAME_RECOMENDACIONES]
+    procesados = 0
+    escritos = 0
+    operaciones = []
+    for usuario in _db_trabajador[COLLECTION_NAME_USUARIOS].find(filtro, proyeccion, batch_size=tamano_lote).sort("_id", 1):
+        recomendacion = calcular_recomendacion(_instantanea_trabajador, _planificador_trabajador, usuario)
+        operaciones.append(ReplaceOne({"_id": recomendacion["_id"]}, recomendacion, upsert=True))
+        procesados += 1
+        if len(operaciones) >= tamano_lote:
+            resultado = destino.bulk_write(operaciones, ordered=False)
+            escritos += resultado.upserted_count + resultado.modified_count
+            operaciones = []
+    if operaciones:
+        resultado = destino.bulk_write(operaciones, ordered=False)
+        escritos += resultado.upserted_count + resultado.modified_count
+    return {"procesados": procesados, "escritos": escritos, "segundos": time.perf_counter() - inicio,
+            "aciertos_planificador": _planificador_trabajador.estadisticas()["aciertos"]}
+
+
+def generar_recomendaciones(gestor_grafo, num_procesos=None, tamano_lote=TAMANO_LOTE_RECOMENDACIONES,
+                            uri_mongo=URI_MONGO, base_datos=BASE_DATOS_MONGO):
+    """
+    Calcula y guarda en 'recomendaciones' los siguientes pasos y el camino restante de todos los
+    usuarios. El grafo se carga una vez desde 'gestor_grafo' y cada proceso recibe su copia;
+    los usuarios se reparten por rangos de _id. Retorna un reporte con conteos y tiempos.
+    """
+    inicio = time.perf_counter()
+    if not gestor_grafo.activar_instantanea_local():
+        print("Error: No se pudo cargar el grafo para generar las recomendaciones.")
+        return None
+    instantanea = gestor_grafo.instantanea_local()
+    if instantanea is None:
+        print("Error: La instantánea del grafo no está al día para generar las recomendaciones.")
+        return None
+
+    num_procesos = num_procesos or os.cpu_count() or 1
+    try:
+        cliente = crear_cliente_mongo(uri_mongo)
+        coleccion = cliente[base_datos][COLLECTION_NAME_USUARIOS]
+        # Más particiones que procesos para repartir mejor la carga si los rangos quedan desparejos.
+        particiones = calcular_particiones(coleccion, num_procesos * 4)
+        cliente.close()
+    except Exception as e:
+        print(f"Error al particionar la colección de usuarios: {e}")
+        return None
+
+    reportes = []
+    with ProcessPoolExecutor(max_workers=num_procesos, initializer=_inicializar_trabajador,
+                             initargs=(instantanea, uri_mongo, base_datos)) as pool:
+        futuros = [pool.submit(_procesar_particion, particion, tamano_lote) for particion in particiones]
+        for futuro in futuros:
+            try:
+                reportes.append(futuro.result())
+            except Exception as e:
+                print(f"Error al procesar una partición de usuarios: {e}")
+
+    total_segundos = time.perf_counter() - inicio
+    procesados = sum(r["procesados"] for r in reportes)
+    reporte = {
+        "particiones": len(particiones),
+        "particiones_fallidas": len(particiones) - len(reportes),
+        "procesos": num_procesos,
+        "usuarios_procesados": procesados,
+        "documentos_escritos": sum(r["escritos"] for r in reportes),
+        "version_grafo": instantanea.version,
+        "total_segundos": total_segundos,
+        "usuarios_por_segundo": procesados / total_segundos if total_segundos > 0 else 0.0
+    }
+    print(f"Recomendaciones generadas: {procesados} usuarios en {total_segundos:.2f}s "
+          f"({reporte['usuarios_por_segundo']:.1f} usuarios/s, {num_procesos} procesos).")
+    return reporte
+
+
+if __name__ == "__main__":
+    from Neo4jtest import crear_gestor_grafo
+
+    gestor = crear_gestor_grafo()
+    if gestor is not None and gestor._driver is not None:
+        print(generar_recomendaciones(gestor))
+        gestor.close()
+    else:
+        print("No se pudo conectar al grafo. Saliendo.")
@@ -1,4 +1,6 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import OperationFailure
+from bson.objectid import ObjectId
 from datetime import datetime
 from tkinter import ttk
 from tkinter import messagebox
@@ -28,10 +30,125 @@ def crear_colecciones(db):
     
     print("Vocaciones insertadas correctamente.")
 
+# (colección, claves, unico, nombre). Sin nombre se usa el que asigna MongoDB, el mismo que
+# usan los create_index de sincronizaciontest.py para esas claves. Los únicos son parciales ($exists) para que los documentos
+# viejos sin el campo no choquen entre sí como si todos tuvieran el valor null.
+# Los de usuarios.username y vocaciones.nombre los crea también la aplicación al escribir
+# (conexionmongotest.INDICES_UNICOS_APLICACION): mantener los mismos nombres y opciones.
+INDICES = [
+    ("usuarios", [("username", ASCENDING)], True, "usuarios_username_unico"),
+    ("vocaciones", [("nombre", ASCENDING)], True, "vocaciones_nombre_unico"),
+    ("cursos", [("id_neo4j", ASCENDING)], True, "cursos_id_neo4j_unico"),
+    ("cursos", [("nombre", ASCENDING)], False, "cursos_nombre"),
+    ("bibliografias", [("titulo", ASCENDING), ("autor", ASCENDING)], True, "bibliografias_titulo_autor_unico"),
+    # Lecturas incrementales por fecha de modificación (sincronización y archivo de instantánea).
+    ("vocaciones", [("actualizado_en", ASCENDING), ("_id", ASCENDING)], False, None),
+    ("cursos", [("actualizado_en", ASCENDING), ("_id", ASCENDING)], False, None),
+    ("bibliografias", [("actualizado_en", ASCENDING), ("_id", ASCENDING)], False, None),
+    ("catalogo_eliminaciones", [("actualizado_en", ASCENDING), ("_id", ASCENDING)], False, None),
+]
+
+# (descripción, colección, filtro, orden) con la forma de las consultas que hacen los CRUD.
+CONSULTAS_APLICACION = [
+    ("UsuariosCRUD.leer_usuario / registro (username)", "usuarios", {"username": "usuario"}, None),
+    ("UsuariosCRUD.leer_usuario_por_id (_id)", "usuarios", {"_id": ObjectId()}, None),
+    ("UsuariosCRUD.obtener_recomendacion (_id)", "recomendaciones", {"_id": ObjectId()}, None),
+    ("VocacionesCRUD.crear_vocacion / validar_vocacion_existente (nombre)", "vocaciones", {"nombre": "vocacion"}, None),
+    ("VocacionesCRUD.obtener_vocaciones_para_dropdown (orden por nombre)", "vocaciones", {}, [("nombre", ASCENDING)]),
+    ("CursosCRUD.leer_cursos_por_nombres (nombre $in)", "cursos", {"nombre": {"$in": ["a", "b"]}}, None),
+    ("CursosCRUD carga inicial (id_neo4j)", "cursos", {"id_neo4j": "CURSO001"}, None),
+    ("BiblioCRUD.leer_bibliografias_por_titulos (titulo $in)", "bibliografias", {"titulo": {"$in": ["a", "b"]}}, None),
+    ("BiblioCRUD carga inicial (titulo + autor)", "bibliografias", {"titulo": "a", "autor": "b"}, None),
+    ("Cambios del catálogo (actualizado_en)", "cursos", {"actualizado_en": {"$gte": datetime(1970, 1, 1)}}, [("actualizado_en", ASCENDING), ("_id", ASCENDING)]),
+    ("Cambios del catálogo (actualizado_en)", "bibliografias", {"actualizado_en": {"$gte": datetime(1970, 1, 1)}}, None),
+]
+
+
+def asegurar_indices(db):
+    """
+    Crea los índices de INDICES si faltan y verifica que existan con las claves y la unicidad
+    esperadas. Si un índice único no se puede crear por valores repetidos, informa cuáles son.
+    Retorna True si todos quedaron correctos.
+    """
+    correctos = True
+    for coleccion, claves, unico, nombre in INDICES:
+        opciones = {"name": nombre} if nombre else {}
+        if unico:
+            opciones["unique"] = True
+            opciones["partialFilterExpression"] = {claves[0][0]: {"$exists": True}}
+        try:
+            nombre = db[coleccion].create_index(claves, **opciones)
+        except OperationFailure as e:
+            correctos = False
+            print(f"Error al crear el índice {claves} en '{coleccion}': {e}")
+            if unico and e.code == 11000:
+                _reportar_duplicados(db, coleccion, claves)
+            continue
+        info = db[coleccion].index_information().get(nombre)
+        if info is None or info["key"] != claves or bool(info.get("unique")) != unico:
+            correctos = False
+            print(f"Advertencia: El índice '{nombre}' de '{coleccion}' no tiene la definición esperada: {info}")
+        else:
+            print(f"Índice '{nombre}' verificado en '{coleccion}'.")
+    return correctos
+
+
+def _reportar_duplicados(db, coleccion, claves):
+    grupo = {campo: f"${campo}" for campo, _ in claves}
+    repetidos = db[coleccion].aggregate([
+        {"$match": {claves[0][0]: {"$exists": True}}},
+        {"$group": {"_id": grupo, "cantidad": {"$sum": 1}}},
+        {"$match": {"cantidad": {"$gt": 1}}},
+        {"$limit": 10}
+    ])
+    for repetido in repetidos:
+        print(f"  Valor repetido en '{coleccion}': {repetido['_id']} ({repetido['cantidad']} documentos)")
+
+
+def _etapas_del_plan(plan):
+    etapas = [plan["stage"]] if "stage" in plan else []
+    for clave in ("inputStage", "queryPlan"):
+        if clave in plan:
+            etapas.extend(_etapas_del_plan(plan[clave]))
+    for subplan in plan.get("inputStages", []):
+        etapas.extend(_etapas_del_plan(subplan))
+    return etapas
+
+
+def reportar_escaneos(db):
+    """
+    Pide a MongoDB el plan (explain) de cada consulta de CONSULTAS_APLICACION e informa las que
+    todavía recorren la colección completa (COLLSCAN). Retorna la lista de esas descripciones.
+    """
+    con_escaneo = []
+    for descripcion, coleccion, filtro, orden in CONSULTAS_APLICACION:
+        comando = {"find": coleccion, "filter": filtro}
+        if orden:
+            comando["sort"] = dict(orden)
+        try:
+            plan = db.command("explain", comando, verbosity="queryPlanner")["queryPlanner"]["winningPlan"]
+        except OperationFailure as e:
+            print(f"No se pudo obtener el plan de '{descripcion}': {e}")
+            continue
+        etapas = _etapas_del_plan(plan)
+        if "COLLSCAN" in etapas:
+            con_escaneo.append(descripcion)
+            print(f"ESCANEO COMPLETO  {coleccion}: {descripcion} ({' <- '.join(etapas)})")
+        else:
+            print(f"Usa índice       {coleccion}: {descripcion} ({' <- '.join(etapas)})")
+    if con_escaneo:
+        print(f"{len(con_escaneo)} consultas todavía recorren colecciones completas.")
+    else:
+        print("Todas las consultas de la aplicación usan índices.")
+    return con_escaneo
+
+
 def main():
     db = conectar_db()
-    if db:
+    if db is not None:
         crear_colecciones(db)
+        asegurar_indices(db)
+        reportar_escaneos(db)
         print("Base de datos y colecciones creadas correctamente.")
     else:
         print("No se pudo conectar a la base de datos.")
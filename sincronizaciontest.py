@@ -0,0 +1,209 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from conexionmongotest import obtener_db, cerrar_cliente_mongo, ahora_utc
+
+COLLECTION_NAME_SINCRONIZACION = "sincronizacion"
+COLLECTION_NAME_ELIMINACIONES = "catalogo_eliminaciones"
+COLLECTION_NAME_RECHAZADOS = "sincronizacion_rechazados"
+ID_PUNTO_CONTROL = "catalogo_neo4j"
+TAMANO_LOTE_SINCRONIZACION = 500
+# Solo se leen cambios con al menos este margen de antigüedad, para no saltar escrituras que
+# todavía no eran visibles (o que vienen de un reloj algo atrasado) cuando se leyó el lote.
+MARGEN_SEGUNDOS_SINCRONIZACION = 5.0
+FECHA_INICIAL = datetime(1970, 1, 1)
+
+
+def _fila_vocacion(doc):
+    return {"id_mongo": str(doc["_id"]), "nombre": doc.get("nombre")}
+
+
+def _fila_curso(doc):
+    return {"id_mongo": str(doc["_id"]), "nombre": doc.get("nombre"), "dificultad": doc.get("nivel")}
+
+
+def _fila_eliminacion(doc):
+    return {"etiqueta": doc.get("etiqueta"), "id_mongo": doc.get("id_mongo"), "nombre": doc.get("nombre")}
+
+
+# fuente -> (colección de Mongo, proyección, conversión a fila, argumento de aplicar_cambios_catalogo)
+FUENTES_SINCRONIZACION = [
+    ("vocaciones", "vocaciones", {"nombre": 1, "actualizado_en": 1}, _fila_vocacion, "vocaciones"),
+    ("cursos", "cursos", {"nombre": 1, "nivel": 1, "actualizado_en": 1}, _fila_curso, "cursos"),
+    ("eliminaciones", COLLECTION_NAME_ELIMINACIONES, None, _fila_eliminacion, "eliminados"),
+]
+
+
+class SincronizadorCatalogo:
+    """
+    Sincroniza de forma incremental las vocaciones y los cursos de MongoDB hacia el grafo.
+    Cada documento lleva 'actualizado_en'; se leen en lotes ordenados por (actualizado_en, _id)
+    a partir del último punto de control guardado en la colección 'sincronizacion', y cada lote
+    se aplica en una sola transacción con aplicar_cambios_catalogo. El punto de control avanza
+    solo después de aplicar el lote, así un reinicio continúa donde quedó sin releer todo.
+    Las eliminaciones se leen de las marcas que dejan VocacionesCRUD y CursosCRUD.
+    Si un lote falla se reintenta fila por fila; las filas que no se pueden aplicar (por ejemplo,
+    un curso renombrado con el nombre de otro) se guardan en 'sincronizacion_rechazados' y se saltan.
+    """
+
+    def __init__(self, gestor_grafo, db, tamano_lote=TAMANO_LOTE_SINCRONIZACION, margen_segundos=MARGEN_SEGUNDOS_SINCRONIZACION):
+        self.gestor_grafo = gestor_grafo
+        self.db = db
+        self.tamano_lote = tamano_lote
+        self.margen_segundos = margen_segundos
+        self._preparado = False
+
+    def preparar(self):
+        """
+        Crea los índices (actualizado_en, _id) que usa la lectura incremental y marca con la fecha
+        actual los documentos anteriores a la sincronización, para que se envíen una vez.
+        """
+        try:
+            for _, nombre_coleccion, _, _, _ in FUENTES_SINCRONIZACION:
+                self.db[nombre_coleccion].create_index([("actualizado_en", ASCENDING), ("_id", ASCENDING)])
+                if nombre_coleccion != COLLECTION_NAME_ELIMINACIONES:
+                    marcados = self.db[nombre_coleccion].update_many({"actualizado_en": {"$exists": False}},
+                                                                     {"$set": {"actualizado_en": ahora_utc()}})
+                    if marcados.modified_count:
+                        print(f"Se marcaron {marcados.modified_count} documentos de '{nombre_coleccion}' para la primera sincronización.")
+            self._preparado = True
+            return True
+        except Exception as e:
+            print(f"Error al preparar la sincronización del catálogo: {e}")
+            return False
+
+    def obtener_punto_control(self):
+        """Retorna {fuente: {"actualizado_en", "_id"}} con lo último aplicado de cada fuente."""
+        doc = self.db[COLLECTION_NAME_SINCRONIZACION].find_one({"_id": ID_PUNTO_CONTROL}) or {}
+        return {fuente: doc.get(fuente) or {"actualizado_en": FECHA_INICIAL, "_id": None} for fuente, *_ in FUENTES_SINCRONIZACION}
+
+    def _guardar_punto_control(self, fuente, marca):
+        self.db[COLLECTION_NAME_SINCRONIZACION].update_one(
+            {"_id": ID_PUNTO_CONTROL},
+            {"$set": {fuente: marca, "actualizado_en": ahora_utc()}},
+            upsert=True
+        )
+
+    def reiniciar_punto_control(self):
+        """Olvida el progreso: la próxima sincronización vuelve a enviar todo el catálogo."""
+        self.db[COLLECTION_NAME_SINCRONIZACION].delete_one({"_id": ID_PUNTO_CONTROL})
+
+    def _registrar_rechazo(self, fuente, fila):
+        """Guarda una fila que no se pudo aplicar, para revisarla; se vuelve a enviar si el documento cambia."""
+        try:
+            self.db[COLLECTION_NAME_RECHAZADOS].update_one(
+                {"fuente": fuente, "id_mongo": fila.get("id_mongo")},
+                {"$set": {"fila": fila, "actualizado_en": ahora_utc()}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"No se pudo registrar la fila rechazada de '{fuente}': {e}")
+
+    def _aplicar_lote(self, fuente, argumento, filas):
+        """
+        Aplica un lote en una transacción y, si falla, fila por fila. Retorna las filas que no se
+        pudieron aplicar solas (ya registradas como rechazadas), o None si el grafo no responde: en
+        ese caso el lote se reintentará completo en la próxima sincronización.
+        """
+        if self.gestor_grafo.aplicar_cambios_catalogo(**{argumento: filas}) is not None:
+            return []
+        print(f"Error al aplicar un lote de '{fuente}' en el grafo; se reintenta fila por fila.")
+        rechazadas = [fila for fila in filas if self.gestor_grafo.aplicar_cambios_catalogo(**{argumento: [fila]}) is None]
+        # Una transacción vacía distingue una fila inválida de un grafo que no responde.
+        if rechazadas and self.gestor_grafo.aplicar_cambios_catalogo() is None:
+            return None
+        for fila in rechazadas:
+            print(f"Fila de '{fuente}' rechazada por el grafo: {fila}")
+            self._registrar_rechazo(fuente, fila)
+        return rechazadas
+
+    def _leer_lote(self, nombre_coleccion, proyeccion, marca, hasta):
+        if marca["_id"] is None:
+            posteriores = {"actualizado_en": {"$gt": marca["actualizado_en"]}}
+        else:
+            posteriores = {"$or": [
+                {"actualizado_en": {"$gt": marca["actualizado_en"]}},
+                {"actualizado_en": marca["actualizado_en"], "_id": {"$gt": marca["_id"]}}
+            ]}
+        filtro = {"$and": [{"actualizado_en": {"$lte": hasta}}, posteriores]}
+        cursor = self.db[nombre_coleccion].find(filtro, proyeccion)
+        return list(cursor.sort([("actualizado_en", ASCENDING), ("_id", ASCENDING)]).limit(self.tamano_lote))
+
+    def sincronizar(self):
+        """
+        Envía al grafo todos los cambios pendientes y retorna un reporte por fuente, o None si no
+        se pudo leer el punto de control. Las filas rechazadas se saltan (se cuentan en "rechazados");
+        si el grafo no responde, se detiene sin avanzar el punto de control.
+        """
+        if not self._preparado and not self.preparar():
+            return None
+        inicio = time.perf_counter()
+        try:
+            puntos = self.obtener_punto_control()
+        except Exception as e:
+            print(f"Error al leer el punto de control de la sincronización: {e}")
+            return None
+        hasta = ahora_utc() - timedelta(seconds=self.margen_segundos)
+        reporte = {"completa": True, "lotes": 0, "rechazados": 0}
+        for fuente, nombre_coleccion, proyeccion, a_fila, argumento in FUENTES_SINCRONIZACION:
+            marca = puntos[fuente]
+            aplicados = 0
+            while True:
+                try:
+                    documentos = self._leer_lote(nombre_coleccion, proyeccion, marca, hasta)
+                except Exception as e:
+                    print(f"Error al leer cambios de '{nombre_coleccion}': {e}")
+                    reporte["completa"] = False
+                    break
+                if not documentos:
+                    break
+                rechazadas = self._aplicar_lote(fuente, argumento, [a_fila(doc) for doc in documentos])
+                if rechazadas is None:
+                    print(f"El grafo no respondió al aplicar '{nombre_coleccion}'; se reintentará en la próxima sincronización.")
+                    reporte["completa"] = False
+                    break
+                ultimo = documentos[-1]
+                marca = {"actualizado_en": ultimo["actualizado_en"], "_id": ultimo["_id"]}
+                self._guardar_punto_control(fuente, marca)
+                aplicados += len(documentos) - len(rechazadas)
+                reporte["rechazados"] += len(rechazadas)
+                reporte["lotes"] += 1
+                if len(documentos) < self.tamano_lote:
+                    break
+            reporte[fuente] = aplicados
+            if not reporte["completa"]:
+                break
+        reporte["segundos"] = time.perf_counter() - inicio
+        print(f"Sincronización del catálogo: {reporte.get('vocaciones', 0)} vocaciones, {reporte.get('cursos', 0)} cursos, "
+              f"{reporte.get('eliminaciones', 0)} eliminaciones, {reporte['rechazados']} rechazados en {reporte['segundos']:.2f}s.")
+        return reporte
+
+    def ejecutar_periodicamente(self, intervalo_segundos=30.0, detener=None):
+        """
+        Sincroniza cada 'intervalo_segundos' en un hilo de fondo hasta que se active el evento 'detener'.
+        Retorna (hilo, detener).
+        """
+        detener = detener or threading.Event()
+
+        def _bucle():
+            while not detener.is_set():
+                self.sincronizar()
+                detener.wait(intervalo_segundos)
+
+        hilo = threading.Thread(target=_bucle, name="sincronizacion-catalogo", daemon=True)
+        hilo.start()
+        return hilo, detener
+
+
+if __name__ == "__main__":
+    from Neo4jtest import crear_gestor_grafo
+
+    gestor = crear_gestor_grafo()
+    if gestor is not None and gestor._driver is not None:
+        sincronizador = SincronizadorCatalogo(gestor, obtener_db())
+        print(sincronizador.sincronizar())
+        cerrar_cliente_mongo()
+        gestor.close()
+    else:
+        print("No se pudo conectar al grafo. Saliendo.")
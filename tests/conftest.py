@@ -0,0 +1,61 @@
+import copy
+import os
+
+import pytest
+
+from Neo4jtest import VARIABLE_BACKEND_GRAFO, crear_gestor_grafo
+
+# Las pruebas usan el backend en memoria. Con CAMINO_BACKEND_GRAFO=neo4j corren contra el Neo4j de
+# CAMINO_NEO4J_URI_PRUEBAS (usuario y clave en CAMINO_NEO4J_USUARIO_PRUEBAS y CAMINO_NEO4J_CLAVE_PRUEBAS);
+# cada prueba vacía el grafo, por eso nunca se usa la instancia del proyecto.
+BACKEND_PRUEBAS = (os.environ.get(VARIABLE_BACKEND_GRAFO) or "memoria").lower()
+VARIABLE_URI_PRUEBAS = "CAMINO_NEO4J_URI_PRUEBAS"
+
+# Datos -> Python -> Pandas -> ML y Datos -> Estadistica -> ML
+DATOS = {
+    "vocacion_nombre": "Datos",
+    "cursos_rama": [
+        {"nombre": "Python", "dificultad": "Principiante", "siguientes": [
+            {"nombre": "Pandas", "dificultad": "Intermedio", "siguientes": [
+                {"nombre": "ML", "dificultad": "Avanzado"}
+            ]}
+        ]},
+        {"nombre": "Estadistica", "dificultad": "Principiante", "siguientes": [
+            {"nombre": "ML", "dificultad": "Avanzado"}
+        ]}
+    ]
+}
+
+
+def _crear_gestor_pruebas():
+    if BACKEND_PRUEBAS != "neo4j":
+        return crear_gestor_grafo(BACKEND_PRUEBAS)
+    uri = os.environ.get(VARIABLE_URI_PRUEBAS)
+    if not uri:
+        pytest.skip(f"Defina {VARIABLE_URI_PRUEBAS} para correr las pruebas contra Neo4j.")
+    auth = (os.environ.get("CAMINO_NEO4J_USUARIO_PRUEBAS", "neo4j"), os.environ.get("CAMINO_NEO4J_CLAVE_PRUEBAS", ""))
+    return crear_gestor_grafo("neo4j", uri=uri, auth=auth)
+
+
+@pytest.fixture
+def gestor_vacio():
+    gestor = _crear_gestor_pruebas()
+    if gestor is None or gestor._driver is None:
+        pytest.skip(f"Backend de grafo '{BACKEND_PRUEBAS}' no disponible.")
+    for vocacion in gestor.obtener_vocaciones():
+        gestor.eliminar_vocacion(vocacion["nombre"])
+    for curso in gestor.obtener_cursos():
+        gestor.eliminar_curso(curso["nombre"])
+    yield gestor
+    gestor.close()
+
+
+@pytest.fixture
+def datos_vocacion():
+    return copy.deepcopy(DATOS)
+
+
+@pytest.fixture
+def gestor(gestor_vacio, datos_vocacion):
+    gestor_vacio.crear_vocacion_con_ramas_desde_dict(datos_vocacion)
+    return gestor_vacio
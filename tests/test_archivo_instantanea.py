@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson.objectid import ObjectId
+
+from archivoinstantaneatest import ArchivoInstantanea, CatalogoLocal, escribir_archivo_instantanea
+from conexionmongotest import ahora_utc
+
+
+class _ColeccionEnMemoria:
+    """Lo mínimo de una colección de Mongo que usa CatalogoLocal.traer_cambios."""
+
+    def __init__(self, documentos):
+        self.documentos = documentos
+
+    def find(self, filtro):
+        desde = filtro["actualizado_en"]["$gte"]
+        etiquetas = filtro.get("etiqueta", {}).get("$in")
+        return [doc for doc in self.documentos
+                if doc["actualizado_en"] >= desde and (etiquetas is None or doc.get("etiqueta") in etiquetas)]
+
+
+def test_archivo_instantanea_ida_y_vuelta(gestor, tmp_path):
+    gestor.crear_curso("Suelto", "Intermedio")
+    gestor.eliminar_curso("Pandas")
+    assert gestor.activar_instantanea_local()
+    original = gestor.instantanea_local()
+    leido_hasta = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    catalogo = CatalogoLocal(
+        [{"_id": ObjectId(), "nombre": "Python", "dificultad": "Principiante", "actualizado_en": leido_hasta}],
+        [{"_id": ObjectId(), "titulo": "Aprender Python", "autor": "Ana"}],
+        leido_hasta
+    )
+    ruta = str(tmp_path / "instantanea.bin")
+    assert escribir_archivo_instantanea(ruta, original, catalogo) > 0
+
+    with ArchivoInstantanea(ruta) as archivo:
+        leida = archivo.instantanea()
+        catalogo_leido = archivo.catalogo()
+
+    assert leida.version == original.version == gestor.version_grafo()
+    assert len(leida) == len(original)
+    assert leida.rama_cursos_por_vocacion("Datos") == original.rama_cursos_por_vocacion("Datos")
+    assert leida.rama_predecesora_completa(["ML"]) == original.rama_predecesora_completa(["ML"])
+    assert leida.camino_usuario(["Python", "ML"]) == original.camino_usuario(["Python", "ML"])
+    assert leida.cursos_siguientes_de_lista(["Suelto"]) == []
+    assert catalogo_leido.cursos() == catalogo.cursos()
+    assert catalogo_leido.bibliografias() == catalogo.bibliografias()
+    assert catalogo_leido.leido_hasta == leido_hasta
+
+
+def test_archivo_instantanea_invalido(tmp_path):
+    ruta = tmp_path / "invalido.bin"
+    ruta.write_bytes(b"no es una instantanea" * 10)
+    with pytest.raises(ValueError):
+        ArchivoInstantanea(str(ruta))
+
+
+def test_traer_cambios_aplica_modificaciones_y_eliminaciones():
+    antes = ahora_utc() - timedelta(hours=1)
+    ahora = ahora_utc()
+    python, sql, libro = ObjectId(), ObjectId(), ObjectId()
+    catalogo = CatalogoLocal(
+        [{"_id": python, "nombre": "Python", "actualizado_en": antes}, {"_id": sql, "nombre": "SQL", "actualizado_en": antes}],
+        [{"_id": libro, "titulo": "Aprender SQL", "actualizado_en": antes}],
+        ahora - timedelta(minutes=1)
+    )
+    db = {
+        "cursos": _ColeccionEnMemoria([{"_id": python, "nombre": "Python 3", "actualizado_en": ahora},
+                                       {"_id": sql, "nombre": "SQL", "actualizado_en": antes}]),
+        "bibliografias": _ColeccionEnMemoria([]),
+        "catalogo_eliminaciones": _ColeccionEnMemoria([
+            {"etiqueta": "Bibliografia", "id_mongo": str(libro), "actualizado_en": ahora},
+            {"etiqueta": "Curso", "id_mongo": str(ObjectId()), "actualizado_en": ahora},
+            {"etiqueta": "Curso", "id_mongo": "no-es-un-id", "actualizado_en": ahora},
+            {"etiqueta": "Curso", "id_mongo": str(sql), "actualizado_en": antes},
+        ]),
+    }
+
+    assert catalogo.traer_cambios(db) == 2
+    assert [doc["nombre"] for doc in catalogo.cursos()] == ["Python 3", "SQL"]
+    assert catalogo.bibliografias() == []
+    assert catalogo.leido_hasta >= ahora
@@ -0,0 +1,38 @@
+def _nombres(nodos):
+    return [nodo["nombre"] for nodo in nodos]
+
+
+def test_carga_diferencial_quita_relaciones_sobrantes(gestor):
+    datos = {"vocacion_nombre": "Datos", "cursos_rama": [
+        {"nombre": "Estadistica", "dificultad": "Principiante", "siguientes": [{"nombre": "ML", "dificultad": "Avanzado"}]}
+    ]}
+    version = gestor.version_grafo()
+    resultado = gestor.crear_vocacion_con_ramas_desde_dict(datos, modo="diferencial")
+
+    cambios = resultado["cambios"]
+    assert cambios["raices_eliminadas"] == 1
+    assert cambios["vinculos_eliminados"] == 2
+    assert cambios["vinculos_conservados"] == 0
+    assert gestor.version_grafo() == version + 1
+    assert _nombres(gestor.obtener_cursos_directos_por_vocacion("Datos")) == ["Estadistica"]
+    assert gestor.obtener_cursos_siguientes("Python") == []
+    assert gestor.obtener_cursos_siguientes("Pandas") == []
+    assert _nombres(gestor.obtener_rama_cursos_por_vocacion("Datos")) == ["Estadistica", "ML"]
+    # Los cursos se conservan: solo se quitan relaciones.
+    assert {"Python", "Pandas"} <= set(_nombres(gestor.obtener_cursos()))
+
+
+def test_carga_diferencial_conserva_relaciones_de_otra_vocacion(gestor):
+    gestor.crear_vocacion_con_ramas_desde_dict({"vocacion_nombre": "Web", "cursos_rama": [
+        {"nombre": "Python", "dificultad": "Principiante"}
+    ]})
+    datos = {"vocacion_nombre": "Datos", "cursos_rama": [
+        {"nombre": "Python", "dificultad": "Principiante"},
+        {"nombre": "Estadistica", "dificultad": "Principiante", "siguientes": [{"nombre": "ML", "dificultad": "Avanzado"}]}
+    ]}
+    resultado = gestor.crear_vocacion_con_ramas_desde_dict(datos, modo="diferencial")
+
+    assert resultado["cambios"]["vinculos_eliminados"] == 0
+    assert resultado["cambios"]["vinculos_conservados"] == 2
+    assert _nombres(gestor.obtener_cursos_siguientes("Python")) == ["Pandas"]
+    assert _nombres(gestor.obtener_cursos_siguientes("Pandas")) == ["ML"]
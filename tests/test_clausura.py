@@ -0,0 +1,91 @@
+import pytest
+
+from grafomemoriatest import ETIQUETA_CURSO, ETIQUETA_VOCACION, InstantaneaGrafo, _iterar_bits
+
+# Datos(1) -> Python(2) -> Pandas(3) -> ML(4) y Datos(1) -> Estadistica(5) -> ML(4)
+NODOS = [(1, ETIQUETA_VOCACION, "Datos"), (2, ETIQUETA_CURSO, "Python"), (3, ETIQUETA_CURSO, "Pandas"),
+         (4, ETIQUETA_CURSO, "ML"), (5, ETIQUETA_CURSO, "Estadistica")]
+RELACIONES = [(1, 2, "TIENE_CURSO"), (1, 5, "TIENE_CURSO"), (2, 3, "PRECEDE_A"), (3, 4, "PRECEDE_A"), (5, 4, "PRECEDE_A")]
+
+
+def _crear_instantanea(usar_indice_clausura=True, relaciones=()):
+    instantanea = InstantaneaGrafo(usar_indice_clausura=usar_indice_clausura)
+    for id_neo4j, etiqueta, nombre in NODOS:
+        instantanea.agregar_nodo(id_neo4j, etiqueta, nombre)
+    for origen, destino, tipo in RELACIONES + list(relaciones):
+        instantanea.agregar_relacion(origen, destino, tipo)
+    return instantanea
+
+
+def _indice(instantanea, nombre):
+    return instantanea.indices_cursos([nombre])[0]
+
+
+def _verificar_clausura(instantanea):
+    """El índice de clausura debe coincidir con un recorrido completo desde cada nodo vivo."""
+    for indice in range(len(instantanea.nombres)):
+        if indice in instantanea.eliminados:
+            continue
+        assert instantanea.ancestros(indice) == instantanea._alcanzables(indice, instantanea.predecesores)
+        assert instantanea.descendientes(indice) == instantanea._alcanzables(indice, instantanea.sucesores)
+
+
+def _nombres(nodos):
+    return [nodo["nombre"] for nodo in nodos]
+
+
+@pytest.mark.parametrize("usar_indice_clausura", [True, False])
+def test_clausura_tras_eliminar_nodo(usar_indice_clausura):
+    instantanea = _crear_instantanea(usar_indice_clausura)
+    _verificar_clausura(instantanea)
+
+    assert instantanea.eliminar_nodo(_indice(instantanea, "Pandas"))
+    _verificar_clausura(instantanea)
+    assert instantanea.rama_sucesora_completa(["Python"]) == []
+    assert _nombres(instantanea.rama_predecesora_completa(["ML"])) == ["Datos", "Estadistica", "ML"]
+
+
+def test_clausura_tras_eliminar_nodo_en_un_ciclo():
+    instantanea = _crear_instantanea(relaciones=[(4, 2, "PRECEDE_A")])
+    _verificar_clausura(instantanea)
+    assert instantanea.eliminar_nodo(_indice(instantanea, "Estadistica"))
+    _verificar_clausura(instantanea)
+    assert instantanea.eliminar_nodo(_indice(instantanea, "ML"))
+    _verificar_clausura(instantanea)
+    assert _nombres(instantanea.rama_sucesora_completa(["Python"])) == ["Pandas", "Python"]
+
+
+def test_clausura_tras_eliminar_relacion():
+    instantanea = _crear_instantanea()
+    _verificar_clausura(instantanea)
+    python, pandas = _indice(instantanea, "Python"), _indice(instantanea, "Pandas")
+    assert instantanea.eliminar_relacion(python, pandas, "PRECEDE_A")
+    assert not instantanea.eliminar_relacion(python, pandas, "PRECEDE_A")
+    _verificar_clausura(instantanea)
+    assert python not in set(_iterar_bits(instantanea.ancestros(pandas)))
+    assert _nombres(instantanea.rama_predecesora_completa(["ML"])) == ["Datos", "Estadistica", "ML", "Pandas"]
+
+
+def test_copiar_no_comparte_estado():
+    instantanea = _crear_instantanea()
+    _verificar_clausura(instantanea)
+    copia = instantanea.copiar()
+    copia.agregar_relacion(4, 2, "PRECEDE_A")
+    assert copia.eliminar_nodo(_indice(copia, "Estadistica"))
+    _verificar_clausura(copia)
+
+    # La original no ve las escrituras hechas sobre la copia.
+    _verificar_clausura(instantanea)
+    assert _nombres(instantanea.rama_sucesora_completa(["ML"])) == []
+    assert _nombres(instantanea.rama_predecesora_completa(["ML"])) == ["Datos", "Estadistica", "ML", "Pandas", "Python"]
+
+
+def test_precalcular_clausura_publica_el_indice_completo():
+    instantanea = _crear_instantanea()
+    assert instantanea._ancestros_bits is None
+    assert instantanea.precalcular_clausura() is instantanea
+    assert len(instantanea._ancestros_bits) == len(instantanea._descendientes_bits) == len(NODOS)
+    _verificar_clausura(instantanea)
+
+    sin_indice = _crear_instantanea(usar_indice_clausura=False).precalcular_clausura()
+    assert sin_indice._ancestros_bits is None
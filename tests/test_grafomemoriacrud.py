@@ -0,0 +1,98 @@
+import pytest
+
+# Las pruebas reciben el gestor de conftest.py (crear_gestor_grafo con el backend elegido), cargado con
+# Datos -> Python -> Pandas -> ML y Datos -> Estadistica -> ML.
+
+
+def _nombres(nodos):
+    return [nodo["nombre"] for nodo in nodos]
+
+
+# --- Carga desde diccionario ---
+@pytest.mark.parametrize("modo", ["recursivo", "masivo", "diferencial"])
+def test_carga_desde_dict_en_cada_modo(gestor_vacio, datos_vocacion, modo):
+    gestor = gestor_vacio
+    resultado = gestor.crear_vocacion_con_ramas_desde_dict(datos_vocacion, modo=modo)
+
+    assert resultado["vocacion_procesada"]["nombre"] == "Datos"
+    assert resultado["cursos_procesados_count"] == len(resultado["detalle_cursos"])
+    assert set(_nombres(resultado["detalle_cursos"])) == {"Python", "Pandas", "ML", "Estadistica"}
+    assert ("cambios" in resultado) == (modo == "diferencial")
+    assert _nombres(gestor.obtener_cursos_directos_por_vocacion("Datos")) == ["Estadistica", "Python"]
+    assert _nombres(gestor.obtener_cursos_siguientes("Pandas")) == ["ML"]
+    assert _nombres(gestor.obtener_cursos_anteriores("ML")) == ["Estadistica", "Pandas"]
+    assert [(curso["nombre"], curso["nivel_en_rama"]) for curso in gestor.obtener_rama_cursos_por_vocacion("Datos")] == [
+        ("Estadistica", 1), ("Python", 1), ("ML", 2), ("Pandas", 2)
+    ]
+
+
+def test_carga_desde_dict_rechaza_datos_invalidos(gestor_vacio, datos_vocacion):
+    assert gestor_vacio.crear_vocacion_con_ramas_desde_dict(datos_vocacion, modo="otro") is None
+    assert gestor_vacio.crear_vocacion_con_ramas_desde_dict({"cursos_rama": []}) is None
+    assert gestor_vacio.obtener_vocaciones() == []
+
+
+def test_carga_diferencial_sin_cambios_no_mueve_la_version(gestor, datos_vocacion):
+    version = gestor.version_grafo()
+    resultado = gestor.crear_vocacion_con_ramas_desde_dict(datos_vocacion, modo="diferencial")
+    assert resultado["cambios"] == {
+        "raices_eliminadas": 0, "vinculos_eliminados": 0, "vinculos_conservados": 0, "vocacion_creada": False,
+        "cursos_creados": 0, "cursos_actualizados": 0, "raices_agregadas": 0, "vinculos_agregados": 0
+    }
+    assert gestor.version_grafo() == version
+
+
+def test_escrituras_sin_cambios_no_mueven_la_version(gestor, datos_vocacion):
+    version = gestor.version_grafo()
+    assert gestor.vincular_curso_a_curso("Python", "Pandas")
+    assert gestor.vincular_vocacion_a_curso("Datos", "Python")
+    gestor.crear_vocacion_con_ramas_desde_dict(datos_vocacion, modo="masivo")
+    assert gestor.version_grafo() == version
+
+    assert gestor.vincular_curso_a_curso("Python", "ML")
+    assert gestor.version_grafo() == version + 1
+
+
+def test_cargar_vocaciones_en_paralelo_informa_cambios(gestor, datos_vocacion):
+    reporte = gestor.cargar_vocaciones_en_paralelo([datos_vocacion, {"vocacion_nombre": "Web", "cursos_rama": [
+        {"nombre": "HTML", "dificultad": "Fácil"}
+    ]}, {"cursos_rama": []}])
+    assert sorted((r["vocacion_nombre"] or "", r["exito"], r["hubo_cambios"]) for r in reporte["vocaciones"]) == [
+        ("", False, False), ("Datos", True, False), ("Web", True, True)
+    ]
+    assert reporte["vocaciones_exitosas"] == 2
+
+
+# --- Formato de las consultas ---
+def test_obtener_rama_cursos_por_vocacion(gestor):
+    rama = gestor.obtener_rama_cursos_por_vocacion("Datos")
+    assert [(curso["nombre"], curso["nivel_en_rama"]) for curso in rama] == [
+        ("Estadistica", 1), ("Python", 1), ("ML", 2), ("Pandas", 2)
+    ]
+    assert all(set(curso) == {"id_interno_neo4j", "nombre", "dificultad", "nivel_en_rama"} for curso in rama)
+    assert _nombres(gestor.obtener_rama_cursos_por_vocacion("Datos", max_depth=1)) == ["Estadistica", "Python"]
+    assert gestor.obtener_rama_cursos_por_vocacion("Datos", max_depth=-1) == []
+    assert gestor.obtener_rama_cursos_por_vocacion("Inexistente") == []
+
+
+def test_obtener_rama_predecesora_y_sucesora(gestor):
+    predecesora = gestor.obtener_rama_predecesora_completa(["ML"])
+    assert [(nodo["tipo_nodo"], nodo["nombre"]) for nodo in predecesora] == [
+        ("Vocacion", "Datos"), ("Curso", "Estadistica"), ("Curso", "ML"), ("Curso", "Pandas"), ("Curso", "Python")
+    ]
+    assert "dificultad" not in predecesora[0]
+    assert predecesora[1]["dificultad"] == "Principiante"
+
+    assert _nombres(gestor.obtener_rama_sucesora_completa(["Python"])) == ["ML", "Pandas", "Python"]
+    # Un curso sin sucesores no forma parte de su propia rama.
+    assert gestor.obtener_rama_sucesora_completa(["ML"]) == []
+
+
+def test_obtener_camino_usuario(gestor):
+    camino = gestor.obtener_camino_usuario(["Python", "Pandas"])
+    assert set(camino) == {"rama_completada", "siguientes", "profundidad_maxima"}
+    assert [(nodo["nombre"], nodo["nivel"]) for nodo in camino["rama_completada"]] == [("Datos", 0), ("Python", 1), ("Pandas", 2)]
+    assert [(curso["nombre"], curso["nivel"]) for curso in camino["siguientes"]] == [("ML", 3)]
+    assert camino["profundidad_maxima"] == 3
+
+    assert gestor.obtener_camino_usuario([]) == {"rama_completada": [], "siguientes": [], "profundidad_maxima": 0}
@@ -0,0 +1,61 @@
+from planificadortest import RANGO_DIFICULTAD_DESCONOCIDA, _rango_dificultad
+
+
+def _nombres(nodos):
+    return [nodo["nombre"] for nodo in nodos]
+
+
+def test_planificar_camino_hacia_una_vocacion(gestor):
+    plan = gestor.planificar_camino(["Python"], "Datos", "Vocacion")
+    assert [(curso["nombre"], curso["paso"]) for curso in plan["cursos"]] == [("Estadistica", 1), ("Pandas", 2), ("ML", 3)]
+    assert plan["completo"] is True
+    assert plan["ciclos"] == [] and plan["bloqueados"] == []
+    assert plan["version_grafo"] == gestor.version_grafo()
+    assert gestor.planificar_camino([], "Inexistente") is None
+
+
+def test_planificar_camino_informa_ciclos(gestor_vacio):
+    gestor = gestor_vacio
+    for nombre in ("Base", "A", "B", "C", "Final", "Solo"):
+        gestor.crear_curso(nombre, "Intermedio")
+    for origen, destino in (("Base", "A"), ("A", "B"), ("B", "C"), ("C", "A"), ("C", "Final"), ("Solo", "Solo")):
+        gestor.vincular_curso_a_curso(origen, destino)
+
+    plan = gestor.planificar_camino([], "Final")
+    assert _nombres(plan["cursos"]) == ["Base"]
+    assert plan["ciclos"] == [["A", "B", "C"]]
+    assert plan["bloqueados"] == ["Final"]
+    assert plan["completo"] is False
+
+    plan = gestor.planificar_camino([], "Solo")
+    assert plan["ciclos"] == [["Solo"]]
+    assert plan["cursos"] == []
+
+
+def test_planificador_descarta_planes_de_versiones_anteriores(gestor):
+    gestor.planificar_camino([], "ML")
+    gestor.planificar_camino([], "ML")
+    assert gestor.estadisticas_planificador()["aciertos"] == 1
+    gestor.vincular_curso_a_curso("ML", "Pandas")
+    plan = gestor.planificar_camino([], "ML")
+    assert plan["ciclos"] == [["ML", "Pandas"]]
+    assert gestor.estadisticas_planificador()["aciertos"] == 1
+
+
+def test_planificar_camino_ordena_todas_las_dificultades_del_catalogo(gestor_vacio):
+    gestor = gestor_vacio
+    gestor.crear_vocacion("Mixta")
+    cursos = [("M", "Muy Avanzado"), ("A", "Avanzado"), ("F", "Fácil"), ("V", "Avanzada"),
+              ("T", "Todos los niveles"), ("B", "Básica"), ("I", "intermedio "), ("X", "Experto")]
+    for nombre, dificultad in cursos:
+        gestor.crear_curso(nombre, dificultad)
+        gestor.vincular_vocacion_a_curso("Mixta", nombre)
+
+    plan = gestor.planificar_camino([], "Mixta", "Vocacion")
+    assert _nombres(plan["cursos"]) == ["B", "F", "T", "I", "A", "V", "M", "X"]
+
+
+def test_rango_dificultad():
+    assert _rango_dificultad("Fácil") == _rango_dificultad("facil") == _rango_dificultad("Principiante") == 0
+    assert _rango_dificultad("Avanzada") == _rango_dificultad("AVANZADO") == 2
+    assert _rango_dificultad(None) == _rango_dificultad("Experto") == RANGO_DIFICULTAD_DESCONOCIDA
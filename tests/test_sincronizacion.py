@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from sincronizaciontest import COLLECTION_NAME_RECHAZADOS, ID_PUNTO_CONTROL, SincronizadorCatalogo
+
+
+class _ColeccionEnMemoria:
+    """Lo mínimo de una colección de Mongo que usan el punto de control y el registro de rechazados."""
+
+    def __init__(self):
+        self.documentos = []
+
+    def find_one(self, filtro):
+        return next((doc for doc in self.documentos if all(doc.get(k) == v for k, v in filtro.items())), None)
+
+    def update_one(self, filtro, cambios, upsert=False):
+        doc = self.find_one(filtro)
+        if doc is None:
+            doc = dict(filtro)
+            self.documentos.append(doc)
+        doc.update(cambios["$set"])
+
+
+class _DbEnMemoria(dict):
+    def __missing__(self, nombre):
+        self[nombre] = _ColeccionEnMemoria()
+        return self[nombre]
+
+
+class _SincronizadorEnMemoria(SincronizadorCatalogo):
+    """Lee los cambios de listas en memoria en lugar de consultar Mongo."""
+
+    def __init__(self, gestor_grafo, fuentes, tamano_lote):
+        super().__init__(gestor_grafo, _DbEnMemoria(), tamano_lote=tamano_lote, margen_segundos=0)
+        self.fuentes = fuentes
+        self._preparado = True
+
+    def _leer_lote(self, nombre_coleccion, proyeccion, marca, hasta):
+        clave_marca = (marca["actualizado_en"], marca["_id"] or ObjectId("0" * 24))
+        pendientes = sorted((doc for doc in self.fuentes.get(nombre_coleccion, [])
+                             if clave_marca < (doc["actualizado_en"], doc["_id"]) and doc["actualizado_en"] <= hasta),
+                            key=lambda doc: (doc["actualizado_en"], doc["_id"]))
+        return pendientes[:self.tamano_lote]
+
+
+class _GestorConFallas:
+    """Rechaza los cursos llamados 'Roto' (como un ConstraintError) o todo, si el grafo está caído."""
+
+    def __init__(self, gestor):
+        self.gestor = gestor
+        self.caido = False
+
+    def aplicar_cambios_catalogo(self, vocaciones=None, cursos=None, eliminados=None):
+        if self.caido or any(fila["nombre"] == "Roto" for fila in cursos or []):
+            return None
+        return self.gestor.aplicar_cambios_catalogo(vocaciones, cursos, eliminados)
+
+
+def _cursos(*nombres):
+    inicio = datetime(2024, 1, 1)
+    return [{"_id": ObjectId(), "nombre": nombre, "nivel": "Intermedio", "actualizado_en": inicio + timedelta(seconds=i)}
+            for i, nombre in enumerate(nombres)]
+
+
+def test_sincronizar_salta_las_filas_rechazadas(gestor):
+    cursos = _cursos("Uno", "Roto", "Dos", "Tres")
+    eliminaciones = [{"_id": ObjectId(), "etiqueta": "Curso", "id_mongo": None, "nombre": "ML", "actualizado_en": datetime(2024, 1, 2)}]
+    sincronizador = _SincronizadorEnMemoria(_GestorConFallas(gestor), {"cursos": cursos, "catalogo_eliminaciones": eliminaciones}, 2)
+
+    reporte = sincronizador.sincronizar()
+    assert reporte["completa"] is True
+    assert (reporte["cursos"], reporte["rechazados"], reporte["eliminaciones"]) == (3, 1, 1)
+    nombres = {curso["nombre"] for curso in gestor.obtener_cursos()}
+    assert {"Uno", "Dos", "Tres"} <= nombres and "Roto" not in nombres and "ML" not in nombres
+    rechazados = sincronizador.db[COLLECTION_NAME_RECHAZADOS].documentos
+    assert [(doc["fuente"], doc["fila"]["nombre"]) for doc in rechazados] == [("cursos", "Roto")]
+
+    # El punto de control pasó la fila rechazada: no se vuelve a intentar.
+    assert sincronizador.sincronizar()["rechazados"] == 0
+
+
+def test_sincronizar_no_avanza_si_el_grafo_no_responde(gestor):
+    gestor_con_fallas = _GestorConFallas(gestor)
+    gestor_con_fallas.caido = True
+    sincronizador = _SincronizadorEnMemoria(gestor_con_fallas, {"cursos": _cursos("Uno", "Dos")}, 2)
+
+    reporte = sincronizador.sincronizar()
+    assert reporte["completa"] is False
+    assert reporte["rechazados"] == 0
+    assert sincronizador.db[COLLECTION_NAME_RECHAZADOS].documentos == []
+    assert sincronizador.db["sincronizacion"].find_one({"_id": ID_PUNTO_CONTROL}) is None
+
+    gestor_con_fallas.caido = False
+    assert sincronizador.sincronizar()["cursos"] == 2